@@ -2,9 +2,9 @@
 from PyInstaller.utils.hooks import collect_submodules
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('chatgpt_gui.py', '.'), ('chatgpt_bot_core.py', '.')]
+datas = [('chatgpt_gui.py', '.'), ('chatgpt_bot_core.py', '.'), ('chatgpt_page_scripts.py', '.'), ('chatgpt_wait_strategy.py', '.'), ('chatgpt_network_monitor.py', '.'), ('chatgpt_browser_pool.py', '.'), ('chatgpt_driver_resolver.py', '.'), ('chatgpt_process_stats.py', '.'), ('chatgpt_state_store.py', '.'), ('chatgpt_async_bot.py', '.'), ('chatgpt_response_format.py', '.'), ('chatgpt_selectors.py', '.'), ('chatgpt_browser_supervisor.py', '.'), ('chatgpt_browser_recycler.py', '.'), ('chatgpt_usage_limits.py', '.'), ('chatgpt_event_stream.py', '.')]
 binaries = []
-hiddenimports = ['chatgpt_gui', 'chatgpt_bot_core', 'selenium', 'selenium.webdriver', 'selenium.webdriver.chrome', 'selenium.webdriver.chrome.service', 'selenium.webdriver.chrome.options', 'selenium.webdriver.common', 'selenium.webdriver.common.by', 'selenium.webdriver.common.keys', 'selenium.webdriver.common.action_chains', 'selenium.webdriver.support', 'selenium.webdriver.support.ui', 'selenium.webdriver.support.wait', 'selenium.webdriver.support.expected_conditions', 'selenium.common.exceptions', 'webdriver_manager', 'webdriver_manager.chrome', 'json', 'time', 'threading']
+hiddenimports = ['chatgpt_gui', 'chatgpt_bot_core', 'chatgpt_page_scripts', 'chatgpt_wait_strategy', 'chatgpt_network_monitor', 'chatgpt_browser_pool', 'chatgpt_driver_resolver', 'chatgpt_process_stats', 'chatgpt_state_store', 'chatgpt_async_bot', 'chatgpt_response_format', 'chatgpt_selectors', 'chatgpt_browser_supervisor', 'chatgpt_browser_recycler', 'chatgpt_usage_limits', 'chatgpt_event_stream', 'selenium', 'selenium.webdriver', 'selenium.webdriver.chrome', 'selenium.webdriver.chrome.service', 'selenium.webdriver.chrome.options', 'selenium.webdriver.common', 'selenium.webdriver.common.by', 'selenium.webdriver.common.keys', 'selenium.webdriver.common.action_chains', 'selenium.webdriver.support', 'selenium.webdriver.support.ui', 'selenium.webdriver.support.wait', 'selenium.webdriver.support.expected_conditions', 'selenium.common.exceptions', 'webdriver_manager', 'webdriver_manager.chrome', 'json', 'time', 'threading']
 hiddenimports += collect_submodules('tkinter')
 hiddenimports += collect_submodules('selenium')
 hiddenimports += collect_submodules('webdriver_manager')
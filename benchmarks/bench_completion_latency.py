@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tail latency of answer completion detection.
+
+Tail latency is the time between the last token appearing on the page and
+ask_question_and_get_response returning. The fixed strategy (1 s polls,
+3 stable checks) is compared with the adaptive one.
+
+Usage:
+    python benchmarks/bench_completion_latency.py            # simulated clock, no browser
+    python benchmarks/bench_completion_latency.py --browser  # real Chrome against the fake chat page
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatgpt_wait_strategy import FixedWaitStrategy, AdaptiveWaitStrategy, COMPLETE, TIMEOUT
+
+STRATEGIES = {
+    "fixed": FixedWaitStrategy,
+    "adaptive": AdaptiveWaitStrategy
+}
+
+# (words, ms between words, ms before first word)
+SCENARIOS = [
+    (20, 30, 300),
+    (200, 20, 800),
+    (1000, 15, 1500)
+]
+
+
+def simulate(strategy, words, interval, first_token, probe_cost=0.01):
+    """Run a strategy against a synthetic answer on a virtual clock, return tail latency in seconds"""
+    first_at = first_token / 1000
+    done_at = first_at + (words - 1) * interval / 1000
+    now = 0.0
+    strategy.start(now)
+    while True:
+        if now < first_at:
+            text = ""
+        else:
+            sent = min(words, int((now - first_at) * 1000 / interval) + 1)
+            text = " ".join(f"word{i}" for i in range(1, sent + 1))
+        phase = strategy.update(now, text, now < done_at)
+        if phase in (COMPLETE, TIMEOUT):
+            return now - done_at, phase
+        now += strategy.next_delay() + probe_cost
+
+
+def run_simulated():
+    print("Simulated completion tail latency (no browser)")
+    print(f"{'scenario':<24}{'strategy':<12}{'tail (s)':>10}  result")
+    for words, interval, first_token in SCENARIOS:
+        for name, factory in STRATEGIES.items():
+            tail, phase = simulate(factory(), words, interval, first_token)
+            print(f"{f'{words} words @ {interval}ms':<24}{name:<12}{tail:>10.2f}  {phase}")
+
+
+def run_browser():
+    from chatgpt_bot_core import ChatGPTBot
+    from fake_chat_server import start_fake_chat_server
+
+    server, base_url = start_fake_chat_server()
+    bot = ChatGPTBot(status_callback=lambda message: None, delta_callback=lambda offset, text: None)
+    if not bot.launch_browser():
+        print("Could not launch Chrome")
+        return
+    try:
+        print("Completion tail latency against the fake chat page")
+        print(f"{'scenario':<24}{'strategy':<12}{'tail (s)':>10}{'total (s)':>11}")
+        for words, interval, first_token in SCENARIOS:
+            bot.driver.get(f"{base_url}/?words={words}&interval={interval}&first_token={first_token}")
+            for name, factory in STRATEGIES.items():
+                bot.wait_strategy = factory()
+                started = time.time()
+                bot.ask_question_and_get_response("benchmark question")
+                returned = time.time()
+                done_at = bot.driver.execute_script("return window.__fakeChatDoneAt") / 1000
+                print(f"{f'{words} words @ {interval}ms':<24}{name:<12}"
+                      f"{returned - done_at:>10.2f}{returned - started:>11.2f}")
+    finally:
+        bot.close_browser()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    if "--browser" in sys.argv:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        run_browser()
+    else:
+        run_simulated()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of reading the newest answer as conversations grow.
+
+Loads the fake chat page with 1, 10 and 100 earlier question/answer pairs
+and times one read of the newest answer with:
+    elements   find_elements on every assistant message, then .text of the
+               last one (how answers used to be read)
+    innerText  the in-page probe, newest turn only, layout-aware text
+    textContent the in-page probe, newest turn only, raw text
+
+Usage:
+    python benchmarks/bench_extraction.py [repeats]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from selenium.webdriver.common.by import By
+from chatgpt_bot_core import ChatGPTBot
+from fake_chat_server import start_fake_chat_server
+
+TURNS = [1, 10, 100]
+
+
+def median_ms(read, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        read()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def read_with_elements(bot):
+    elements = bot.driver.find_elements(By.CSS_SELECTOR, bot.selectors.css("assistant_turn"))
+    return elements[-1].text
+
+
+def read_with_probe(bot, text_source):
+    bot.text_source = text_source
+    return bot.probe_page()["text"]
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    server, url = start_fake_chat_server()
+    bot = ChatGPTBot(status_callback=lambda message: None)
+    if not bot.launch_browser():
+        print("Could not launch Chrome")
+        server.shutdown()
+        sys.exit(1)
+    print(f"{'turns':>6}{'elements (ms)':>16}{'innerText (ms)':>16}{'textContent (ms)':>18}")
+    try:
+        for turns in TURNS:
+            bot.driver.get(f"{url}/?turns={turns}&words=300")
+            elements = median_ms(lambda: read_with_elements(bot), repeats)
+            inner = median_ms(lambda: read_with_probe(bot, "innerText"), repeats)
+            content = median_ms(lambda: read_with_probe(bot, "textContent"), repeats)
+            print(f"{turns:>6}{elements:>16.1f}{inner:>16.1f}{content:>18.1f}")
+    finally:
+        bot.close_browser()
+        server.shutdown()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: browser launch timing, memory and page load per launch profile.
+
+Launches Chrome several times in one process and reports how long driver
+resolution and browser start-up took. The first launch resolves the
+chromedriver path (from the cache or ChromeDriverManager); later launches
+reuse the per-process result. For comparison, the time of a plain
+ChromeDriverManager().install() call, which the bot used to make on every
+launch, is measured too.
+
+With --profiles the "standard" and "lean" launch modes are compared:
+page load time and resident memory of the Chrome process tree (Linux).
+
+Usage:
+    python benchmarks/bench_launch.py [launches]
+    python benchmarks/bench_launch.py --profiles [--url https://chatgpt.com]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from chatgpt_bot_core import ChatGPTBot
+
+
+def time_driver_manager():
+    from webdriver_manager.chrome import ChromeDriverManager
+    started = time.time()
+    try:
+        ChromeDriverManager().install()
+    except Exception as e:
+        return f"failed ({e.__class__.__name__})"
+    return f"{time.time() - started:.2f}s"
+
+
+def run_launches(launches):
+    print(f"ChromeDriverManager().install(): {time_driver_manager()} per launch before the resolver")
+    print(f"{'launch':<8}{'driver resolve (s)':>20}{'browser start (s)':>20}")
+    for number in range(1, launches + 1):
+        bot = ChatGPTBot(status_callback=lambda message: None)
+        if not bot.launch_browser():
+            print("Could not launch Chrome")
+            return
+        timing = bot.last_launch_timing
+        print(f"{number:<8}{timing['driver_resolve']:>20.3f}{timing['browser_start']:>20.3f}")
+        bot.close_browser()
+
+
+def run_profiles(url):
+    server = None
+    if url is None:
+        from fake_chat_server import start_fake_chat_server
+        server, url = start_fake_chat_server()
+    print(f"Loading {url}")
+    print(f"{'profile':<12}{'launch (s)':>12}{'page load (s)':>15}{'load event (ms)':>17}{'RSS (MB)':>11}")
+    try:
+        for launch_mode in ChatGPTBot.LAUNCH_MODES:
+            bot = ChatGPTBot(status_callback=lambda message: None, launch_mode=launch_mode)
+            started = time.time()
+            if not bot.launch_browser():
+                print(f"Could not launch Chrome in {launch_mode} mode")
+                continue
+            launched = time.time()
+            bot.driver.get(url)
+            loaded = time.time()
+            load_event = bot.driver.execute_script(
+                "var n = performance.getEntriesByType('navigation')[0]; return n ? n.loadEventEnd : null;"
+            )
+            time.sleep(2)  # let background work settle before sampling memory
+            rss = bot.browser_rss()
+            print(f"{launch_mode:<12}{launched - started:>12.2f}{loaded - launched:>15.2f}"
+                  f"{load_event or 0:>17.0f}{(rss or 0) / 1024 / 1024:>11.0f}")
+            bot.close_browser()
+    finally:
+        if server:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--profiles" in args:
+        run_profiles(args[args.index("--url") + 1] if "--url" in args else None)
+    else:
+        run_launches(int(args[0]) if args else 3)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DOM-based vs network-based completion detection.
+
+Runs Chrome against the fake chat page in SSE mode, where the answer is
+streamed from /backend-api/conversation like on the real site. The
+"network" stream mode ends the wait when the HTTP stream closes and
+reports exact time to first byte; the "poll" mode relies on the stop
+button and text stability.
+
+Usage:
+    python benchmarks/bench_network_completion.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from chatgpt_bot_core import ChatGPTBot
+from fake_chat_server import start_fake_chat_server
+
+# (words, ms between words, ms before first word)
+SCENARIOS = [
+    (20, 30, 300),
+    (200, 20, 800)
+]
+
+
+def run_mode(stream_mode, base_url):
+    bot = ChatGPTBot(status_callback=lambda message: None, delta_callback=lambda offset, text: None,
+                     stream_mode=stream_mode)
+    if not bot.launch_browser():
+        print("Could not launch Chrome")
+        return
+    try:
+        for words, interval, first_token in SCENARIOS:
+            bot.driver.get(f"{base_url}/?transport=sse&words={words}&interval={interval}&first_token={first_token}")
+            started = time.time()
+            answer = bot.ask_question_and_get_response("benchmark question")
+            returned = time.time()
+            done_at = bot.driver.execute_script("return window.__fakeChatDoneAt") / 1000
+            timing = bot.last_stream_timing or {}
+            print(f"{f'{words} words @ {interval}ms':<24}{stream_mode:<10}"
+                  f"{returned - done_at:>10.2f}{returned - started:>11.2f}"
+                  f"{str(timing.get('time_to_first_byte', '-')):>10}"
+                  f"  {'ok' if answer and answer.endswith(f'word{words}') else 'MISMATCH'}")
+    finally:
+        bot.close_browser()
+
+
+if __name__ == "__main__":
+    server, base_url = start_fake_chat_server()
+    print(f"{'scenario':<24}{'mode':<10}{'tail (s)':>10}{'total (s)':>11}{'ttfb (s)':>10}")
+    try:
+        for mode in ("poll", "network"):
+            run_mode(mode, base_url)
+    finally:
+        server.shutdown()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to enter a prompt, by input mode and prompt size.
+
+Runs Chrome against the fake chat page and enters prompts of growing size
+with the "type" mode (key presses via send_keys) and the "insert" mode
+(one DevTools/script insertion, then an explicit submit). Each prompt
+contains newlines; the user turn the page renders is compared with the
+prompt to check it arrived intact and was submitted once.
+
+Usage:
+    python benchmarks/bench_prompt_input.py [max_size]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from selenium.webdriver.common.by import By
+from chatgpt_bot_core import ChatGPTBot
+from fake_chat_server import start_fake_chat_server
+
+SIZES = [50, 1000, 10000, 50000]
+
+
+def make_prompt(size):
+    line = "Summarise the following line, keeping \"quotes\" and 'apostrophes'.\n"
+    return (line * (size // len(line) + 1))[:size].rstrip("\n") + "?"
+
+
+def run_mode(input_mode, base_url, sizes):
+    bot = ChatGPTBot(status_callback=lambda message: None, input_mode=input_mode)
+    if not bot.launch_browser():
+        print("Could not launch Chrome")
+        return
+    try:
+        for size in sizes:
+            bot.driver.get(f"{base_url}/?words=1&first_token=0")
+            prompt = bot.driver.find_element(By.ID, "prompt-textarea")
+            query = make_prompt(size)
+            bot.enter_prompt(prompt, query)
+            turns = bot.driver.find_elements(By.CSS_SELECTOR, "[data-message-author-role='user']")
+            intact = len(turns) == 1 and turns[0].get_attribute("textContent") == query
+            print(f"{input_mode:<8}{size:>10}{bot.last_input_seconds:>14.3f}"
+                  f"{'yes' if intact else f'no ({len(turns)} turns)':>10}")
+    finally:
+        bot.close_browser()
+
+
+if __name__ == "__main__":
+    max_size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    sizes = [size for size in SIZES if size <= max_size]
+    server, url = start_fake_chat_server()
+    print(f"{'mode':<8}{'chars':>10}{'input (s)':>14}{'intact':>10}")
+    try:
+        for input_mode in ("insert", "type"):
+            run_mode(input_mode, url, sizes)
+    finally:
+        server.shutdown()
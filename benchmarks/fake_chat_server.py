@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the ChatGPT web page, used by the benchmarks.
+
+The page mimics the parts of the real DOM the bot relies on: the
+#prompt-textarea composer, assistant turns with a .markdown body and a
+stop button that is visible while an answer streams. The answer is
+streamed word by word; when it is done window.__fakeChatDoneAt holds the
+completion time (ms since epoch) so callers can measure tail latency.
+
+Query parameters of the page:
+    words        number of words in each answer (default 100)
+    interval     ms between words (default 20)
+    first_token  ms before the first word appears (default 300)
+    transport    "dom" generates the answer in the page (default),
+                 "sse" posts to /backend-api/conversation and renders the
+                 server-sent event stream, like the real site does
+    turns        earlier question/answer pairs already on the page (default 0)
+
+Usage:
+    python benchmarks/fake_chat_server.py [port]
+"""
+import json
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+PAGE = r"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Fake Chat</title></head>
+<body>
+<main id="thread"></main>
+<form id="composer">
+  <textarea id="prompt-textarea" rows="3" cols="80"></textarea>
+</form>
+<script>
+var params = new URLSearchParams(location.search);
+var config = {
+    words: parseInt(params.get('words') || '100', 10),
+    interval: parseInt(params.get('interval') || '20', 10),
+    firstToken: parseInt(params.get('first_token') || '300', 10),
+    transport: params.get('transport') || 'dom',
+    turns: parseInt(params.get('turns') || '0', 10)
+};
+var thread = document.getElementById('thread');
+var prompt = document.getElementById('prompt-textarea');
+window.__fakeChatDoneAt = null;
+
+function addTurn(role) {
+    var turn = document.createElement('div');
+    turn.setAttribute('data-message-author-role', role);
+    var body = document.createElement('div');
+    body.className = 'markdown';
+    turn.appendChild(body);
+    thread.appendChild(turn);
+    return body;
+}
+
+function showStopButton() {
+    var button = document.createElement('button');
+    button.setAttribute('data-testid', 'stop-button');
+    button.textContent = 'Stop';
+    document.body.appendChild(button);
+    return button;
+}
+
+function answerFromStream(question, body, stop) {
+    fetch('/backend-api/conversation' + location.search, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({prompt: question})
+    }).then(function (response) {
+        var reader = response.body.getReader();
+        var decoder = new TextDecoder();
+        var buffer = '';
+        function read() {
+            return reader.read().then(function (chunk) {
+                if (chunk.done) {
+                    stop.remove();
+                    window.__fakeChatDoneAt = Date.now();
+                    return;
+                }
+                buffer += decoder.decode(chunk.value, {stream: true});
+                var events = buffer.split('\n\n');
+                buffer = events.pop();
+                events.forEach(function (event) {
+                    var data = event.replace(/^data: /, '');
+                    if (data !== '[DONE]') { body.textContent += JSON.parse(data).delta; }
+                });
+                return read();
+            });
+        }
+        return read();
+    });
+}
+
+function answer(question) {
+    addTurn('user').textContent = question;
+    window.__fakeChatDoneAt = null;
+    var body = addTurn('assistant');
+    var stop = showStopButton();
+    if (config.transport === 'sse') {
+        answerFromStream(question, body, stop);
+        return;
+    }
+    var sent = 0;
+    function next() {
+        if (sent >= config.words) {
+            stop.remove();
+            window.__fakeChatDoneAt = Date.now();
+            return;
+        }
+        sent += 1;
+        body.textContent += (sent > 1 ? (sent % 12 === 0 ? '\n' : ' ') : '') + 'word' + sent;
+        setTimeout(next, config.interval);
+    }
+    setTimeout(next, config.firstToken);
+}
+
+function answerText(words) {
+    var text = '';
+    for (var sent = 1; sent <= words; sent++) {
+        text += (sent > 1 ? (sent % 12 === 0 ? '\n' : ' ') : '') + 'word' + sent;
+    }
+    return text;
+}
+
+// Earlier conversation, so extraction cost can be measured on long threads
+for (var t = 1; t <= config.turns; t++) {
+    addTurn('user').textContent = 'Earlier question ' + t;
+    addTurn('assistant').textContent = answerText(config.words);
+}
+
+prompt.addEventListener('keydown', function (event) {
+    if (event.key === 'Enter' && !event.shiftKey) {
+        event.preventDefault();
+        var question = prompt.value;
+        prompt.value = '';
+        answer(question);
+    }
+});
+</script>
+</body>
+</html>
+"""
+
+
+def answer_words(words):
+    """Yield the answer word by word, with the same separators as the in-page generator"""
+    for sent in range(1, words + 1):
+        separator = ("\n" if sent % 12 == 0 else " ") if sent > 1 else ""
+        yield f"{separator}word{sent}"
+
+
+class FakeChatHandler(BaseHTTPRequestHandler):
+    """Serves the fake chat page and a streaming conversation endpoint"""
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if not url.path.startswith("/backend-api/conversation"):
+            self.send_error(404)
+            return
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        params = parse_qs(url.query)
+        words = int(params.get("words", ["100"])[0])
+        interval = int(params.get("interval", ["20"])[0]) / 1000
+        first_token = int(params.get("first_token", ["300"])[0]) / 1000
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        time.sleep(first_token)
+        for word in answer_words(words):
+            self.wfile.write(f"data: {json.dumps({'delta': word})}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(interval)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        body = PAGE.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_chat_server(port=0):
+    """Start the server in a background thread and return (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server, url = start_fake_chat_server(port)
+    print(f"Fake chat page running at {url}/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -15,6 +15,7 @@ class ChatGPTAPIClient:
         self.session_id = None
         self.session = requests.Session()
         self.polling_active = False
+        self.displayed_response = ""
         self.setup_gui()
         
     def setup_gui(self):
@@ -113,12 +114,18 @@ class ChatGPTAPIClient:
         self.root.update()
     
     def update_response_display(self, text):
-        """Update the response display with new text"""
+        """Update the response display with new text, appending when only new text arrived"""
+        if text == self.displayed_response:
+            return
         self.response_text.config(state='normal')
-        self.response_text.delete(1.0, tk.END)
-        self.response_text.insert(1.0, text)
+        if self.displayed_response and text.startswith(self.displayed_response):
+            self.response_text.insert(tk.END, text[len(self.displayed_response):])
+        else:
+            self.response_text.delete(1.0, tk.END)
+            self.response_text.insert(1.0, text)
         self.response_text.config(state='disabled')
         self.response_text.see(tk.END)
+        self.displayed_response = text
         self.root.update()
     
     def clear_response(self):
@@ -126,6 +133,7 @@ class ChatGPTAPIClient:
         self.response_text.config(state='normal')
         self.response_text.delete(1.0, tk.END)
         self.response_text.config(state='disabled')
+        self.displayed_response = ""
         
     def make_api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
         """Make API request with error handling"""
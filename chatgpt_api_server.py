@@ -1,21 +1,132 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, Response, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
+import threading
 import time
 import uvicorn
 from chatgpt_bot_core import ChatGPTBot
+from chatgpt_async_bot import BrowserExecutor
+from chatgpt_response_format import structured_to_markdown
+from chatgpt_selectors import selector_registry
+from chatgpt_browser_pool import BrowserPool
+from chatgpt_browser_recycler import BrowserRecycler
+from chatgpt_browser_supervisor import BrowserSupervisor, is_browser_crash
+from chatgpt_event_stream import SessionEventLog, format_sse
+from chatgpt_state_store import StateWriter, open_state_store
+from chatgpt_usage_limits import UsageLimitError
 import uuid
 
 app = FastAPI(title="ChatGPT Bot API", version="1.0.0")
 
+class ResponseBuffer:
+    """Accumulates a streamed answer from deltas without re-copying the whole text
+
+    Deltas arrive on browser worker threads while handlers read text() on the
+    event loop, so both go through one lock.
+    """
+    def __init__(self, text: str = ""):
+        self.chunks = [text] if text else []
+        self.length = len(text)
+        self.joined = text
+        self.lock = threading.Lock()
+
+    def apply_delta(self, offset: int, text: str):
+        """Drop everything from offset on, then append text"""
+        with self.lock:
+            if offset != self.length:
+                kept = self._join()[:offset]
+                self.chunks = [kept] if kept else []
+                self.length = len(kept)
+            if text:
+                self.chunks.append(text)
+                self.length += len(text)
+            self.joined = None
+
+    def text(self) -> str:
+        """Return the full answer, joining pending chunks at most once"""
+        with self.lock:
+            return self._join()
+
+    def _join(self) -> str:
+        if self.joined is None:
+            self.joined = "".join(self.chunks)
+            self.chunks = [self.joined] if self.joined else []
+        return self.joined
+
 # Global bot instance and storage
 bot_instances: Dict[str, ChatGPTBot] = {}
-bot_responses: Dict[str, str] = {}
+bot_responses: Dict[str, ResponseBuffer] = {}
 bot_logs: Dict[str, list] = {}
+# Response deltas, status changes and log lines of every session for GET /bot/stream (SSE)
+bot_events: Dict[str, SessionEventLog] = {}
+# ID of the job (question) each session is answering, None when idle
+bot_jobs: Dict[str, Optional[str]] = {}
+# Recent jobs of every session: job ID -> None while queued or running, then the
+# (event ID, kind, data) of the event that ended it, for job streams opened later
+session_jobs: Dict[str, "OrderedDict[str, Optional[tuple]]"] = {}
+session_jobs_lock = threading.Lock()
+# Finished jobs kept per session
+JOB_HISTORY = 100
+# Seconds between keep-alive comments on idle event streams
+SSE_KEEPALIVE = 15
+
+# Every blocking browser call runs here, one at a time per session, so the event
+# loop never waits for Selenium. A question holds its session's worker until the
+# answer is complete, so the pool starts a thread per busy session, up to
+# CHATGPT_SERVER_WORKERS; once that many sessions are busy, calls of further
+# sessions queue until a worker is free (see /health "executor")
+SERVER_WORKERS = int(os.environ.get("CHATGPT_SERVER_WORKERS", "32"))
+browser_executor = BrowserExecutor(ThreadPoolExecutor(max_workers=SERVER_WORKERS, thread_name_prefix="server-browser"))
+
+# Warm browser pool, enabled by setting CHATGPT_POOL_MIN above 0
+browser_pool: Optional[BrowserPool] = None
+
+# Saves browser state after answers in the background, once a session is idle for the debounce period
+state_writer = StateWriter(debounce=float(os.environ.get("CHATGPT_STATE_DEBOUNCE", "2.0")))
+
+# Probes idle browsers every CHATGPT_LIVENESS_INTERVAL seconds and relaunches dead ones (0 disables)
+browser_supervisor = BrowserSupervisor(interval=float(os.environ.get("CHATGPT_LIVENESS_INTERVAL", "30")))
+
+# Replaces a session's browser with a standby one after this many questions, hours or MB of RSS (0 disables)
+browser_recycler = BrowserRecycler(
+    max_questions=int(os.environ.get("CHATGPT_RECYCLE_QUESTIONS", "200")),
+    max_age=float(os.environ.get("CHATGPT_RECYCLE_HOURS", "24")) * 3600,
+    max_rss=float(os.environ.get("CHATGPT_RECYCLE_RSS_MB", "1500")) * 1024 * 1024
+)
+
+# Launch mode for new sessions and pooled browsers ("standard" or "lean")
+DEFAULT_LAUNCH_MODE = os.environ.get("CHATGPT_LAUNCH_MODE", "standard")
+# Sessions with a persistent profile keep their Chrome user data in <SESSIONS_DIR>/<session_id>/chrome-profile
+SESSIONS_DIR = os.environ.get("CHATGPT_SESSIONS_DIR", "sessions")
+DEFAULT_PERSISTENT_PROFILE = os.environ.get("CHATGPT_PERSISTENT_PROFILES", "false").lower() in ("1", "true", "yes")
+# Required in the X-Admin-Token header of /admin endpoints when set
+ADMIN_TOKEN = os.environ.get("CHATGPT_ADMIN_TOKEN")
+
+# Saved browser state, one namespace per session ID: a directory of JSON files, or SQLite for a *.db path
+state_store = open_state_store(os.environ.get("CHATGPT_STATE_STORE", os.path.join(SESSIONS_DIR, "state")))
+# Saved state not written for this many days is deleted at startup; off by default (0 keeps everything)
+STATE_MAX_AGE_DAYS = float(os.environ.get("CHATGPT_STATE_MAX_AGE_DAYS", "0"))
 
 # Pydantic models for API requests/responses
 class BotCreateRequest(BaseModel):
     session_id: Optional[str] = None
+    stream_mode: str = "poll"
+    launch_mode: Optional[str] = None
+    persistent_profile: Optional[bool] = None
+    input_mode: str = "insert"
+    text_source: str = "innerText"
+    # Also read every complete answer as structured blocks (see GET /bot/answer/{session_id})
+    structured: bool = False
+
+class StateCopyRequest(BaseModel):
+    source: str
+    target: str
 
 class BotCreateResponse(BaseModel):
     session_id: str
@@ -25,18 +136,25 @@ class BotCreateResponse(BaseModel):
 class QuestionRequest(BaseModel):
     question: str
     session_id: str
+    # Continue this conversation, or "new" for a fresh chat; omitted asks on the current page
+    conversation_id: Optional[str] = None
 
 class QuestionResponse(BaseModel):
     session_id: str
     response: Optional[str]
     status: str
     message: str
+    # Follow the answer with GET /bot/stream/{session_id}/{job_id}
+    job_id: Optional[str] = None
 
 class StatusResponse(BaseModel):
     session_id: str
     status: str
     logs: list
     current_response: Optional[str]
+    conversation_id: Optional[str] = None
+    recoveries: list = []
+    retry_after: Optional[float] = None
 
 class BrowserActionRequest(BaseModel):
     session_id: str
@@ -49,6 +167,9 @@ class BrowserActionResponse(BaseModel):
 class QuestionWithAnswerRequest(BaseModel):
     question: str
     session_id: str
+    conversation_id: Optional[str] = None
+    # Sessions that take the question, in order, while session_id is parked by a usage limit
+    fallback_session_ids: List[str] = []
 
 class QuestionWithAnswerResponse(BaseModel):
     session_id: str
@@ -56,27 +177,181 @@ class QuestionWithAnswerResponse(BaseModel):
     answer: str
     status: str
     message: str
+    conversation_id: Optional[str] = None
+    job_id: Optional[str] = None
+
+def publish_event(session_id: str, kind: str, data: dict):
+    """Add an event to the session's event stream; safe to call from browser worker threads"""
+    events = bot_events.get(session_id)
+    if events is not None:
+        return events.publish(kind, data)
+    return None
+
+def add_job(session_id: str) -> str:
+    """Register a new job (question) of a session and return its ID"""
+    job_id = str(uuid.uuid4())
+    with session_jobs_lock:
+        jobs = session_jobs.setdefault(session_id, OrderedDict())
+        jobs[job_id] = None
+        finished = [old for old, result in jobs.items() if result is not None]
+        for old in finished[:max(0, len(jobs) - JOB_HISTORY)]:
+            del jobs[old]
+    return job_id
+
+def finish_job(session_id: str, job_id: str, kind: str, data: dict):
+    """Publish the "done" or "routed" event that ends a job and keep it for later job streams"""
+    data = {"job_id": job_id, **data}
+    event_id = publish_event(session_id, kind, data)
+    with session_jobs_lock:
+        jobs = session_jobs.get(session_id)
+        if jobs is not None and job_id in jobs:
+            jobs[job_id] = (event_id or 0, kind, data)
 
 def create_status_callback(session_id: str):
     """Create a status callback function for a specific session"""
     def callback(message: str):
         if session_id not in bot_logs:
             bot_logs[session_id] = []
-        bot_logs[session_id].append({
+        entry = {
             "timestamp": time.strftime('%H:%M:%S'),
             "message": message
-        })
+        }
+        bot_logs[session_id].append(entry)
+        publish_event(session_id, "log", dict(entry, job_id=bot_jobs.get(session_id)))
         # Keep only last 100 log entries
         if len(bot_logs[session_id]) > 100:
             bot_logs[session_id] = bot_logs[session_id][-100:]
     return callback
 
 def create_response_callback(session_id: str):
-    """Create a response callback function for a specific session"""
-    def callback(text: str):
-        bot_responses[session_id] = text
+    """Create a delta response callback function for a specific session"""
+    def callback(offset: int, text: str):
+        bot_responses[session_id].apply_delta(offset, text)
+        publish_event(session_id, "delta", {"job_id": bot_jobs.get(session_id), "offset": offset, "text": text})
     return callback
 
+def answer_job(session_id: str, job_id: str, bot: ChatGPTBot, question: str, conversation_id: Optional[str],
+               reroutable: bool = False):
+    """Ask a question as job job_id, announcing its start and its result on the session's event stream
+
+    With reroutable, a job that hits a usage limit is left open: the caller
+    routes it to another session or ends it.
+    """
+    bot_jobs[session_id] = job_id
+    publish_event(session_id, "status", {"job_id": job_id, "status": "processing"})
+    status, response = "failed", None
+    try:
+        response = bot.ask_question_and_get_response(question, conversation_id)
+        if response:
+            status = "completed"
+            # Auto-save state after successful interaction, off the request path
+            state_writer.schedule(bot)
+            browser_recycler.schedule(bot)
+        return response
+    except UsageLimitError:
+        status = "parked"
+        raise
+    finally:
+        bot_jobs[session_id] = None
+        if status != "parked" or not reroutable:
+            finish_job(session_id, job_id, "done", {
+                "status": status, "answer": response, "conversation_id": bot.conversation_id
+            })
+
+def session_profile_dir(session_id: str) -> str:
+    """Return the persistent Chrome profile directory of a session"""
+    return os.path.join(SESSIONS_DIR, session_id, "chrome-profile")
+
+def check_conversation_id(conversation_id: Optional[str]):
+    """Reject conversation IDs that cannot be part of a conversation URL"""
+    if conversation_id is None or conversation_id == ChatGPTBot.NEW_CONVERSATION:
+        return
+    if not ChatGPTBot.CONVERSATION_ID_PATTERN.fullmatch(conversation_id):
+        raise HTTPException(status_code=400, detail=f"Invalid conversation ID: {conversation_id}")
+
+def check_admin_token(token: Optional[str]):
+    """Reject admin calls without the configured admin token"""
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def parked_for(bot: ChatGPTBot) -> float:
+    """Return the seconds a session stays parked by a ChatGPT usage limit, 0 if it can take questions"""
+    return bot.usage_limit.remaining() if bot.usage_limit else 0.0
+
+def usage_limit_exception(session_ids: List[str], retry_after: float) -> HTTPException:
+    """Return the 429 answer for questions no session can take because of usage limits"""
+    return HTTPException(
+        status_code=429,
+        detail=f"Parked by a ChatGPT usage limit: {', '.join(session_ids)}",
+        headers={"Retry-After": str(math.ceil(retry_after))}
+    )
+
+def session_status(session_id: str, bot: ChatGPTBot) -> str:
+    """Describe the state of a session: created, crashed, parked, idle, processing or completed"""
+    if bot.driver is None:
+        return "crashed" if bot.crashed else "created"
+    if bot.crashed:
+        return "crashed"
+    if parked_for(bot) > 0:
+        return "parked"
+    current_response = bot_responses[session_id].text() if session_id in bot_responses else ""
+    if current_response and not current_response.startswith("[WARNING"):
+        return "completed"
+    if current_response:
+        return "processing"
+    return "idle"
+
+def run_in_background(session_id: str, task):
+    """Queue a blocking task on the browser executor behind the session's earlier calls"""
+    def report(future):
+        if not future.cancelled() and future.exception() is not None:
+            create_status_callback(session_id)(f"Background task failed: {future.exception()}")
+    browser_executor.submit(session_id, task).add_done_callback(report)
+
+def release_or_close_browser(bot: ChatGPTBot):
+    """Return a pooled browser to the pool, or close a browser the session launched itself"""
+    # Pending state has to be captured while the browser is still open
+    state_writer.flush(bot)
+    if browser_pool and browser_pool.release(bot):
+        return True
+    return bot.close_browser()
+
+@app.on_event("startup")
+async def start_browser_pool():
+    """Start the warm browser pool if it is enabled"""
+    global browser_pool
+    min_size = int(os.environ.get("CHATGPT_POOL_MIN", "0"))
+    max_size = int(os.environ.get("CHATGPT_POOL_MAX", "4"))
+    if min_size > 0:
+        browser_pool = BrowserPool(min_size=min_size, max_size=max_size,
+                                   bot_options={"launch_mode": DEFAULT_LAUNCH_MODE, "state_store": state_store})
+        browser_pool.start()
+
+@app.on_event("startup")
+async def expire_saved_states():
+    """Delete saved browser state that was not used for CHATGPT_STATE_MAX_AGE_DAYS"""
+    if STATE_MAX_AGE_DAYS > 0:
+        expired = await run_in_threadpool(state_store.expire, STATE_MAX_AGE_DAYS * 86400)
+        if expired:
+            print(f"Expired saved browser state: {', '.join(expired)}")
+
+@app.on_event("shutdown")
+async def stop_browser_pool():
+    """Close the idle browsers of the warm browser pool"""
+    if browser_pool:
+        await run_in_threadpool(browser_pool.shutdown)
+
+@app.on_event("shutdown")
+async def stop_browser_supervisor():
+    """Stop probing browsers"""
+    browser_supervisor.stop()
+
+@app.on_event("shutdown")
+async def flush_browser_state():
+    """Write browser state that is still waiting for its debounce period"""
+    # Waits for running answers and reads state over WebDriver, so not on the event loop
+    await run_in_threadpool(state_writer.stop)
+
 @app.get("/")
 async def root():
     """API root endpoint"""
@@ -91,6 +366,17 @@ async def root():
             "POST /bot/ask": "Ask a question to ChatGPT",
             "POST /bot/ask_with_answer": "Ask a question and get complete answer immediately",
             "GET /bot/status/{session_id}": "Get session status and logs",
+            "GET /bot/stream/{session_id}": "Stream response deltas, status and logs as Server-Sent Events",
+            "GET /bot/stream/{session_id}/{job_id}": "Stream the events of one question as Server-Sent Events",
+            "GET /bot/conversations/{session_id}": "List the conversations of a session",
+            "GET /bot/answer/{session_id}": "Get the latest answer as structured JSON or markdown",
+            "GET /health": "API health and browser executor load",
+            "GET /bot/pool": "Get warm browser pool status",
+            "GET /bot/saved_states": "List saved browser states",
+            "POST /bot/saved_states/copy": "Copy a saved browser state to another session ID",
+            "DELETE /bot/saved_states/{session_id}": "Delete a saved browser state",
+            "GET /admin/selectors": "Get page selectors and their hit statistics",
+            "POST /admin/selectors/reload": "Reload page selectors from the selector config file",
             "POST /bot/close": "Close browser for a session",
             "DELETE /bot/{session_id}": "Delete a bot session"
         }
@@ -103,21 +389,61 @@ async def create_bot(request: BotCreateRequest = None):
         # Generate session ID if not provided
         session_id = request.session_id if request and request.session_id else str(uuid.uuid4())
         
+        stream_mode = request.stream_mode if request else "poll"
+        input_mode = request.input_mode if request else "insert"
+        text_source = request.text_source if request else "innerText"
+        launch_mode = request.launch_mode if request and request.launch_mode else DEFAULT_LAUNCH_MODE
+        persistent_profile = DEFAULT_PERSISTENT_PROFILE
+        if request and request.persistent_profile is not None:
+            persistent_profile = request.persistent_profile
+        
         if session_id in bot_instances:
             raise HTTPException(status_code=409, detail=f"Session {session_id} already exists")
         
+        if stream_mode not in ChatGPTBot.STREAM_MODES:
+            raise HTTPException(status_code=400, detail=f"Unknown stream mode: {stream_mode}")
+        
+        if launch_mode not in ChatGPTBot.LAUNCH_MODES:
+            raise HTTPException(status_code=400, detail=f"Unknown launch mode: {launch_mode}")
+        
+        if input_mode not in ChatGPTBot.INPUT_MODES:
+            raise HTTPException(status_code=400, detail=f"Unknown input mode: {input_mode}")
+        
+        if text_source not in ChatGPTBot.TEXT_SOURCES:
+            raise HTTPException(status_code=400, detail=f"Unknown text source: {text_source}")
+        
+        # The session ID names its state namespace and profile directory, so it must be a safe file name
+        try:
+            state_store.check_namespace(session_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid session ID: {session_id}")
+        
         # Create bot instance with callbacks
         status_callback = create_status_callback(session_id)
         response_callback = create_response_callback(session_id)
         
         bot = ChatGPTBot(
             status_callback=status_callback,
-            response_callback=response_callback
+            delta_callback=response_callback,
+            stream_mode=stream_mode,
+            launch_mode=launch_mode,
+            input_mode=input_mode,
+            text_source=text_source,
+            extract_structure=bool(request and request.structured),
+            profile_dir=session_profile_dir(session_id) if persistent_profile else None,
+            state_store=state_store,
+            state_namespace=session_id,
+            recovery_callback=lambda event: publish_event(session_id, "recovery", event)
         )
         
         bot_instances[session_id] = bot
-        bot_responses[session_id] = ""
+        bot_responses[session_id] = ResponseBuffer()
         bot_logs[session_id] = []
+        bot_events[session_id] = SessionEventLog()
+        bot_jobs[session_id] = None
+        with session_jobs_lock:
+            session_jobs[session_id] = OrderedDict()
+        browser_supervisor.register(bot)
         
         status_callback(f"Bot session {session_id} created successfully")
         
@@ -127,11 +453,13 @@ async def create_bot(request: BotCreateRequest = None):
             message=f"Bot session {session_id} created successfully"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating bot: {str(e)}")
 
 @app.post("/bot/launch", response_model=BrowserActionResponse)
-async def launch_browser(request: BrowserActionRequest, background_tasks: BackgroundTasks):
+async def launch_browser(request: BrowserActionRequest):
     """Launch browser for a bot session"""
     try:
         session_id = request.session_id
@@ -142,13 +470,16 @@ async def launch_browser(request: BrowserActionRequest, background_tasks: Backgr
         bot = bot_instances[session_id]
         
         def launch_task():
+            # A warm browser from the pool is already launched with state loaded
+            if browser_pool and browser_pool.lease(bot):
+                return
             success = bot.launch_browser()
             if success:
                 # Auto-load browser state after launch
                 bot.load_browser_state()
         
         # Launch in background
-        background_tasks.add_task(launch_task)
+        run_in_background(session_id, launch_task)
         
         return BrowserActionResponse(
             session_id=session_id,
@@ -162,7 +493,7 @@ async def launch_browser(request: BrowserActionRequest, background_tasks: Backgr
         raise HTTPException(status_code=500, detail=f"Error launching browser: {str(e)}")
 
 @app.post("/bot/load_state", response_model=BrowserActionResponse)
-async def load_browser_state(request: BrowserActionRequest, background_tasks: BackgroundTasks):
+async def load_browser_state(request: BrowserActionRequest):
     """Load browser state for a bot session"""
     try:
         session_id = request.session_id
@@ -175,7 +506,7 @@ async def load_browser_state(request: BrowserActionRequest, background_tasks: Ba
         def load_task():
             bot.load_browser_state()
         
-        background_tasks.add_task(load_task)
+        run_in_background(session_id, load_task)
         
         return BrowserActionResponse(
             session_id=session_id,
@@ -189,7 +520,7 @@ async def load_browser_state(request: BrowserActionRequest, background_tasks: Ba
         raise HTTPException(status_code=500, detail=f"Error loading browser state: {str(e)}")
 
 @app.post("/bot/save_state", response_model=BrowserActionResponse)
-async def save_browser_state(request: BrowserActionRequest, background_tasks: BackgroundTasks):
+async def save_browser_state(request: BrowserActionRequest):
     """Save browser state for a bot session"""
     try:
         session_id = request.session_id
@@ -200,9 +531,9 @@ async def save_browser_state(request: BrowserActionRequest, background_tasks: Ba
         bot = bot_instances[session_id]
         
         def save_task():
-            bot.save_browser_state()
+            state_writer.save(bot)
         
-        background_tasks.add_task(save_task)
+        run_in_background(session_id, save_task)
         
         return BrowserActionResponse(
             session_id=session_id,
@@ -216,7 +547,7 @@ async def save_browser_state(request: BrowserActionRequest, background_tasks: Ba
         raise HTTPException(status_code=500, detail=f"Error saving browser state: {str(e)}")
 
 @app.post("/bot/ask", response_model=QuestionResponse)
-async def ask_question(request: QuestionRequest, background_tasks: BackgroundTasks):
+async def ask_question(request: QuestionRequest):
     """Ask a question to ChatGPT"""
     try:
         session_id = request.session_id
@@ -229,25 +560,33 @@ async def ask_question(request: QuestionRequest, background_tasks: BackgroundTas
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
         
         bot = bot_instances[session_id]
+        check_conversation_id(request.conversation_id)
+        if parked_for(bot) > 0:
+            raise usage_limit_exception([session_id], parked_for(bot))
+        
+        job_id = add_job(session_id)
         
         def ask_task():
-            response = bot.ask_question_and_get_response(question)
-            bot_responses[session_id] = response or "No response received"
-            # Auto-save state after successful interaction
-            if response:
-                bot.save_browser_state()
+            try:
+                response = answer_job(session_id, job_id, bot, question, request.conversation_id)
+            except UsageLimitError as e:
+                bot_responses[session_id] = ResponseBuffer(f"Usage limit reached: {e}")
+                return
+            bot_responses[session_id] = ResponseBuffer(response or "No response received")
         
         # Clear previous response
-        bot_responses[session_id] = ""
+        bot_responses[session_id] = ResponseBuffer()
         
         # Ask question in background
-        background_tasks.add_task(ask_task)
+        publish_event(session_id, "status", {"job_id": job_id, "status": "queued"})
+        run_in_background(session_id, ask_task)
         
         return QuestionResponse(
             session_id=session_id,
-            response=None,  # Response will be available via status endpoint
+            response=None,  # Response will be available via the status and stream endpoints
             status="processing",
-            message="Question submitted, check status endpoint for response"
+            message="Question submitted, check status endpoint for response",
+            job_id=job_id
         )
         
     except HTTPException:
@@ -265,24 +604,50 @@ async def ask_question_with_answer(request: QuestionWithAnswerRequest):
         if not question:
             raise HTTPException(status_code=400, detail="Question cannot be empty")
         
-        if session_id not in bot_instances:
-            raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
-        
-        bot = bot_instances[session_id]
-        
-        # Ask question synchronously and get complete response
-        response = bot.ask_question_and_get_response(question)
+        session_ids = [session_id] + [other for other in request.fallback_session_ids if other != session_id]
+        for candidate in session_ids:
+            if candidate not in bot_instances:
+                raise HTTPException(status_code=404, detail=f"Session {candidate} not found")
+        check_conversation_id(request.conversation_id)
+        
+        job_id = add_job(session_id)
+        
+        # Ask the first session that is not parked by a usage limit and route on when one hits a limit
+        response = None
+        for candidate in session_ids:
+            bot = bot_instances[candidate]
+            if parked_for(bot) > 0:
+                continue
+            if candidate != session_id:
+                # The job continues as a job of the fallback session; its stream follows the "routed" event
+                routed_job_id = add_job(candidate)
+                finish_job(session_id, job_id, "routed", {"session_id": candidate, "routed_job_id": routed_job_id})
+                session_id, job_id = candidate, routed_job_id
+            # A conversation ID belongs to the account of the requested session
+            conversation_id = request.conversation_id
+            if candidate != request.session_id and conversation_id is not None:
+                conversation_id = ChatGPTBot.NEW_CONVERSATION
+            try:
+                response = await browser_executor.run(candidate, answer_job, candidate, job_id, bot, question,
+                                                      conversation_id, True)
+                break
+            except UsageLimitError:
+                continue
+        else:
+            finish_job(session_id, job_id, "done", {
+                "status": "parked", "answer": None, "conversation_id": bot_instances[session_id].conversation_id
+            })
+            raise usage_limit_exception(session_ids, min(parked_for(bot_instances[other]) for other in session_ids))
         
         if response:
-            # Auto-save state after successful interaction
-            bot.save_browser_state()
-            
             return QuestionWithAnswerResponse(
                 session_id=session_id,
                 question=question,
                 answer=response,
                 status="completed",
-                message="Question answered successfully"
+                message="Question answered successfully",
+                conversation_id=bot.conversation_id,
+                job_id=job_id
             )
         else:
             return QuestionWithAnswerResponse(
@@ -290,7 +655,8 @@ async def ask_question_with_answer(request: QuestionWithAnswerRequest):
                 question=question,
                 answer="No response received",
                 status="failed",
-                message="Failed to get response from ChatGPT"
+                message="Failed to get response from ChatGPT",
+                job_id=job_id
             )
         
     except HTTPException:
@@ -307,22 +673,16 @@ async def get_bot_status(session_id: str):
         
         bot = bot_instances[session_id]
         logs = bot_logs.get(session_id, [])
-        current_response = bot_responses.get(session_id, "")
-        
-        # Determine status based on bot state
-        status = "idle"
-        if bot.driver is None:
-            status = "created"
-        elif current_response and not current_response.startswith("[WARNING"):
-            status = "completed"
-        elif current_response:
-            status = "processing"
+        current_response = bot_responses[session_id].text() if session_id in bot_responses else ""
         
         return StatusResponse(
             session_id=session_id,
-            status=status,
+            status=session_status(session_id, bot),
             logs=logs,
-            current_response=current_response if current_response else None
+            current_response=current_response if current_response else None,
+            conversation_id=bot.conversation_id,
+            recoveries=bot.recovery_events,
+            retry_after=parked_for(bot) or None
         )
         
     except HTTPException:
@@ -331,7 +691,7 @@ async def get_bot_status(session_id: str):
         raise HTTPException(status_code=500, detail=f"Error getting status: {str(e)}")
 
 @app.post("/bot/close", response_model=BrowserActionResponse)
-async def close_browser(request: BrowserActionRequest, background_tasks: BackgroundTasks):
+async def close_browser(request: BrowserActionRequest):
     """Close browser for a bot session"""
     try:
         session_id = request.session_id
@@ -342,9 +702,9 @@ async def close_browser(request: BrowserActionRequest, background_tasks: Backgro
         bot = bot_instances[session_id]
         
         def close_task():
-            bot.close_browser()
+            release_or_close_browser(bot)
         
-        background_tasks.add_task(close_task)
+        run_in_background(session_id, close_task)
         
         return BrowserActionResponse(
             session_id=session_id,
@@ -366,11 +726,17 @@ async def delete_bot_session(session_id: str):
         
         bot = bot_instances[session_id]
         
-        # Close browser if still open
+        # Close browser if still open; a persistent profile stays on disk for the next session with this ID
         if bot.driver:
-            bot.close_browser()
-        
-        # Clean up session data
+            await browser_executor.run(session_id, release_or_close_browser, bot)
+        
+        # Clean up session data; open event streams end with the "closed" event
+        browser_supervisor.unregister(bot)
+        publish_event(session_id, "closed", {"session_id": session_id})
+        bot_events.pop(session_id, None)
+        bot_jobs.pop(session_id, None)
+        with session_jobs_lock:
+            session_jobs.pop(session_id, None)
         del bot_instances[session_id]
         if session_id in bot_responses:
             del bot_responses[session_id]
@@ -384,25 +750,212 @@ async def delete_bot_session(session_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting session: {str(e)}")
 
+def stream_snapshot(session_id: str, job_id: Optional[str]) -> dict:
+    """State of a session for a client that starts streaming or missed too many events"""
+    bot = bot_instances[session_id]
+    return {
+        "job_id": bot_jobs.get(session_id),
+        "status": session_status(session_id, bot),
+        "response": bot_responses[session_id].text() if session_id in bot_responses else "",
+        "conversation_id": bot.conversation_id
+    }
+
+def finished_job_event(session_id: str, job_id: str):
+    """Return the (event ID, kind, data) of the event that ended a job, None while it runs"""
+    with session_jobs_lock:
+        return session_jobs.get(session_id, {}).get(job_id)
+
+async def session_event_stream(session_id: str, job_id: Optional[str], request: Request,
+                               last_event_id: Optional[str]):
+    """Yield the session's events as SSE, resuming after last_event_id
+
+    A job stream ends with the job's "done" event, or its "routed" event when
+    a fallback session took over the question.
+    """
+    events = bot_events[session_id]
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+    
+    resumable = last_id is not None and last_id <= events.last_id and events.since(last_id)[1]
+    if job_id:
+        finished = finished_job_event(session_id, job_id)
+        if finished and not resumable:
+            yield format_sse(*finished)
+            return
+        if finished and finished[0] <= last_id:
+            return  # the client already got the end of the job
+    if not resumable:
+        # Nothing to resume from: start with the current state
+        last_id = events.last_id
+        yield format_sse(last_id, "snapshot", stream_snapshot(session_id, job_id))
+    
+    while True:
+        pending, complete = events.since(last_id)
+        if not complete:
+            # This client fell behind further than the event log reaches
+            finished = finished_job_event(session_id, job_id) if job_id else None
+            if finished:
+                yield format_sse(*finished)
+                return
+            last_id = events.last_id
+            yield format_sse(last_id, "snapshot", stream_snapshot(session_id, job_id))
+            continue
+        for event_id, kind, data in pending:
+            last_id = event_id
+            if job_id and data.get("job_id") != job_id and kind != "closed":
+                continue
+            yield format_sse(event_id, kind, data)
+            if kind == "closed" or (job_id and kind in ("done", "routed")):
+                return
+        if bot_events.get(session_id) is not events or await request.is_disconnected():
+            return
+        if not pending:
+            await events.wait(last_id, SSE_KEEPALIVE)
+            if events.last_id == last_id:
+                yield ": keep-alive\n\n"
+
+def event_stream_response(session_id: str, job_id: Optional[str], request: Request,
+                          last_event_id: Optional[str]) -> StreamingResponse:
+    if session_id not in bot_events:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    if job_id:
+        with session_jobs_lock:
+            known = job_id in session_jobs.get(session_id, {})
+        if not known:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found in session {session_id}")
+    return StreamingResponse(
+        session_event_stream(session_id, job_id, request, last_event_id),
+        media_type="text/event-stream",
+        # X-Accel-Buffering keeps nginx from collecting events before passing them on
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/bot/stream/{session_id}")
+async def stream_session(session_id: str, request: Request, last_event_id: Optional[str] = Header(None)):
+    """Stream response deltas, status changes and log lines of a session as Server-Sent Events"""
+    return event_stream_response(session_id, None, request, last_event_id)
+
+@app.get("/bot/stream/{session_id}/{job_id}")
+async def stream_job(session_id: str, job_id: str, request: Request, last_event_id: Optional[str] = Header(None)):
+    """Stream the events of one question as Server-Sent Events, ending when it is answered"""
+    return event_stream_response(session_id, job_id, request, last_event_id)
+
+@app.get("/health")
+async def health():
+    """Liveness of the API itself; never waits for a browser"""
+    return {"status": "healthy", "sessions": len(bot_instances), "executor": browser_executor.stats()}
+
+@app.get("/bot/pool")
+async def get_pool_status():
+    """Get warm browser pool status"""
+    if not browser_pool:
+        return {"enabled": False}
+    return dict(browser_pool.stats(), enabled=True)
+
+@app.get("/bot/conversations/{session_id}")
+async def list_conversations(session_id: str):
+    """List the conversations a session answered in, by conversation ID"""
+    if session_id not in bot_instances:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    bot = bot_instances[session_id]
+    return {"session_id": session_id, "current": bot.conversation_id, "conversations": bot.conversations}
+
+def read_structured_answer(bot: ChatGPTBot):
+    """Read the newest answer as structured blocks while no other task uses the browser"""
+    with bot.browser_lock:
+        return bot.extract_structured_response()
+
+@app.get("/bot/answer/{session_id}")
+async def get_structured_answer(session_id: str, format: str = "json", key: Optional[str] = None):
+    """Get an answer as structured JSON or as markdown; the latest one unless a turn key is given"""
+    if session_id not in bot_instances:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    if format not in ("json", "markdown"):
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    bot = bot_instances[session_id]
+    
+    if key is not None:
+        document = bot.structured_answers.get(key)
+    else:
+        document = bot.last_structured_answer
+        if document is None and bot.driver:
+            # Structured extraction is off for this session, read the newest answer now
+            try:
+                document = await browser_executor.run(session_id, read_structured_answer, bot)
+            except Exception as e:
+                if is_browser_crash(e):
+                    raise HTTPException(status_code=503, detail=f"Browser of session {session_id} is not responding")
+                reason = (getattr(e, "msg", None) or str(e) or type(e).__name__).splitlines()[0]
+                raise HTTPException(status_code=503, detail=f"Could not read the answer from the page: {reason}")
+    if document is None:
+        raise HTTPException(status_code=404, detail="No structured answer available")
+    
+    if format == "markdown":
+        return Response(content=structured_to_markdown(document), media_type="text/markdown")
+    return document
+
+@app.get("/bot/saved_states")
+async def list_saved_states():
+    """List saved browser states by session ID"""
+    return {"location": state_store.location, "states": await run_in_threadpool(state_store.list)}
+
+@app.post("/bot/saved_states/copy")
+async def copy_saved_state(request: StateCopyRequest):
+    """Copy the saved browser state of one session ID to another"""
+    try:
+        copied = await run_in_threadpool(state_store.copy, request.source, request.target)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not copied:
+        raise HTTPException(status_code=404, detail=f"No saved state for {request.source}")
+    return {"message": f"Saved state of {request.source} copied to {request.target}"}
+
+@app.delete("/bot/saved_states/{session_id}")
+async def delete_saved_state(session_id: str):
+    """Delete the saved browser state of a session ID"""
+    try:
+        deleted = await run_in_threadpool(state_store.delete, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"No saved state for {session_id}")
+    return {"message": f"Saved state of {session_id} deleted"}
+
+@app.get("/admin/selectors")
+async def get_selectors(x_admin_token: Optional[str] = Header(None)):
+    """Get the page selectors in use with their hit counts and lookup times"""
+    check_admin_token(x_admin_token)
+    return selector_registry.stats()
+
+@app.post("/admin/selectors/reload")
+async def reload_selectors(x_admin_token: Optional[str] = Header(None)):
+    """Reload page selectors from the config file; running browsers use them from their next lookup"""
+    check_admin_token(x_admin_token)
+    try:
+        changed = await run_in_threadpool(selector_registry.reload)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Selectors not reloaded: {e}")
+    return {"version": selector_registry.version, "changed": changed}
+
 @app.get("/bot/sessions")
 async def list_sessions():
     """List all active bot sessions"""
     sessions = []
     for session_id, bot in bot_instances.items():
-        status = "idle"
-        if bot.driver is None:
-            status = "created"
-        elif bot_responses.get(session_id):
-            status = "completed"
-        
         sessions.append({
             "session_id": session_id,
-            "status": status,
-            "browser_active": bot.driver is not None,
+            "status": session_status(session_id, bot),
+            "browser_active": bot.driver is not None and not bot.crashed,
+            "recoveries": len(bot.recovery_events),
+            "questions_on_browser": bot.questions_asked,
+            "retry_after": parked_for(bot) or None,
             "logs_count": len(bot_logs.get(session_id, []))
         })
     
-    return {"sessions": sessions, "total": len(sessions)}
+    return {"sessions": sessions, "total": len(sessions), "supervisor": browser_supervisor.stats(),
+            "recycler": browser_recycler.stats()}
 
 if __name__ == "__main__":
     print("🚀 Starting ChatGPT Bot API Server...")
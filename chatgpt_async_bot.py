@@ -0,0 +1,256 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from chatgpt_bot_core import ChatGPTBot
+from chatgpt_usage_limits import UsageLimitError
+
+# Upper bound on WebDriver calls in flight at once across all async bots
+BROWSER_WORKERS = int(os.environ.get("CHATGPT_BROWSER_WORKERS", "8"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def shared_browser_executor():
+    """Return the bounded thread pool that runs blocking browser calls, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=BROWSER_WORKERS, thread_name_prefix="browser")
+        return _executor
+
+
+class BrowserExecutor:
+    """Runs blocking browser calls on the bounded browser executor, one call per browser at a time
+
+    Calls are queued per key (e.g. a session ID) and handed to the thread
+    pool only once the previous call for that key has finished. A call
+    waiting for its browser therefore never holds a worker thread, and a
+    session with many queued questions cannot starve the others; the pool
+    size bounds how many browsers work at once.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor or shared_browser_executor()
+        self.lock = threading.Lock()
+        self.queues = {}  # key -> calls waiting behind the dispatched one; present while a call for key is dispatched
+        self.dispatched = 0  # handed to the thread pool, running or waiting for a free worker
+        self.running = 0
+
+    def submit(self, key, function, *args):
+        """Queue function(*args) behind earlier calls for key; returns a concurrent.futures.Future"""
+        future = Future()
+        with self.lock:
+            if key in self.queues:
+                self.queues[key].append((future, function, args))
+                return future
+            self.queues[key] = deque()
+        self._dispatch(key, future, function, args)
+        return future
+
+    async def run(self, key, function, *args):
+        """Await function(*args) run behind earlier calls for key"""
+        return await asyncio.wrap_future(self.submit(key, function, *args))
+
+    def stats(self):
+        """Return the pool size and the number of running and waiting calls"""
+        with self.lock:
+            return {
+                "max_workers": self.executor._max_workers,
+                "running": self.running,
+                "waiting": self.dispatched - self.running + sum(len(queue) for queue in self.queues.values()),
+                "busy_keys": len(self.queues)
+            }
+
+    def _dispatch(self, key, future, function, args):
+        with self.lock:
+            self.dispatched += 1
+        self.executor.submit(self._call, key, future, function, args)
+
+    def _call(self, key, future, function, args):
+        with self.lock:
+            self.running += 1
+        # A call cancelled while queued (e.g. its client went away) is skipped
+        result, error = None, None
+        started = future.set_running_or_notify_cancel()
+        if started:
+            try:
+                result = function(*args)
+            except BaseException as e:
+                error = e
+        with self.lock:
+            self.running -= 1
+            self.dispatched -= 1
+            queue = self.queues[key]
+            if queue:
+                following = queue.popleft()
+            else:
+                del self.queues[key]
+                following = None
+        # Resolved only now, so whoever awaits the call sees the executor without it
+        if started:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        if following:
+            self._dispatch(key, *following)
+
+
+class AsyncChatGPTBot:
+    """asyncio interface to ChatGPTBot
+
+    Every WebDriver call still blocks, so each one runs on a bounded
+    executor shared by all async bots. The waits between answer polls are
+    asyncio.sleep calls, so a worker thread is only busy while a browser
+    command is in flight and one event loop can drive many browsers.
+    Calls on one bot are serialized, since a browser serves one command at
+    a time. In "observer" stream mode the wait happens inside the page and
+    keeps a worker busy until the answer is complete.
+
+    Keyword arguments are passed to ChatGPTBot.
+    """
+
+    def __init__(self, executor=None, **bot_options):
+        self.executor = executor or shared_browser_executor()
+        self.delta_callback = bot_options.pop("delta_callback", None)
+        self.bot = ChatGPTBot(delta_callback=self.on_delta, **bot_options)
+        self.lock = asyncio.Lock()
+        self.listeners = []  # (event loop, asyncio.Queue) pairs of running stream() calls
+        self.last_answer = None
+        self.in_flight = None  # concurrent Future of the latest blocking call, which may outlive a cancelled await
+
+    def on_delta(self, offset, text):
+        """Forward a response delta from the worker thread to the streams and the user callback"""
+        if self.delta_callback:
+            self.delta_callback(offset, text)
+        for loop, queue in list(self.listeners):
+            loop.call_soon_threadsafe(queue.put_nowait, (offset, text))
+
+    async def run(self, function, *args):
+        """Run a blocking ChatGPTBot call on the browser executor"""
+        self.in_flight = self.executor.submit(function, *args)
+        return await asyncio.wrap_future(self.in_flight)
+
+    async def acquire_browser(self):
+        """Take the bot's browser lock without blocking the event loop
+
+        The lock is taken on a worker thread. If the wait is cancelled, the
+        lock is released again as soon as that thread gets it.
+        """
+        future = self.executor.submit(self.bot.browser_lock.acquire)
+        try:
+            await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            if not future.cancel():
+                future.add_done_callback(self.release_acquired)
+            raise
+
+    def release_acquired(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self.bot.browser_lock.release()
+
+    def release_browser(self):
+        """Release the browser lock once the blocking call still running on it, if any, has returned"""
+        if self.in_flight is None or self.in_flight.done():
+            self.bot.browser_lock.release()
+        else:
+            # A cancelled question: the worker thread is still driving the browser
+            self.in_flight.add_done_callback(lambda future: self.bot.browser_lock.release())
+
+    async def launch(self):
+        """Launch the browser"""
+        async with self.lock:
+            return await self.run(self.bot.launch_browser)
+
+    async def load_state(self):
+        """Open ChatGPT with the saved browser state"""
+        async with self.lock:
+            return await self.run(self.bot.load_browser_state)
+
+    async def save_state(self):
+        """Save the browser state"""
+        async with self.lock:
+            return await self.run(self.bot.save_browser_state)
+
+    async def close(self):
+        """Close the browser"""
+        async with self.lock:
+            return await self.run(self.bot.close_browser)
+
+    async def ask(self, query, conversation_id=None):
+        """Ask a question and return the complete answer; conversation_id and UsageLimitError as in ChatGPTBot"""
+        async with self.lock:
+            self.last_answer = await self.ask_unlocked(query, conversation_id)
+            return self.last_answer
+
+    async def ask_unlocked(self, query, conversation_id=None):
+        """Ask a question; callers hold self.lock"""
+        bot = self.bot
+        await self.acquire_browser()
+        try:
+            # A browser that dies on the way is recovered and asked once more, as in ChatGPTBot.run_question
+            thread = conversation_id if conversation_id is not None else bot.conversation_id
+            try:
+                return await self.wait_for_answer(query, conversation_id)
+            except (asyncio.CancelledError, UsageLimitError):
+                raise
+            except Exception as e:
+                if not bot.question_failed(e) or not await self.run(bot.recover_browser, e):
+                    return None
+            bot.log_status("Asking the question again after the browser recovered")
+            try:
+                return await self.wait_for_answer(query, thread)
+            except (asyncio.CancelledError, UsageLimitError):
+                raise
+            except Exception as e:
+                bot.question_failed(e)
+                return None
+        finally:
+            self.release_browser()
+
+    async def wait_for_answer(self, query, conversation_id=None):
+        """Send the question and wait for the answer, raising any error; callers hold the browser lock"""
+        bot = self.bot
+        question = await self.run(bot.start_question, query, conversation_id)
+        if question is None:
+            return None
+        if question.observed:
+            return await self.run(bot.wait_for_response_with_observer, question.baseline_notice)
+        while True:
+            delay = await self.run(bot.poll_question, question)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        return await self.run(bot.finish_question, question)
+
+    async def stream(self, query, conversation_id=None):
+        """Ask a question and yield (offset, text) deltas of the answer as they arrive
+
+        Apply a delta by dropping everything from offset on, then appending
+        text. The complete answer is in last_answer once the iteration ends.
+        """
+        listener = (asyncio.get_running_loop(), asyncio.Queue())
+        self.listeners.append(listener)
+        task = asyncio.ensure_future(self.ask(query, conversation_id))
+        queue = listener[1]
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait([getter, task], return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                # Deltas scheduled right before the answer finished are still on their way
+                await asyncio.sleep(0)
+                while not queue.empty():
+                    yield queue.get_nowait()
+                break
+            task.result()
+        finally:
+            self.listeners.remove(listener)
+            if not task.done():
+                task.cancel()
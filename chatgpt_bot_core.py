@@ -1,22 +1,266 @@
 # pip install selenium webdriver-manager
-import os, time, json, pickle
+import os, re, time, json, pickle, threading
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException
+from chatgpt_driver_resolver import resolve_chromedriver
+from chatgpt_page_scripts import (
+    OBSERVER_INSTALL_SCRIPT, OBSERVER_DRAIN_SCRIPT, OBSERVER_UNINSTALL_SCRIPT,
+    PROBE_INSTALL_SCRIPT, PROBE_CALL_SCRIPT, STORAGE_RESTORE_SCRIPT, STORAGE_RESTORE_ON_LOAD_SCRIPT,
+    PAGE_READY_SCRIPT, PAGE_MARK_STALE_SCRIPT, STORAGE_CAPTURE_SCRIPT, STORAGE_CLEAR_SCRIPT,
+    PROMPT_SELECT_SCRIPT, PROMPT_READ_SCRIPT, PROMPT_SET_SCRIPT, STRUCTURE_EXTRACT_SCRIPT, NOTICE_READ_SCRIPT
+)
+from chatgpt_browser_supervisor import is_browser_crash
+from chatgpt_network_monitor import ConversationStreamMonitor
+from chatgpt_process_stats import process_tree_rss
+from chatgpt_selectors import selector_registry
+from chatgpt_state_store import DirectoryStateStore
+from chatgpt_usage_limits import UsageLimitError, classify_notice, RATE_LIMIT, DEFAULT_RETRY_AFTER
+from chatgpt_wait_strategy import (
+    AdaptiveWaitStrategy, WAITING, GENERATING, SETTLING, COMPLETE, TIMEOUT
+)
+
+
+# A line break with the trailing spaces and blank lines around it, as composers render paragraphs differently
+NEWLINE_RUN = re.compile(r"[ \t]*\r?\n(?:[ \t]*\r?\n)*")
+
+
+def same_prompt_text(text, query):
+    """Return True if the composer text matches query up to blank lines, trailing spaces and nbsp"""
+    def normalise(value):
+        return NEWLINE_RUN.sub("\n", (value or "").replace("\u00a0", " ").strip())
+    return normalise(text) == normalise(query)
+
+
+def common_prefix_length(first, second):
+    """Return the length of the longest common prefix, comparing slices instead of characters"""
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def to_cdp_cookie(cookie):
+    """Convert a cookie from driver.get_cookies() to a DevTools Network.CookieParam"""
+    converted = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False)
+    }
+    if cookie.get("domain"):
+        converted["domain"] = cookie["domain"]
+    else:
+        converted["url"] = ChatGPTBot.CHATGPT_URL
+    if "expiry" in cookie:
+        converted["expires"] = cookie["expiry"]
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        converted["sameSite"] = cookie["sameSite"]
+    return converted
+
+
+class ResponseLineTracker:
+    """Logs each completed line of a streaming answer exactly once"""
+
+    def __init__(self, log_line):
+        self.log_line = log_line  # called as log_line(line, line_number)
+        self.reset()
+
+    def reset(self):
+        """Forget everything seen so far, e.g. before a new question"""
+        self.completed_text = ""  # answer prefix up to and including the last completed line
+        self.line_count = 0       # number of lines in completed_text
+
+    def feed(self, text):
+        """Log the lines of text that were completed since the previous call"""
+        end = text.rfind('\n') + 1
+        if text.startswith(self.completed_text):
+            if end <= len(self.completed_text):
+                return
+            first_line = self.line_count + 1
+            new_lines = text[len(self.completed_text):end - 1].split('\n')
+        else:
+            # Earlier text was rewritten - keep the numbering and skip lines already logged
+            lines = text[:end - 1].split('\n') if end else []
+            first_line = self.line_count + 1
+            new_lines = lines[self.line_count:]
+            self.line_count = min(self.line_count, len(lines))
+        self._log_lines(new_lines, first_line)
+        self.line_count += len(new_lines)
+        self.completed_text = text[:end]
+
+    def flush(self, text):
+        """Log the remaining lines, including a final line without a newline"""
+        self.feed(text)
+        if text.startswith(self.completed_text):
+            tail = text[len(self.completed_text):]
+            if tail:
+                self._log_lines([tail], self.line_count + 1)
+                self.line_count += 1
+                self.completed_text = text
+
+    def _log_lines(self, lines, first_line):
+        for line_num, line in enumerate(lines, first_line):
+            if line.strip():  # Only log non-empty lines
+                self.log_line(line.strip(), line_num)
+
+
+class QuestionState:
+    """Progress of one question between ChatGPTBot.start_question and finish_question"""
+
+    def __init__(self, query, baseline_turns=0, observed=False, baseline_notice=""):
+        self.query = query
+        self.baseline_turns = baseline_turns    # assistant turns on the page before the question
+        self.observed = observed                # answer is buffered by the response observer
+        self.baseline_notice = baseline_notice  # usage-limit notice already on the page before the question
+        self.page_text = ""
+        self.current_text = ""
+        self.generating = False
+        self.phase = None
+        self.appeared = False
+        self.completed = False
+        self.probe = None  # last probe that found answer text, for selector statistics
 
 
 class ChatGPTBot:
-    def __init__(self, status_callback=None, response_callback=None):
+    CHATGPT_URL = "https://chatgpt.com"
+
+    # Conversation pages are .../c/<conversation id>; NEW_CONVERSATION asks for a fresh chat
+    CONVERSATION_ID_PATTERN = re.compile(r"[A-Za-z0-9-]+")
+    CONVERSATION_URL_PATTERN = re.compile(r"/c/([A-Za-z0-9-]+)")
+    NEW_CONVERSATION = "new"
+
+    WAIT_PHASE_MESSAGES = {
+        WAITING: "Waiting for response to appear...",
+        GENERATING: "Response is being generated...",
+        SETTLING: "Response text is settling...",
+        COMPLETE: "Response appears to be complete!",
+        TIMEOUT: "Stopped waiting for the response"
+    }
+
+    # "poll" queries the DOM over WebDriver,
+    # "observer" buffers changes in the page with a MutationObserver,
+    # "network" polls the DOM for text but ends the wait when the answer's HTTP stream closes
+    STREAM_MODES = ("poll", "observer", "network")
+
+    # "standard" starts a full headed Chrome,
+    # "lean" starts headless Chrome with fewer processes and without images, media, fonts and telemetry
+    LAUNCH_MODES = ("standard", "lean")
+
+    LEAN_ARGUMENTS = [
+        "--headless=new",
+        "--window-size=1280,900",
+        "--disable-gpu",
+        "--renderer-process-limit=2",
+        "--disable-background-networking",
+        "--disable-background-timer-throttling",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-features=Translate,MediaRouter,OptimizationHints,InterestFeedContentSuggestions",
+        "--metrics-recording-only",
+        "--mute-audio",
+        "--no-first-run",
+        "--blink-settings=imagesEnabled=false"
+    ]
+    LEAN_BLOCKED_URLS = [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico",
+        "*.mp4", "*.webm", "*.mp3", "*.wav",
+        "*.woff", "*.woff2", "*.ttf", "*.otf",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*browser-intake-datadoghq.com*", "*sentry.io*", "*segment.io*", "*intercom.io*",
+        "*featuregates.org*", "*statsigapi.net*", "*ab.chatgpt.com*"
+    ]
+
+    # "insert" puts the whole prompt into the composer in one call and then submits it,
+    # "type" sends it as key presses (slow for long prompts, newlines submit early)
+    INPUT_MODES = ("insert", "type")
+
+    # How answer text is read: "innerText" keeps the rendered line breaks between blocks,
+    # "textContent" skips layout and is cheaper but joins paragraphs without newlines
+    TEXT_SOURCES = ("innerText", "textContent")
+
+    # Structured answers kept per bot, oldest dropped first
+    STRUCTURED_CACHE_SIZE = 50
+
+    # Browser recoveries kept in recovery_events, oldest dropped first
+    RECOVERY_HISTORY = 20
+
+    def __init__(self, status_callback=None, response_callback=None, stream_mode="poll", delta_callback=None,
+                 wait_strategy=None, launch_mode="standard", profile_dir=None, page_ready_timeout=15,
+                 prompt_timeout=15, state_store=None, state_namespace="default", input_mode="insert",
+                 text_source="innerText", extract_structure=False, selectors=None, auto_recover=True,
+                 recovery_callback=None):
+        if stream_mode not in self.STREAM_MODES:
+            raise ValueError(f"Unknown stream mode: {stream_mode}")
+        if launch_mode not in self.LAUNCH_MODES:
+            raise ValueError(f"Unknown launch mode: {launch_mode}")
+        if input_mode not in self.INPUT_MODES:
+            raise ValueError(f"Unknown input mode: {input_mode}")
+        if text_source not in self.TEXT_SOURCES:
+            raise ValueError(f"Unknown text source: {text_source}")
         self.driver = None
         self.wait = None
+        # Saved cookies and storage live under state_namespace in the state store (see chatgpt_state_store.py)
+        self.state_store = state_store or DirectoryStateStore()
+        self.state_namespace = self.state_store.check_namespace(state_namespace)
+        # Files written by older versions, imported into the store once
         self.cookies_file = "chatgpt_cookies.pkl"
         self.session_file = "chatgpt_session.json"
         self.status_callback = status_callback
         self.response_callback = response_callback
+        # delta_callback(offset, appended_text): drop everything from offset on, then append
+        self.delta_callback = delta_callback
+        self.emitted_response = ""
+        self.line_tracker = ResponseLineTracker(self.log_response_line)
+        self.stream_mode = stream_mode
+        self.launch_mode = launch_mode
+        self.input_mode = input_mode
+        self.text_source = text_source
+        # Page selectors, read on every use so a reloaded registry applies at once (see chatgpt_selectors.py)
+        self.selectors = selectors or selector_registry
+        # With extract_structure, every complete answer is also read as structured blocks
+        self.extract_structure = extract_structure
+        self.structured_answers = {}  # turn key -> structured answer document
+        self.last_structured_answer = None
+        self.last_input_seconds = None
+        # Conversation ID -> URL of every thread this bot answered in, saved with the browser state
+        self.conversations = {}
+        self.conversation_id = None
+        # Chrome --user-data-dir kept between runs; cookies and storage then persist without replay
+        self.profile_dir = os.path.abspath(profile_dir) if profile_dir else None
+        # Decides poll pace and completion, see chatgpt_wait_strategy.py
+        self.wait_strategy = wait_strategy or AdaptiveWaitStrategy()
+        self.stream_monitor = ConversationStreamMonitor() if stream_mode == "network" else None
+        self.last_stream_timing = None
+        self.last_launch_timing = None
+        # Seconds to wait for a navigation to finish and for the chat prompt (or login button) to appear
+        self.page_ready_timeout = page_ready_timeout
+        self.prompt_timeout = prompt_timeout
+        self.last_load_timing = None
+        # Held while a question runs, so background state capture never interleaves with it.
+        # A plain Lock, so an async caller may release it from another worker thread.
+        self.browser_lock = threading.Lock()
+        # With auto_recover, a browser that died is relaunched from the saved state (see recover_browser)
+        self.auto_recover = auto_recover
+        self.recovery_callback = recovery_callback
+        self.recovery_events = []
+        self.crashed = False
+        # Age and workload of the current browser, for recycling (see chatgpt_browser_recycler.py)
+        self.browser_started_at = None
+        self.questions_asked = 0
+        # UsageLimitError of the last refused question; questions fail fast until it lifts
+        self.usage_limit = None
         
     def log_status(self, message):
         """Log status message via callback if provided"""
@@ -29,8 +273,24 @@ class ChatGPTBot:
         """Update response display via callback if provided"""
         if self.response_callback:
             self.response_callback(text)
-        else:
+        elif not self.delta_callback:
             print(f"Response: {text}")
+        self.emit_response_delta(text)
+
+    def emit_response_delta(self, text):
+        """Send only the part of text that was not emitted yet to the delta callback"""
+        if not self.delta_callback:
+            return
+        previous = self.emitted_response
+        if text.startswith(previous):
+            offset = len(previous)
+        else:
+            # The tail was rewritten (e.g. re-rendered markdown): resend from the first changed character
+            offset = common_prefix_length(previous, text)
+        appended = text[offset:]
+        self.emitted_response = text
+        if appended or offset < len(previous):
+            self.delta_callback(offset, appended)
 
     def log_response_line(self, line, line_number=None):
         """Log individual response line"""
@@ -39,59 +299,326 @@ class ChatGPTBot:
         else:
             self.log_status(f"Response line: {line[:100]}{'...' if len(line) > 100 else ''}")
 
+    def launch_profile(self):
+        """Describe the launch settings a browser needs to serve this bot
+
+        Browsers launched for equal profiles are interchangeable, which is
+        what lets BrowserPool hand a pre-launched browser to this bot.
+        """
+        return {
+            "network_events": self.stream_monitor is not None,
+            "launch_mode": self.launch_mode,
+            "profile_dir": self.profile_dir
+        }
+
+    def attach_browser(self, driver):
+        """Take over an already launched browser, e.g. one leased from a BrowserPool"""
+        self.driver = driver
+        self.wait = WebDriverWait(self.driver, 30)
+        self.browser_started_at = time.time()
+        self.questions_asked = 0
+        self.log_status("Browser attached successfully")
+
+    def launch_standby(self):
+        """Launch a second browser with the launch settings and saved state of this bot
+
+        The standby browser is opened on the conversation this bot is in.
+        Returns the ChatGPTBot holding it, or None if it could not be
+        launched. Hand it over with swap_browser().
+        """
+        standby = ChatGPTBot(
+            status_callback=lambda message: self.log_status(f"[standby] {message}"),
+            response_callback=lambda text: None,
+            stream_mode=self.stream_mode,
+            launch_mode=self.launch_mode,
+            page_ready_timeout=self.page_ready_timeout,
+            prompt_timeout=self.prompt_timeout,
+            state_store=self.state_store,
+            state_namespace=self.state_namespace,
+            selectors=self.selectors,
+            auto_recover=False
+        )
+        if not standby.launch_browser():
+            return None
+        if not standby.load_browser_state():
+            standby.close_browser()
+            return None
+        conversation_id = self.conversation_id
+        if conversation_id:
+            standby.conversations = dict(self.conversations)
+            try:
+                standby.open_conversation(conversation_id)
+            except Exception as e:
+                standby.log_status(f"Could not open conversation {conversation_id}: {e}")
+        return standby
+
+    def swap_browser(self, standby):
+        """Take over the browser of a standby bot and close the current one; callers hold browser_lock"""
+        old_driver = self.detach_browser()
+        self.attach_browser(standby.detach_browser())
+        if standby.conversation_id != self.conversation_id:
+            # The conversation changed while the standby browser was loading
+            self.open_conversation(self.conversation_id or self.NEW_CONVERSATION)
+        if old_driver:
+            try:
+                old_driver.quit()
+            except Exception as e:
+                self.log_status(f"Error closing replaced browser: {e}")
+
+    def detach_browser(self):
+        """Give up the browser without closing it and return its driver"""
+        driver = self.driver
+        self.driver = None
+        self.wait = None
+        return driver
+
     def launch_browser(self):
         """Launch Chrome browser with optimized settings"""
         try:
             self.log_status("Launching browser...")
             
             options = webdriver.ChromeOptions()
+            # Return from navigations at DOMContentLoaded; readiness is then checked explicitly
+            options.page_load_strategy = "eager"
             options.add_argument("--disable-blink-features=AutomationControlled")
             options.add_experimental_option("excludeSwitches", ["enable-automation"])
             options.add_experimental_option('useAutomationExtension', False)
             options.add_argument("--disable-extensions")
             options.add_argument("--no-sandbox")
             options.add_argument("--disable-dev-shm-usage")
+            if self.profile_dir:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                options.add_argument(f"--user-data-dir={self.profile_dir}")
+                self.log_status(f"Using persistent browser profile {self.profile_dir}")
+            if self.launch_mode == "lean":
+                for argument in self.LEAN_ARGUMENTS:
+                    options.add_argument(argument)
+                options.add_experimental_option("prefs", {
+                    "profile.managed_default_content_settings.images": 2,
+                    "profile.default_content_setting_values.notifications": 2
+                })
+            if self.stream_monitor:
+                # Relay CDP Network events through the performance log
+                options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+                options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
 
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+            # Resolved once per process and cached per Chrome version, see chatgpt_driver_resolver.py
+            started = time.time()
+            driver_path = resolve_chromedriver(self.log_status)
+            resolved = time.time()
+            service = Service(driver_path) if driver_path else Service()
+            self.driver = webdriver.Chrome(service=service, options=options)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             self.wait = WebDriverWait(self.driver, 30)
+            self.crashed = False
+            self.browser_started_at = time.time()
+            self.questions_asked = 0
+            if self.launch_mode == "lean":
+                self.apply_lean_settings()
             
-            self.log_status("Browser launched successfully")
+            self.last_launch_timing = {
+                "driver_resolve": round(resolved - started, 3),
+                "browser_start": round(time.time() - resolved, 3)
+            }
+            self.log_status(
+                f"Browser launched successfully in {time.time() - started:.2f}s "
+                f"(driver resolved in {self.last_launch_timing['driver_resolve']:.2f}s)"
+            )
             return True
             
         except Exception as e:
             self.log_status(f"Error launching browser: {e}")
             return False
             
+    def apply_lean_settings(self):
+        """Block heavy and telemetry requests and hide the headless user agent"""
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.LEAN_BLOCKED_URLS})
+            user_agent = self.driver.execute_script("return navigator.userAgent")
+            self.driver.execute_cdp_cmd("Network.setUserAgentOverride", {
+                "userAgent": user_agent.replace("HeadlessChrome", "Chrome")
+            })
+        except Exception as e:
+            self.log_status(f"Could not apply lean browser settings: {e}")
+
+    def browser_rss(self):
+        """Return the resident memory of the browser's process tree in bytes (Linux only), or None"""
+        try:
+            return process_tree_rss(self.driver.service.process.pid)
+        except Exception:
+            return None
+
+    def capture_browser_state(self):
+        """Return (cookies, session data) of the open page, or None when there is nothing to capture
+
+        The session data includes the conversation map. Callers hold browser_lock.
+        """
+        if not self.driver:
+            return None
+        conversations = dict(self.conversations)
+        if self.profile_dir:
+            # Chrome keeps cookies and storage in the profile, only the conversation map is ours to save
+            return [], {"conversations": conversations}
+        cookies = self.driver.get_cookies()
+        session_data = self.driver.execute_script(STORAGE_CAPTURE_SCRIPT)
+        return cookies, dict(session_data, conversations=conversations)
+
+    def write_browser_state(self, cookies, session_data):
+        """Write captured state to this bot's namespace of the state store"""
+        session_data = dict(session_data, conversations=dict(self.conversations))
+        self.state_store.save(self.state_namespace, cookies, session_data)
+
     def save_browser_state(self):
         """Save cookies and session data"""
         try:
             if not self.driver:
                 self.log_status("No browser instance to save state from")
                 return False
-                
-            # Save cookies
-            cookies = self.driver.get_cookies()
-            with open(self.cookies_file, 'wb') as f:
-                pickle.dump(cookies, f)
-            self.log_status(f"Cookies saved to {self.cookies_file}")
-            
-            # Save session data (localStorage and sessionStorage)
-            session_data = {
-                'localStorage': self.driver.execute_script("return Object.assign({}, localStorage);"),
-                'sessionStorage': self.driver.execute_script("return Object.assign({}, sessionStorage);"),
-                'current_url': self.driver.current_url
-            }
-            
-            with open(self.session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2)
-            self.log_status(f"Session data saved to {self.session_file}")
+
+            with self.browser_lock:
+                cookies, session_data = self.capture_browser_state()
+            self.write_browser_state(cookies, session_data)
+            self.log_status(f"Browser state saved to {self.state_store.describe(self.state_namespace)}")
             return True
             
         except Exception as e:
             self.log_status(f"Error saving browser state: {e}")
             return False
 
+    def read_saved_state(self):
+        """Return the saved cookies and session data, empty when nothing was saved
+
+        A namespace without saved state starts from a copy of the "default"
+        one, so the sessions of an upgraded installation stay logged in with
+        the state saved before namespaces existed.
+        """
+        saved = self.state_store.load(self.state_namespace)
+        if saved is None:
+            self.import_legacy_state()
+            if self.state_namespace != "default" and self.state_store.copy("default", self.state_namespace):
+                self.log_status(f"Started {self.state_store.describe(self.state_namespace)} from the default state")
+            saved = self.state_store.load(self.state_namespace)
+        if saved is None:
+            return [], {}
+        for conversation_id, url in saved[1].get('conversations', {}).items():
+            self.conversations.setdefault(conversation_id, url)
+        return saved
+
+    def import_legacy_state(self):
+        """Move state saved by older versions (pickled cookies + JSON file) into the "default" namespace"""
+        if self.state_store.load("default") is not None or not (
+                os.path.exists(self.cookies_file) or os.path.exists(self.session_file)):
+            return False
+        cookies = []
+        session_data = {}
+        if os.path.exists(self.cookies_file):
+            with open(self.cookies_file, 'rb') as f:
+                cookies = pickle.load(f)
+        if os.path.exists(self.session_file):
+            with open(self.session_file, 'r', encoding='utf-8') as f:
+                session_data = json.load(f)
+        self.state_store.save("default", cookies, session_data)
+        self.log_status(f"Imported {self.cookies_file} and {self.session_file} into "
+                        f"{self.state_store.describe('default')}")
+        return True
+
+    def storage_state(self, session_data):
+        """Build the argument of the storage restore scripts from saved session data"""
+        url = urlparse(session_data.get('current_url') or self.CHATGPT_URL)
+        return {
+            "origin": f"{url.scheme}://{url.netloc}",
+            "localStorage": session_data.get('localStorage') or {},
+            "sessionStorage": session_data.get('sessionStorage') or {}
+        }
+
+    def restore_saved_state(self):
+        """Restore saved state in bulk before the first page load
+
+        Sets all cookies with one Network.setCookies call and registers one
+        script that fills localStorage and sessionStorage as the page loads,
+        so a single driver.get() opens an already restored session. Returns
+        the identifier of the registered script (or "" when there is no
+        storage to restore), or None when DevTools commands are unavailable.
+        """
+        started = time.time()
+        cookies, session_data = self.read_saved_state()
+        try:
+            if cookies:
+                self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": [to_cdp_cookie(c) for c in cookies]})
+            script_id = ""
+            state = self.storage_state(session_data)
+            storage_keys = len(state["localStorage"]) + len(state["sessionStorage"])
+            if storage_keys:
+                script_id = self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+                    "source": STORAGE_RESTORE_ON_LOAD_SCRIPT % json.dumps(state)
+                })["identifier"]
+        except Exception as e:
+            self.log_status(f"Bulk state restore unavailable, replaying after page load: {e}")
+            return None
+        if cookies or storage_keys:
+            self.log_status(f"Restored {len(cookies)} cookies and {storage_keys} storage keys "
+                            f"in {time.time() - started:.2f}s")
+        return script_id
+
+    def replay_saved_state(self):
+        """Replay saved cookies and storage into the open page, for browsers without DevTools commands"""
+        cookies, session_data = self.read_saved_state()
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception as e:
+                self.log_status(f"Could not add cookie {cookie.get('name', 'unknown')}: {e}")
+        if cookies:
+            self.log_status(f"{len(cookies)} cookies loaded")
+        
+        if session_data:
+            restored = self.driver.execute_script(STORAGE_RESTORE_SCRIPT, self.storage_state(session_data))
+            self.log_status(f"Session data loaded ({restored} storage keys)")
+        
+        if cookies or session_data:
+            # Reload so the page starts with the restored state
+            self.driver.execute_script(PAGE_MARK_STALE_SCRIPT)
+            self.driver.refresh()
+            self.wait_for_page_ready()
+            self.log_status("Page loaded successfully (restored session)")
+        else:
+            self.log_status("Page loaded successfully (fresh session)")
+
+    def apply_saved_state(self):
+        """Replace the cookies and storage of the open page with this bot's saved state, then reload once
+
+        For a browser that was opened on the state of another namespace, e.g.
+        one leased from a BrowserPool. Without saved state the page is left
+        logged out rather than in someone else's session.
+        """
+        try:
+            started = time.time()
+            cookies, session_data = self.read_saved_state()
+            try:
+                self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                if cookies:
+                    self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": [to_cdp_cookie(c) for c in cookies]})
+            except Exception as e:
+                self.log_status(f"Bulk cookie restore unavailable, adding cookies one by one: {e}")
+                self.driver.delete_all_cookies()
+                for cookie in cookies:
+                    try:
+                        self.driver.add_cookie(cookie)
+                    except Exception as e:
+                        self.log_status(f"Could not add cookie {cookie.get('name', 'unknown')}: {e}")
+            self.driver.execute_script(STORAGE_CLEAR_SCRIPT)
+            restored = self.driver.execute_script(STORAGE_RESTORE_SCRIPT, self.storage_state(session_data))
+            self.driver.execute_script(PAGE_MARK_STALE_SCRIPT)
+            self.driver.refresh()
+            self.wait_for_page_ready()
+            self.log_status(f"Applied {len(cookies)} cookies and {restored} storage keys of "
+                            f"{self.state_store.describe(self.state_namespace)} in {time.time() - started:.2f}s")
+            return True
+        except Exception as e:
+            self.log_status(f"Error applying saved state: {e}")
+            return False
+
     def load_browser_state(self):
         """Load cookies and session data"""
         try:
@@ -99,234 +626,604 @@ class ChatGPTBot:
                 self.log_status("No browser instance to load state into")
                 return False
                 
-            # First navigate to the domain to set cookies
-            self.log_status("Opening ChatGPT...")
-            self.driver.get("https://chatgpt.com")
-            # time.sleep(2)
+            # Cookies and storage live in a persistent profile itself, nothing to restore
+            started = time.time()
+            script_id = None if self.profile_dir else self.restore_saved_state()
             
-            # Load cookies if they exist
-            if os.path.exists(self.cookies_file):
-                with open(self.cookies_file, 'rb') as f:
-                    cookies = pickle.load(f)
-                
-                for cookie in cookies:
-                    try:
-                        self.driver.add_cookie(cookie)
-                    except Exception as e:
-                        self.log_status(f"Could not add cookie {cookie.get('name', 'unknown')}: {e}")
-                
-                self.log_status(f"Cookies loaded from {self.cookies_file}")
-                
-                # Refresh page to apply cookies
-                self.driver.refresh()
-                time.sleep(3)
+            self.log_status("Opening ChatGPT...")
+            self.driver.get(self.CHATGPT_URL)
             
-            # Load session data if it exists
-            if os.path.exists(self.session_file):
-                with open(self.session_file, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                
-                # Restore localStorage
-                if 'localStorage' in session_data:
-                    for key, value in session_data['localStorage'].items():
-                        try:
-                            self.driver.execute_script(f"localStorage.setItem('{key}', '{value}');")
-                        except Exception as e:
-                            self.log_status(f"Could not set localStorage item {key}: {e}")
-                
-                # Restore sessionStorage
-                if 'sessionStorage' in session_data:
-                    for key, value in session_data['sessionStorage'].items():
-                        try:
-                            self.driver.execute_script(f"sessionStorage.setItem('{key}', '{value}');")
-                        except Exception as e:
-                            self.log_status(f"Could not set sessionStorage item {key}: {e}")
-                
-                self.log_status(f"Session data loaded from {self.session_file}")
-                
-                # Refresh again to apply session data
-                self.driver.refresh()
-                time.sleep(3)
-                
-                self.log_status("Page loaded successfully (restored session)")
+            if script_id:
+                # Later navigations must not overwrite storage the page changed since
+                self.driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+            if self.profile_dir:
+                self.read_saved_state()  # only the conversation map, the rest is in the profile
+                self.log_status("Page loaded successfully (persistent profile)")
+            elif script_id is None:
+                self.replay_saved_state()
             else:
-                self.log_status("Page loaded successfully (fresh session)")
+                self.log_status("Page loaded successfully")
+            page_ready = self.wait_for_page_ready()
             
-            # Check if already logged in by looking for chat interface
-            try:
-                # Try to find the prompt textarea (indicates logged in)
-                prompt_element = self.driver.find_element(By.ID, "prompt-textarea")
-                self.log_status("Already logged in - session restored successfully!")
-                return True
-            except:
+            # Check if already logged in: the chat prompt appears, or a login button instead
+            prompt_selector = self.selectors.css("prompt")
+            found, prompt_wait = self.wait_until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, f"{prompt_selector}, {self.selectors.css('login_button')}")),
+                self.prompt_timeout
+            )
+            logged_in = found is not None and bool(self.driver.find_elements(By.CSS_SELECTOR, prompt_selector))
+            self.last_load_timing = {
+                "page_ready": page_ready,
+                "prompt": prompt_wait,
+                "total": round(time.time() - started, 3)
+            }
+            if logged_in:
+                self.log_status(f"Already logged in - session restored successfully in {self.last_load_timing['total']:.2f}s!")
+            else:
                 self.log_status("Not logged in - you may need to log in manually")
-                time.sleep(3)
-                return True
+            return True
             
         except Exception as e:
             self.log_status(f"Error loading browser state: {e}")
             return False
 
-    def ask_question_and_get_response(self, query):
-        """Ask a question and wait for the complete response"""
+    def wait_until(self, condition, timeout):
+        """Wait for condition(driver) to hold; returns (result or None on timeout, seconds waited)"""
+        started = time.time()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(condition)
+        except TimeoutException:
+            result = None
+        return result, round(time.time() - started, 3)
+
+    def wait_for_page_ready(self):
+        """Wait until the document is parsed and no navigation is pending; returns the seconds waited"""
+        ready, waited = self.wait_until(lambda driver: driver.execute_script(PAGE_READY_SCRIPT),
+                                        self.page_ready_timeout)
+        if ready:
+            self.log_status(f"Page ready after {waited:.2f}s")
+        else:
+            self.log_status(f"Page not ready after {waited:.2f}s, continuing")
+        return waited
+
+    def ask_question_and_get_response(self, query, conversation_id=None):
+        """Ask a question and wait for the complete response
+
+        conversation_id continues a known thread, NEW_CONVERSATION opens a
+        fresh chat and None asks on whatever page the browser is on.
+        """
+        with self.browser_lock:
+            return self.run_question(query, conversation_id)
+
+    def run_question(self, query, conversation_id=None):
+        """Send the question and wait for the answer; callers hold browser_lock
+
+        If the browser dies on the way and auto_recover is set, it is
+        relaunched from the saved state and the question is asked once
+        more, in the same conversation if its ID is known. Raises
+        UsageLimitError when ChatGPT refuses the question because of a usage
+        cap or rate limit, and right away while that limit has not lifted.
+        """
+        thread = conversation_id if conversation_id is not None else self.conversation_id
         try:
-            if not self.driver or not self.wait:
-                self.log_status("Browser not initialized")
+            return self.wait_for_answer(query, conversation_id)
+        except UsageLimitError:
+            raise
+        except Exception as e:
+            if not self.question_failed(e) or not self.recover_browser(e):
                 return None
-                
-            # Ask the question
-            self.log_status(f"Asking question: {query}")
-            prompt = self.wait.until(EC.element_to_be_clickable((By.ID, "prompt-textarea")))
-            prompt.send_keys(query, Keys.RETURN)
+        self.log_status("Asking the question again after the browser recovered")
+        try:
+            return self.wait_for_answer(query, thread)
+        except UsageLimitError:
+            raise
+        except Exception as e:
+            self.question_failed(e)
+            return None
+
+    def question_failed(self, error):
+        """Log an error that ended a question; returns True if the browser died and may be recovered"""
+        if is_browser_crash(error):
+            self.crashed = True
+            self.log_status(f"Browser crashed while asking: {error}")
+            return self.auto_recover
+        self.log_status(f"Error asking question: {error}")
+        return False
+
+    def wait_for_answer(self, query, conversation_id=None):
+        """Send the question and wait for the answer, raising any error"""
+        question = self.start_question(query, conversation_id)
+        if question is None:
+            return None
+        if question.observed:
+            return self.wait_for_response_with_observer(question.baseline_notice)
+        
+        # Wait for the response; the wait strategy sets the pace and decides completion
+        while True:
+            delay = self.poll_question(question)
+            if delay is None:
+                break
+            time.sleep(delay)
+        return self.finish_question(question)
+
+    def start_question(self, query, conversation_id=None):
+        """Send the question; returns the QuestionState to poll, or None without a browser
 
-            # Wait for the response with improved logic
-            self.log_status("Waiting for ChatGPT response...")
+        With QuestionState.observed set, the answer is buffered by the response
+        observer and read with wait_for_response_with_observer() instead.
+        """
+        if not self.driver or not self.wait:
+            self.log_status("Browser not initialized")
+            return None
+        
+        if self.usage_limit:
+            remaining = self.usage_limit.remaining()
+            if remaining > 0:
+                self.log_status(f"Still limited by ChatGPT for {remaining:.0f}s, not asking")
+                raise UsageLimitError(self.usage_limit.kind, self.usage_limit.notice, remaining)
+            self.usage_limit = None
             
-            # Wait for any response to appear and complete
-            response_appeared = False
-            response_completed = False
-            max_attempts = 120  # 2 minutes total wait time
-            previous_text = ""
-            stable_count = 0
+        if conversation_id is not None:
+            self.open_conversation(conversation_id)
             
-            for attempt in range(max_attempts):
-                try:
-                    # Look for response elements with multiple possible selectors
-                    possible_selectors = [
-                        "div[data-message-author-role='assistant'] div.markdown",
-                        "div[data-message-author-role='assistant']",
-                        ".text-message",
-                        "[data-testid*='conversation-turn']"
-                    ]
+        # Ask the question
+        self.log_status(f"Asking question: {query}")
+        self.emitted_response = ""
+        self.line_tracker.reset()
+        prompt = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, self.selectors.css("prompt"))))
+
+        if self.stream_mode == "observer" and self.install_response_observer():
+            baseline_notice = self.read_limit_notice()
+            self.enter_prompt(prompt, query)
+            return QuestionState(query, observed=True, baseline_notice=baseline_notice)
+
+        # Remember how many answers are on the page so the previous one is not picked up
+        baseline = self.probe_page()
+        question = QuestionState(query, baseline_turns=baseline["turns"] if baseline else 0,
+                                 baseline_notice=baseline["notice"] if baseline else "")
+        
+        if self.stream_monitor:
+            # Drop network events from before the question
+            self.driver.get_log("performance")
+            self.stream_monitor.reset()
+            self.last_stream_timing = None
+
+        self.enter_prompt(prompt, query)
+        self.log_status("Waiting for ChatGPT response...")
+        self.wait_strategy.start(time.time())
+        return question
+
+    def poll_question(self, question):
+        """Read the answer once; returns the seconds to wait before the next poll, or None when done"""
+        try:
+            # One script call returns the newest answer and the generation state
+            probe = self.probe_page(question.page_text)
+            self.check_usage_limit(probe["notice"], question.baseline_notice)
+            question.page_text = probe["text"]
+            question.generating = probe["generating"]
+            
+            if question.page_text and (probe["turns"] > question.baseline_turns or not probe["turns"]):
+                question.appeared = True
+                question.probe = probe
+                if question.page_text != question.current_text:
+                    # Update response display in real-time
+                    question.current_text = question.page_text
+                    self.update_response(question.current_text)
                     
-                    current_text = ""
-                    for selector in possible_selectors:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            last_element = elements[-1]
-                            current_text = last_element.text.strip()
-                            if current_text:
-                                response_appeared = True
-                                break
+                    # Log lines completed since the last check
+                    self.line_tracker.feed(question.current_text)
+        except Exception as e:
+            if isinstance(e, UsageLimitError) or is_browser_crash(e):
+                raise
+            # Keep the last known state so a failed read cannot end the wait early
+            self.log_status(f"Error reading response: {e}")
+        
+        if self.stream_monitor and self.check_stream_finished():
+            if self.last_stream_timing["status"] == 429 and not question.current_text:
+                self.check_usage_limit(None, None, UsageLimitError(
+                    RATE_LIMIT, "The answer request was refused with HTTP 429", DEFAULT_RETRY_AFTER[RATE_LIMIT]
+                ))
+            question.current_text = self.read_final_response(question.current_text, question.baseline_turns)
+            question.appeared = bool(question.current_text)
+            status = self.last_stream_timing["status"]
+            if self.last_stream_timing["error"] or status is None or not 200 <= status < 300:
+                # A broken or refused stream may have cut the answer short
+                self.log_status(f"Answer stream did not finish cleanly (HTTP {status}), the answer may be incomplete")
+            else:
+                question.completed = question.appeared
+            return None
+        
+        phase = self.wait_strategy.update(time.time(), question.current_text, question.generating)
+        if phase != question.phase:
+            question.phase = phase
+            self.log_status(self.WAIT_PHASE_MESSAGES[phase])
+        if phase == COMPLETE:
+            question.completed = True
+            return None
+        if phase == TIMEOUT:
+            return None
+        return self.wait_strategy.next_delay()
+
+    def finish_question(self, question):
+        """Return the final answer of a question that poll_question finished"""
+        if not question.appeared:
+            self.log_status("No response found, trying fallback method...")
+            # Fallback: get all text content from the page
+            all_content = self.driver.find_element(By.TAG_NAME, "body").text
+            answer = "Response timeout - Full page content:\n" + all_content
+        elif not question.completed:
+            self.log_status("Response appeared but may not be complete, extracting current text...")
+            # Get the response text even if we're not sure it's complete
+            try:
+                answer = self.probe_page(question.page_text)["text"]
+                
+                if not answer:
+                    answer = "Could not extract response text"
+                else:
+                    answer = "[WARNING: Response may be incomplete]\n\n" + answer
+                    # Update response display with warning
+                    self.update_response(answer)
                     
-                    # Check if response has appeared
-                    if response_appeared:
-                        # Update response display in real-time
-                        if current_text and current_text != previous_text:
-                            self.update_response(current_text)
-                            
-                            # Log each line of the response
-                            lines = current_text.split('\n')
-                            for line_num, line in enumerate(lines, 1):
-                                if line.strip():  # Only log non-empty lines
-                                    self.log_response_line(line.strip(), line_num)
-                        
-                        # Check if the response is still being generated
-                        # Look for typing indicators or "stop generating" button
-                        stop_button = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='stop-button'], button[aria-label='Stop generating']")
-                        typing_indicator = self.driver.find_elements(By.CSS_SELECTOR, ".result-streaming, [data-testid='typing-indicator']")
-                        
-                        # If there's a stop button or typing indicator, response is still being generated
-                        if stop_button or typing_indicator:
-                            self.log_status(f"Attempt {attempt + 1}: Response is being generated...")
-                            previous_text = current_text
-                            stable_count = 0
-                        else:
-                            # No typing indicators, check if text has stabilized
-                            if current_text == previous_text and current_text:
-                                stable_count += 1
-                                self.log_status(f"Attempt {attempt + 1}: Text stable for {stable_count} seconds")
-                                
-                                # Consider response complete if text hasn't changed for 3 consecutive checks
-                                if stable_count >= 3:
-                                    response_completed = True
-                                    self.log_status("Response appears to be complete!")
-                                    break
-                            else:
-                                # Text is still changing
-                                self.log_status(f"Attempt {attempt + 1}: Response text is still changing...")
-                                if current_text:  # Update display with current text
-                                    self.update_response(current_text)
-                                previous_text = current_text
-                                stable_count = 0
-                    else:
-                        self.log_status(f"Attempt {attempt + 1}: Waiting for response to appear...")
-                        
-                    time.sleep(1)
+                    # Log the lines not logged while streaming
+                    self.log_status("Incomplete response - logging remaining lines:")
+                    self.line_tracker.flush(answer.split('\n', 2)[2])  # Skip warning lines
                     
-                except Exception as e:
-                    self.log_status(f"Attempt {attempt + 1}: {e}")
-                    time.sleep(1)
-            
-            if not response_appeared:
-                self.log_status("No response found, trying fallback method...")
-                # Fallback: get all text content from the page
-                all_content = self.driver.find_element(By.TAG_NAME, "body").text
-                answer = "Response timeout - Full page content:\n" + all_content
-            elif not response_completed:
-                self.log_status("Response appeared but may not be complete, extracting current text...")
-                # Get the response text even if we're not sure it's complete
-                try:
-                    # Try multiple selectors to get the answer text
-                    answer = None
-                    for selector in possible_selectors:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            answer = elements[-1].text.strip()
-                            if answer:
-                                break
+            except Exception as e:
+                answer = f"Error extracting response: {e}"
+        else:
+            # The complete response text was already read while waiting for it to settle
+            try:
+                answer = question.current_text
+                
+                if not answer:
+                    answer = "Could not extract response text"
+                else:
+                    # Final update of response display
+                    self.update_response(answer)
                     
-                    if not answer:
-                        answer = "Could not extract response text"
-                    else:
-                        answer = "[WARNING: Response may be incomplete]\n\n" + answer
-                        # Update response display with warning
-                        self.update_response(answer)
-                        
-                        # Log incomplete response line by line
-                        self.log_status("Incomplete response - logging available lines:")
-                        lines = answer.split('\n')[2:]  # Skip warning lines
-                        for line_num, line in enumerate(lines, 1):
-                            if line.strip():
-                                self.log_response_line(line.strip(), line_num)
-                        
-                except Exception as e:
-                    answer = f"Error extracting response: {e}"
-            else:
-                # Get the complete response text
-                try:
-                    # Try multiple selectors to get the answer text
-                    answer = None
-                    for selector in possible_selectors:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            answer = elements[-1].text.strip()
-                            if answer:
-                                break
+                    # Log the lines not logged while streaming
+                    self.log_status("Final response received - logging remaining lines:")
+                    self.line_tracker.flush(answer)
+                    if question.probe and question.probe["selector"]:
+                        self.selectors.record("response", question.probe["selector"], question.probe["seconds"],
+                                              question.probe["missed"])
                     
-                    if not answer:
-                        answer = "Could not extract response text"
-                    else:
-                        # Final update of response display
-                        self.update_response(answer)
-                        
-                        # Log final response line by line
-                        self.log_status("Final response received - logging all lines:")
-                        lines = answer.split('\n')
-                        for line_num, line in enumerate(lines, 1):
-                            if line.strip():  # Only log non-empty lines
-                                self.log_response_line(line.strip(), line_num)
-                        
-                except Exception as e:
-                    answer = f"Error extracting response: {e}"
-            
-            self.log_status("Response received successfully")
-            return answer
-            
+            except Exception as e:
+                answer = f"Error extracting response: {e}"
+        
+        self.record_answer()
+        self.log_status("Response received successfully")
+        return answer
+    
+    def current_conversation_id(self):
+        """Return the ID of the conversation the browser shows, or None on a fresh chat"""
+        match = self.CONVERSATION_URL_PATTERN.search(urlparse(self.driver.current_url).path)
+        return match.group(1) if match else None
+
+    def record_conversation(self):
+        """Remember the URL of the conversation the browser is on; returns its ID or None"""
+        try:
+            conversation_id = self.current_conversation_id()
         except Exception as e:
-            self.log_status(f"Error asking question: {e}")
+            self.log_status(f"Could not read conversation URL: {e}")
             return None
-    
+        self.conversation_id = conversation_id
+        if conversation_id:
+            self.conversations[conversation_id] = self.driver.current_url
+        return conversation_id
+
+    def record_answer(self):
+        """Remember where the answer was given and, if enabled, its structured form"""
+        self.record_conversation()
+        if self.extract_structure:
+            try:
+                self.extract_structured_response()
+            except Exception as e:
+                self.log_status(f"Could not extract structured response: {e}")
+
+    def extract_structured_response(self):
+        """Read the newest answer as structured blocks in one pass and cache it per turn
+
+        Returns the document described at STRUCTURE_EXTRACT_SCRIPT, plus its
+        cache "key" and "conversation_id", or None when there is no answer.
+        """
+        document = self.driver.execute_script(STRUCTURE_EXTRACT_SCRIPT, self.selectors.css("assistant_turn"),
+                                              self.selectors.get("response"))
+        if document is None:
+            return None
+        # Turns carry a message ID on the real site; fall back to the turn number in this conversation
+        document["key"] = document.get("message_id") or f"{self.conversation_id or 'page'}-{document['turn']}"
+        document["conversation_id"] = self.conversation_id
+        self.structured_answers.pop(document["key"], None)
+        self.structured_answers[document["key"]] = document
+        while len(self.structured_answers) > self.STRUCTURED_CACHE_SIZE:
+            del self.structured_answers[next(iter(self.structured_answers))]
+        self.last_structured_answer = document
+        self.log_status(f"Structured response extracted: {len(document['blocks'])} blocks, "
+                        f"{len(document['links'])} links")
+        return document
+
+    def open_conversation(self, conversation_id):
+        """Navigate to a conversation, or to a fresh chat for NEW_CONVERSATION"""
+        if conversation_id == self.NEW_CONVERSATION:
+            url = self.CHATGPT_URL
+        elif not self.CONVERSATION_ID_PATTERN.fullmatch(conversation_id or ""):
+            raise ValueError(f"Invalid conversation ID: {conversation_id}")
+        elif self.current_conversation_id() == conversation_id:
+            return
+        else:
+            url = self.conversations.get(conversation_id) or f"{self.CHATGPT_URL}/c/{conversation_id}"
+        started = time.time()
+        self.driver.get(url)
+        self.wait_for_page_ready()
+        self.conversation_id = None if conversation_id == self.NEW_CONVERSATION else conversation_id
+        self.log_status(f"Opened {'a new chat' if self.conversation_id is None else f'conversation {conversation_id}'} "
+                        f"in {time.time() - started:.2f}s")
+
+    def enter_prompt(self, prompt, query):
+        """Put the question into the composer and submit it"""
+        started = time.time()
+        if self.input_mode == "type":
+            prompt.send_keys(query, Keys.RETURN)
+        else:
+            self.insert_prompt_text(prompt, query)
+            self.submit_prompt(prompt)
+        self.last_input_seconds = round(time.time() - started, 3)
+        self.questions_asked += 1
+        self.log_status(f"Prompt of {len(query)} characters entered in {self.last_input_seconds:.2f}s")
+
+    def insert_prompt_text(self, prompt, query):
+        """Replace the composer's content with query in one step, newlines included"""
+        def arrived(text):
+            # Contenteditable composers render newlines as paragraphs, so blank lines may differ but line breaks not
+            return same_prompt_text(text, query)
+        try:
+            self.driver.execute_script(PROMPT_SELECT_SCRIPT, prompt)
+            self.driver.execute_cdp_cmd("Input.insertText", {"text": query})
+            if arrived(self.driver.execute_script(PROMPT_READ_SCRIPT, prompt)):
+                return
+            self.log_status("Prompt text did not arrive through DevTools, setting it by script")
+        except Exception as e:
+            self.log_status(f"DevTools text insertion failed, setting prompt by script: {e}")
+        if not arrived(self.driver.execute_script(PROMPT_SET_SCRIPT, prompt, query)):
+            self.log_status("Prompt text may not have arrived intact")
+
+    def submit_prompt(self, prompt):
+        """Submit the composer's content with the send button, or Enter when there is none"""
+        for button in self.driver.find_elements(By.CSS_SELECTOR, self.selectors.css("send_button")):
+            if button.is_displayed() and button.is_enabled():
+                button.click()
+                return
+        prompt.send_keys(Keys.RETURN)
+
+    def probe_page(self, known_text=""):
+        """Read the newest answer, generation state and turn count in one script call
+
+        When known_text is still a prefix of the answer on the page, only the
+        new suffix crosses the wire. The returned "text" is always the full answer.
+        """
+        # Offsets are exchanged in UTF-16 code units, which is what JavaScript strings use
+        offset = len(known_text.encode("utf-16-le")) // 2
+        response_selectors = self.selectors.get("response")
+        args = (
+            response_selectors,
+            self.busy_selector(),
+            self.selectors.css("assistant_turn"),
+            offset,
+            known_text[-32:],
+            self.text_source,
+            self.selectors.css("limit_notice")
+        )
+        started = time.time()
+        result = self.driver.execute_script(PROBE_CALL_SCRIPT, *args)
+        if result is None:
+            # Fresh page - inject the probe helper once, then call it
+            self.driver.execute_script(PROBE_INSTALL_SCRIPT)
+            started = time.time()
+            result = self.driver.execute_script(PROBE_CALL_SCRIPT, *args)
+        result["seconds"] = time.time() - started
+        # Selectors tried before the one that matched, for the registry's statistics
+        result["missed"] = response_selectors[:response_selectors.index(result["selector"])] \
+            if result["selector"] in response_selectors else []
+        if result["offset"]:
+            result["text"] = known_text + result["text"]
+        return result
+
+    def read_limit_notice(self):
+        """Return the text of the newest usage-limit notice on the page, or an empty string"""
+        try:
+            return self.driver.execute_script(NOTICE_READ_SCRIPT, self.selectors.css("limit_notice")) or ""
+        except Exception as e:
+            if is_browser_crash(e):
+                raise
+            self.log_status(f"Could not read limit notice: {e}")
+            return ""
+
+    def check_usage_limit(self, notice, baseline_notice, limit=None):
+        """Raise UsageLimitError if a notice that appeared since the question is a usage cap or rate limit"""
+        if limit is None and notice and notice != baseline_notice:
+            limit = classify_notice(notice)
+        if limit is None:
+            return
+        self.usage_limit = limit
+        self.log_status(f"ChatGPT refused the question, {limit}")
+        raise limit
+
+    def busy_selector(self):
+        """Return the selector list of elements shown while an answer is generated"""
+        return f"{self.selectors.css('stop_button')}, {self.selectors.css('typing_indicator')}"
+
+    def check_stream_finished(self):
+        """Read pending network events and report whether the answer stream has closed"""
+        try:
+            self.stream_monitor.feed(self.driver.get_log("performance"))
+        except Exception as e:
+            self.log_status(f"Could not read network events: {e}")
+            return False
+        if not self.stream_monitor.finished:
+            return False
+        self.last_stream_timing = self.stream_monitor.timing()
+        timing = self.last_stream_timing
+        if timing["error"]:
+            self.log_status(f"Answer stream failed: {timing['error']}")
+        self.log_status(
+            f"Answer stream closed: first byte after {timing['time_to_first_byte']}s, "
+            f"closed after {timing['stream_duration']}s ({timing['bytes_received']} bytes)"
+        )
+        return True
+
+    def read_final_response(self, current_text, baseline_turns, settle_timeout=2.0):
+        """Read the answer once the stream closed, giving the page a moment to render the last chunk"""
+        deadline = time.time() + settle_timeout
+        while True:
+            probe = self.probe_page(current_text)
+            if probe["text"] and (probe["turns"] > baseline_turns or not probe["turns"]):
+                if probe["text"] != current_text:
+                    current_text = probe["text"]
+                    self.update_response(current_text)
+                    self.line_tracker.feed(current_text)
+                if not probe["generating"]:
+                    break
+            if time.time() >= deadline:
+                break
+            time.sleep(0.05)
+        return current_text
+
+    def install_response_observer(self):
+        """Install the in-page MutationObserver that buffers the newest answer"""
+        try:
+            self.driver.execute_script(OBSERVER_INSTALL_SCRIPT, self.selectors.get("response"), self.busy_selector(),
+                                       self.selectors.css("assistant_turn"), self.text_source)
+            return True
+        except Exception as e:
+            self.log_status(f"Could not install response observer, falling back to polling: {e}")
+            return False
+
+    def wait_for_response_with_observer(self, baseline_notice=""):
+        """Drain the in-page observer buffer until the answer is complete"""
+        self.log_status("Waiting for ChatGPT response (observer mode)...")
+        self.driver.set_script_timeout(30)
+
+        version = 0
+        current_text = ""
+        response_completed = False
+        phase = None
+        strategy = self.wait_strategy
+        strategy.start(time.time())
+        generating = False
+        wait_ms = 0
+
+        while True:
+            try:
+                # Returns as soon as the page buffer changes, or after wait_ms
+                snapshot = self.driver.execute_async_script(OBSERVER_DRAIN_SCRIPT, version, wait_ms)
+            except Exception as e:
+                # Keep the last known state so a failed read cannot end the wait early
+                self.log_status(f"Observer read failed: {e}")
+                time.sleep(0.5)
+                snapshot = {"version": version, "text": current_text, "generating": generating}
+
+            if snapshot is None:
+                # Page was reloaded or navigated, observer has to be installed again
+                self.log_status("Response observer lost, reinstalling...")
+                if not self.install_response_observer():
+                    break
+                version = 0
+                continue
+
+            version = snapshot["version"]
+            generating = snapshot["generating"]
+            text = snapshot["text"]
+            if not text and not generating:
+                # The observer only sees answers; a limit notice shows up instead of one
+                self.check_usage_limit(self.read_limit_notice(), baseline_notice)
+            if text and text != current_text:
+                current_text = text
+                self.update_response(current_text)
+                self.line_tracker.feed(current_text)
+
+            new_phase = strategy.update(time.time(), current_text, generating)
+            if new_phase != phase:
+                phase = new_phase
+                self.log_status(self.WAIT_PHASE_MESSAGES[phase])
+            if phase == COMPLETE:
+                response_completed = True
+                break
+            if phase == TIMEOUT:
+                break
+            wait_ms = int(strategy.next_delay() * 1000)
+
+        try:
+            self.driver.execute_script(OBSERVER_UNINSTALL_SCRIPT)
+        except Exception:
+            pass
+
+        if not current_text:
+            self.log_status("No response found, trying fallback method...")
+            all_content = self.driver.find_element(By.TAG_NAME, "body").text
+            answer = "Response timeout - Full page content:\n" + all_content
+        elif not response_completed:
+            self.log_status("Response appeared but may not be complete")
+            answer = "[WARNING: Response may be incomplete]\n\n" + current_text
+            self.update_response(answer)
+            self.line_tracker.flush(current_text)
+        else:
+            answer = current_text
+            self.update_response(answer)
+            self.line_tracker.flush(current_text)
+
+        self.record_answer()
+        self.log_status("Response received successfully")
+        return answer
+
+    def is_browser_alive(self):
+        """Liveness probe: return False if the browser or chromedriver died"""
+        if not self.driver:
+            return False
+        try:
+            # A script needs chromedriver, the browser and the tab's renderer to answer
+            self.driver.execute_script("return 1")
+        except Exception as e:
+            if is_browser_crash(e):
+                self.crashed = True
+                return False
+            # e.g. an open alert: the browser is busy, not dead
+        return True
+
+    def recover_browser(self, reason):
+        """Replace a dead browser with a new one opened on the saved state; callers hold browser_lock
+
+        Records a recovery event {"reason", "started_at", "duration",
+        "success"} in recovery_events and passes it to recovery_callback.
+        Returns True if the new browser is up.
+        """
+        started = time.time()
+        self.log_status(f"Browser died ({reason}), relaunching...")
+        dead_driver = self.detach_browser()
+        try:
+            dead_driver.quit()
+        except Exception:
+            pass  # already gone; quit() still stops a chromedriver that outlived Chrome
+        success = self.launch_browser() and self.load_browser_state()
+        # A browser that is up but could not open the saved session is not dead
+        self.crashed = self.driver is None
+        event = {
+            # WebDriverException.msg leaves out the stack trace
+            "reason": (getattr(reason, "msg", None) or str(reason)).strip().split("\n")[0],
+            "started_at": started,
+            "duration": round(time.time() - started, 3),
+            "success": success
+        }
+        self.recovery_events.append(event)
+        del self.recovery_events[:-self.RECOVERY_HISTORY]
+        if success:
+            self.log_status(f"Browser recovered in {event['duration']:.2f}s")
+        else:
+            self.log_status(f"Browser recovery failed after {event['duration']:.2f}s")
+        if self.recovery_callback:
+            self.recovery_callback(event)
+        return success
+
     def close_browser(self):
         """Close the browser"""
         try:
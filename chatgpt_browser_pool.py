@@ -0,0 +1,188 @@
+import threading
+import time
+from chatgpt_bot_core import ChatGPTBot
+
+
+class BrowserPool:
+    """Keeps Chrome instances launched, with state loaded and waiting at the prompt
+
+    A session bot leases a warm browser with lease(bot) instead of paying for
+    launch_browser + load_browser_state, and hands it back with release(bot).
+    A leased browser holding the login of another state namespace gets the
+    bot's own saved state applied (cookies and storage, then one reload).
+    A background thread keeps min_size browsers warm, never running more
+    than max_size browsers (idle, warming and leased) at once.
+    """
+
+    def __init__(self, min_size=1, max_size=4, bot_options=None, status_callback=None, retry_delay=10):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.bot_options = dict(bot_options or {})  # passed to every ChatGPTBot launching a pooled browser
+        self.status_callback = status_callback
+        self.retry_delay = retry_delay  # seconds to wait after a failed launch
+        sample = ChatGPTBot(**self.bot_options)
+        self.profile = sample.launch_profile()
+        self.state_key = self.state_of(sample)  # the state new warm browsers are opened on
+        self.idle = []      # (warm ChatGPTBot, state key of the login its browser holds) ready to lease
+        self.leased = {}    # id(session bot) -> session bot holding a pooled browser
+        self.warming = 0
+        self.condition = threading.Condition()
+        self.running = False
+        self.worker = None
+
+    def log_status(self, message):
+        """Log pool status message via callback if provided"""
+        if self.status_callback:
+            self.status_callback(f"[pool] {message}")
+        else:
+            print(f"[pool] {message}")
+
+    def start(self):
+        """Start keeping browsers warm in the background"""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.worker = threading.Thread(target=self._maintain, name="browser-pool", daemon=True)
+        self.worker.start()
+        self.log_status(f"Browser pool started (min={self.min_size}, max={self.max_size})")
+
+    def lease(self, bot):
+        """Attach a warm browser to bot; returns False if none is ready or the bot needs different launch settings"""
+        if bot.launch_profile() != self.profile:
+            return False
+        while True:
+            with self.condition:
+                if not self.running or not self.idle:
+                    return False
+                launcher, state_key = self.idle.pop(0)
+                self.leased[id(bot)] = bot
+                self.condition.notify_all()
+            driver = launcher.detach_browser()
+            try:
+                driver.current_url  # cheap liveness check
+            except Exception as e:
+                self.log_status(f"Dropping dead warm browser: {e}")
+                self._quit(driver)
+                with self.condition:
+                    self.leased.pop(id(bot), None)
+                continue
+            bot.attach_browser(driver)
+            bot.log_status("Leased warm browser from pool")
+            if self.state_of(bot) != state_key:
+                # The warm browser holds another namespace's login, swap in the bot's own
+                bot.apply_saved_state()
+            return True
+
+    @staticmethod
+    def state_of(bot):
+        """Return the (store location, namespace) key of the state a bot loads and saves"""
+        return (bot.state_store.location, bot.state_namespace)
+
+    def owns(self, bot):
+        """Return True if bot currently holds a browser leased from this pool"""
+        with self.condition:
+            return id(bot) in self.leased
+
+    def release(self, bot):
+        """Take back the browser leased to bot; returns False if bot holds no pooled browser"""
+        with self.condition:
+            if self.leased.pop(id(bot), None) is None:
+                return False
+            self.condition.notify_all()
+        driver = bot.detach_browser()
+        bot.log_status("Browser returned to pool")
+        if driver is not None:
+            threading.Thread(target=self._take_back, args=(driver, self.state_of(bot)), daemon=True).start()
+        return True
+
+    def stats(self):
+        """Return the number of idle, warming and leased browsers"""
+        with self.condition:
+            return {
+                "running": self.running,
+                "idle": len(self.idle),
+                "warming": self.warming,
+                "leased": len(self.leased),
+                "min_size": self.min_size,
+                "max_size": self.max_size
+            }
+
+    def shutdown(self):
+        """Stop warming browsers and close the idle ones; leased browsers stay with their sessions"""
+        with self.condition:
+            self.running = False
+            idle, self.idle = self.idle, []
+            self.leased.clear()
+            self.condition.notify_all()
+        for launcher, _ in idle:
+            launcher.close_browser()
+        self.log_status("Browser pool stopped")
+
+    def _needs_browser(self):
+        warm = len(self.idle) + self.warming
+        return warm < self.min_size and warm + len(self.leased) < self.max_size
+
+    def _maintain(self):
+        while True:
+            with self.condition:
+                while self.running and not self._needs_browser():
+                    self.condition.wait()
+                if not self.running:
+                    return
+                self.warming += 1
+            launcher = self._warm_up()
+            with self.condition:
+                self.warming -= 1
+                keep = launcher is not None and self.running
+                if keep:
+                    self.idle.append((launcher, self.state_key))
+                self.condition.notify_all()
+            if launcher is None:
+                time.sleep(self.retry_delay)
+            elif not keep:
+                launcher.close_browser()
+
+    def _warm_up(self):
+        """Launch a browser and load the saved state, returning the ChatGPTBot holding it"""
+        started = time.time()
+        launcher = ChatGPTBot(**dict(self.bot_options, status_callback=self.log_status))
+        if not launcher.launch_browser():
+            return None
+        launcher.load_browser_state()
+        self.log_status(f"Warm browser ready in {time.time() - started:.1f}s")
+        return launcher
+
+    def _take_back(self, driver, state_key):
+        """Open a fresh chat in a returned browser and keep it warm, or close it if the pool is full"""
+        with self.condition:
+            keep = self.running and len(self.idle) + self.warming < self.min_size
+            if keep:
+                self.warming += 1
+        if not keep:
+            self._quit(driver)
+            return
+        launcher = ChatGPTBot(**dict(self.bot_options, status_callback=self.log_status))
+        launcher.attach_browser(driver)
+        try:
+            driver.get(ChatGPTBot.CHATGPT_URL)
+        except Exception as e:
+            self.log_status(f"Could not reset returned browser: {e}")
+            launcher = None
+            self._quit(driver)
+        with self.condition:
+            self.warming -= 1
+            if launcher is not None:
+                if self.running:
+                    self.idle.append((launcher, state_key))
+                else:
+                    self._quit(driver)
+            self.condition.notify_all()
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,123 @@
+"""
+Recycling of long-lived browsers.
+
+Chrome's memory grows with every answer left in the page, so a browser
+serving one session for days keeps growing. BrowserRecycler replaces a
+session's browser once it answered max_questions questions, ran for
+max_age seconds or its process tree uses more than max_rss bytes (read
+from /proc, Linux only).
+
+The replacement happens without a cold start for the caller: the session
+state is saved, a standby browser is launched and loaded in the
+background, and the bot swaps drivers under its browser lock, i.e. between
+two questions. A bot with a persistent Chrome profile cannot run a
+standby browser on the same profile, so it is restarted in place instead.
+"""
+import threading
+import time
+
+
+class BrowserRecycler:
+    """Replaces browsers that answered too many questions, are too old or use too much memory
+
+    Call schedule(bot) after every question; a limit of 0 is disabled.
+    """
+
+    def __init__(self, max_questions=0, max_age=0, max_rss=0):
+        self.max_questions = max_questions
+        self.max_age = max_age  # seconds
+        self.max_rss = max_rss  # bytes
+        self.recycling = {}  # id(bot) -> reason of the replacement in progress
+        self.recycles = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def recycle_reason(self, bot):
+        """Return why the browser of bot is due for replacement, or None"""
+        if bot.driver is None or bot.browser_started_at is None:
+            return None
+        if self.max_questions and bot.questions_asked >= self.max_questions:
+            return f"{bot.questions_asked} questions answered"
+        age = time.time() - bot.browser_started_at
+        if self.max_age and age >= self.max_age:
+            return f"running for {age / 3600:.1f}h"
+        if self.max_rss:
+            rss = bot.browser_rss()
+            if rss and rss >= self.max_rss:
+                return f"using {rss / 1024 / 1024:.0f} MB"
+        return None
+
+    def schedule(self, bot):
+        """Start replacing the browser of bot in the background if it is due; returns the reason or None"""
+        reason = self.recycle_reason(bot)
+        if reason is None:
+            return None
+        with self.lock:
+            if id(bot) in self.recycling:
+                return None
+            self.recycling[id(bot)] = reason
+        threading.Thread(target=self.recycle, args=(bot, reason), name="browser-recycler", daemon=True).start()
+        return reason
+
+    def recycle(self, bot, reason):
+        """Replace the browser of bot now; returns True on success"""
+        started = time.time()
+        bot.log_status(f"Recycling browser ({reason})...")
+        try:
+            if bot.profile_dir:
+                success = self.restart(bot)
+            else:
+                success = self.hand_over(bot)
+        except Exception as e:
+            bot.log_status(f"Error recycling browser: {e}")
+            success = False
+        with self.lock:
+            self.recycling.pop(id(bot), None)
+            if success:
+                self.recycles += 1
+            else:
+                self.failures += 1
+        if success:
+            bot.log_status(f"Browser recycled in {time.time() - started:.2f}s")
+        return success
+
+    def hand_over(self, bot):
+        """Load a standby browser from freshly saved state and swap it in between questions"""
+        if not bot.save_browser_state():
+            return False
+        standby = bot.launch_standby()
+        if standby is None:
+            bot.log_status("Could not launch a standby browser, keeping the current one")
+            return False
+        with bot.browser_lock:
+            if bot.driver is None:
+                # The session closed its browser in the meantime
+                standby.close_browser()
+                return False
+            bot.swap_browser(standby)
+        return True
+
+    def restart(self, bot):
+        """Close and relaunch the browser of bot between questions"""
+        with bot.browser_lock:
+            if bot.driver is None:
+                return False
+            conversation_id = bot.conversation_id
+            bot.close_browser()
+            if not bot.launch_browser() or not bot.load_browser_state():
+                return False
+            if conversation_id:
+                bot.open_conversation(conversation_id)
+        return True
+
+    def stats(self):
+        """Return the limits, the replacements in progress and the completed and failed ones"""
+        with self.lock:
+            return {
+                "max_questions": self.max_questions,
+                "max_age": self.max_age,
+                "max_rss": self.max_rss,
+                "in_progress": len(self.recycling),
+                "recycles": self.recycles,
+                "failures": self.failures
+            }
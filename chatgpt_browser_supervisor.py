@@ -0,0 +1,128 @@
+"""
+Crash detection for the Chrome/chromedriver pair behind a ChatGPTBot.
+
+When Chrome or chromedriver dies, every later WebDriver call fails: the
+driver answers "invalid session id" / "session not found", the HTTP
+connection to chromedriver is refused, or the tab's renderer is gone
+("tab crashed", "chrome not reachable"). is_browser_crash() recognises
+these errors; ChatGPTBot uses it to relaunch its browser from the saved
+state and ask the interrupted question once more (see recover_browser()).
+
+BrowserSupervisor catches crashes between questions: it probes the idle
+browsers of its bots every few seconds and recovers the dead ones, so the
+next question does not have to pay for the relaunch.
+"""
+import threading
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+# Fragments of WebDriver error messages that mean the browser is gone (compared lower case)
+CRASH_MESSAGES = (
+    "invalid session id",
+    "session not found",
+    "session deleted",
+    "no such window",
+    "target window already closed",
+    "chrome not reachable",
+    "disconnected: not connected to devtools",
+    "tab crashed",
+    "target crashed",
+    "connection refused",
+    "max retries exceeded"
+)
+
+
+def is_browser_crash(error):
+    """Return True if a WebDriver call failed because the browser or chromedriver died"""
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException, ConnectionError,
+                          MaxRetryError, NewConnectionError, ProtocolError)):
+        return True
+    message = str(error).lower()
+    return any(fragment in message for fragment in CRASH_MESSAGES)
+
+
+class BrowserSupervisor:
+    """Probes the browsers of idle bots in the background and relaunches the ones that died
+
+    A bot answering a question is skipped; a crash during a question is
+    handled by the question itself. Recoveries are recorded by the bots
+    (ChatGPTBot.recovery_events).
+    """
+
+    def __init__(self, interval=30.0):
+        self.interval = interval
+        self.bots = {}  # id(bot) -> bot
+        self.probes = 0
+        self.recoveries = 0
+        self.condition = threading.Condition()
+        self.running = False
+        self.worker = None
+
+    def start(self):
+        """Start the background probe thread"""
+        with self.condition:
+            if self.running or self.interval <= 0:
+                return
+            self.running = True
+        self.worker = threading.Thread(target=self._run, name="browser-supervisor", daemon=True)
+        self.worker.start()
+
+    def register(self, bot):
+        """Watch the browser of bot"""
+        with self.condition:
+            self.bots[id(bot)] = bot
+        self.start()
+
+    def unregister(self, bot):
+        """Stop watching the browser of bot"""
+        with self.condition:
+            self.bots.pop(id(bot), None)
+
+    def stop(self):
+        """Stop the probe thread"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def stats(self):
+        """Return the number of watched bots, probes made and browsers recovered"""
+        with self.condition:
+            return {"bots": len(self.bots), "interval": self.interval,
+                    "probes": self.probes, "recoveries": self.recoveries}
+
+    def check(self, bot):
+        """Probe the browser of bot unless it is busy and recover it if it died
+
+        Returns None if bot was busy or has no browser, else True if the
+        browser is alive (again). Bots created with auto_recover=False are
+        only marked as crashed.
+        """
+        if bot.driver is None or not bot.browser_lock.acquire(blocking=False):
+            return None
+        try:
+            if bot.driver is None:
+                return None
+            with self.condition:
+                self.probes += 1
+            if bot.is_browser_alive():
+                return True
+            if not bot.auto_recover:
+                return False
+            with self.condition:
+                self.recoveries += 1
+            return bot.recover_browser("liveness probe failed")
+        finally:
+            bot.browser_lock.release()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait(self.interval)
+                if not self.running:
+                    return
+                bots = list(self.bots.values())
+            for bot in bots:
+                try:
+                    self.check(bot)
+                except Exception as e:
+                    bot.log_status(f"Browser liveness check failed: {e}")
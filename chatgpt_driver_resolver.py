@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Offline-first chromedriver resolution.
+
+ChromeDriverManager().install() looks up versions and checks its cache
+metadata on every call, which adds latency to each launch and fails
+without network. The resolver runs once per process and remembers the
+driver path in a small JSON cache keyed by the installed Chrome version,
+so later launches (and later processes) make no network calls.
+
+Resolution order:
+    1. CHATGPT_CHROMEDRIVER environment variable (pinned driver path)
+    2. cache entry for the installed Chrome version
+    3. ChromeDriverManager().install(), whose result is cached
+    4. any cached driver for the same Chrome major version
+    5. None - Selenium Manager resolves the driver itself
+
+Run this file to pre-populate the cache, e.g. during a Docker build:
+    python chatgpt_driver_resolver.py
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+DRIVER_PATH_ENV = "CHATGPT_CHROMEDRIVER"
+CACHE_FILE_ENV = "CHATGPT_DRIVER_CACHE"
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "chatgpt-bot", "chromedriver.json")
+
+CHROME_COMMANDS = {
+    "linux": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+    "darwin": ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"]
+}
+
+
+def detect_chrome_version():
+    """Return the installed Chrome version (e.g. '126.0.6478.126') or None"""
+    if sys.platform.startswith("win"):
+        try:
+            import winreg
+            for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+                try:
+                    with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                        return winreg.QueryValueEx(key, "version")[0]
+                except OSError:
+                    continue
+        except ImportError:
+            pass
+        return None
+
+    platform = "darwin" if sys.platform == "darwin" else "linux"
+    for command in CHROME_COMMANDS[platform]:
+        try:
+            output = subprocess.run([command, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r"\d+\.\d+\.\d+\.\d+", output)
+        if match:
+            return match.group(0)
+    return None
+
+
+class ChromeDriverResolver:
+    """Resolves the chromedriver path once per process, caching it per Chrome version"""
+
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file or os.environ.get(CACHE_FILE_ENV) or DEFAULT_CACHE_FILE
+        self.lock = threading.Lock()
+        self.path = None
+        self.resolved = False
+        self.source = None
+        self.resolve_seconds = None
+
+    def resolve(self, log=print):
+        """Return the chromedriver path to use, or None to let Selenium Manager decide"""
+        with self.lock:
+            if not self.resolved:
+                started = time.time()
+                self.path, self.source = self._resolve(log)
+                self.resolve_seconds = time.time() - started
+                self.resolved = True
+                log(f"Chromedriver resolved from {self.source} in {self.resolve_seconds:.2f}s")
+            return self.path
+
+    def reset(self):
+        """Forget the resolved path, e.g. after Chrome was updated"""
+        with self.lock:
+            self.path = None
+            self.resolved = False
+            self.source = None
+
+    def _resolve(self, log):
+        pinned = os.environ.get(DRIVER_PATH_ENV)
+        if pinned:
+            if os.path.isfile(pinned):
+                return pinned, DRIVER_PATH_ENV
+            log(f"{DRIVER_PATH_ENV} points to a missing file: {pinned}")
+
+        version = detect_chrome_version()
+        cache = self._load_cache()
+        if version and self._usable(cache.get(version)):
+            return cache[version], "cache"
+
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+            if version:
+                cache[version] = path
+                self._save_cache(cache)
+            return path, "webdriver-manager"
+        except Exception as e:
+            log(f"ChromeDriverManager failed: {e}")
+
+        # Offline: any cached driver built for the same major version still works
+        major = version.split(".")[0] if version else None
+        for cached_version, path in cache.items():
+            if (major is None or cached_version.split(".")[0] == major) and self._usable(path):
+                return path, "cache (same major version)"
+        return None, "Selenium Manager"
+
+    def _usable(self, path):
+        return bool(path) and os.path.isfile(path)
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_file = f"{self.cache_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(temp_file, self.cache_file)
+        except OSError:
+            pass
+
+
+# Shared by every ChatGPTBot in the process
+driver_resolver = ChromeDriverResolver()
+
+
+def resolve_chromedriver(log=print):
+    """Return the chromedriver path for this process, resolving it on first use"""
+    return driver_resolver.resolve(log)
+
+
+if __name__ == "__main__":
+    path = resolve_chromedriver()
+    print(f"Chrome version: {detect_chrome_version()}")
+    print(f"Chromedriver: {path or 'resolved by Selenium Manager at launch'}")
+    print(f"Cache file: {driver_resolver.cache_file}")
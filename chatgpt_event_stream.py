@@ -0,0 +1,67 @@
+"""
+Numbered session events for Server-Sent Events clients.
+
+Bot callbacks run on browser worker threads and publish response deltas,
+status changes and log lines into the SessionEventLog of their session.
+SSE handlers on the event loop read what is newer than the last event they
+sent and wait for more without polling. Every event has an ID that grows
+by one, so a client reconnecting with Last-Event-ID gets exactly the
+events it missed, as long as they are still among the last `size` events.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+
+
+def format_sse(event_id, kind, data):
+    """Encode one event in the text/event-stream format"""
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class SessionEventLog:
+    """The most recent events of one session: (id, kind, data) with ids counting up from 1"""
+
+    def __init__(self, size=2000):
+        self.events = deque(maxlen=size)
+        self.last_id = 0
+        self.lock = threading.Lock()
+        self.waiters = set()  # (event loop, asyncio.Event) of handlers waiting for the next event
+
+    def publish(self, kind, data):
+        """Append an event and wake the waiting handlers; safe to call from any thread"""
+        with self.lock:
+            self.last_id += 1
+            self.events.append((self.last_id, kind, data))
+            waiters = list(self.waiters)
+            event_id = self.last_id
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # the handler's event loop is closed
+        return event_id
+
+    def since(self, last_id):
+        """Return (events after last_id, complete); complete is False when some were already dropped"""
+        with self.lock:
+            if last_id >= self.last_id:
+                return [], True
+            events = [event for event in self.events if event[0] > last_id]
+            complete = bool(events) and events[0][0] == last_id + 1
+            return events, complete
+
+    async def wait(self, last_id, timeout):
+        """Wait until there is an event after last_id, at most timeout seconds"""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.lock:
+            if self.last_id > last_id:
+                return
+            self.waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self.lock:
+                self.waiters.discard(waiter)
@@ -3,11 +3,14 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 from chatgpt_bot_core import ChatGPTBot
+from chatgpt_usage_limits import UsageLimitError
 
 
 class ChatGPTGUI:
-    def __init__(self):
+    def __init__(self, browser_pool=None):
         self.bot = None
+        self.browser_pool = browser_pool  # optional BrowserPool with warm browsers
+        self.displayed_length = 0
         self.setup_gui()
         
     def setup_gui(self):
@@ -84,6 +87,18 @@ class ChatGPTGUI:
         self.response_text.insert(1.0, text)
         self.response_text.config(state='disabled')
         self.response_text.see(tk.END)
+        self.displayed_length = len(text)
+        self.root.update()
+    
+    def append_response_display(self, offset, text):
+        """Apply a response delta: drop everything from offset on, then append text"""
+        self.response_text.config(state='normal')
+        if offset < self.displayed_length:
+            self.response_text.delete(f"1.0 + {offset} chars", tk.END)
+        self.response_text.insert(tk.END, text)
+        self.response_text.config(state='disabled')
+        self.response_text.see(tk.END)
+        self.displayed_length = offset + len(text)
         self.root.update()
     
     def clear_response(self):
@@ -91,6 +106,7 @@ class ChatGPTGUI:
         self.response_text.config(state='normal')
         self.response_text.delete(1.0, tk.END)
         self.response_text.config(state='disabled')
+        self.displayed_length = 0
         
     def launch_browser(self):
         """Launch browser in a separate thread"""
@@ -98,10 +114,16 @@ class ChatGPTGUI:
             self.launch_btn.config(state='disabled')
             self.bot = ChatGPTBot(
                 status_callback=self.log_status,
-                response_callback=self.update_response_display
+                delta_callback=self.append_response_display
             )
             
-            if self.bot.launch_browser():
+            if self.browser_pool and self.browser_pool.lease(self.bot):
+                # Warm browser from the pool already has the state loaded
+                self.load_state_btn.config(state='normal')
+                self.save_state_btn.config(state='normal')
+                self.close_btn.config(state='normal')
+                self.ask_btn.config(state='normal')
+            elif self.bot.launch_browser():
                 self.load_state_btn.config(state='normal')
                 self.save_state_btn.config(state='normal')
                 self.close_btn.config(state='normal')
@@ -140,11 +162,16 @@ class ChatGPTGUI:
                     # Clear response display before starting
                     self.clear_response()
                     
-                    response = self.bot.ask_question_and_get_response(question)
+                    try:
+                        response = self.bot.ask_question_and_get_response(question)
+                    except UsageLimitError as e:
+                        self.log_status(f"ChatGPT limit reached, try again in {e.retry_after / 60:.0f} min")
+                        response = None
                     
                     if response:
                         # Final response update (in case real-time updates missed anything)
-                        self.update_response_display(response)
+                        if response != self.bot.emitted_response:
+                            self.update_response_display(response)
                         
                         # Save response to file
                         try:
@@ -167,7 +194,8 @@ class ChatGPTGUI:
         """Close browser"""
         def close_thread():
             if self.bot:
-                self.bot.close_browser()
+                if not (self.browser_pool and self.browser_pool.release(self.bot)):
+                    self.bot.close_browser()
                 self.bot = None
                 self.launch_btn.config(state='normal')
                 self.load_state_btn.config(state='disabled')
@@ -0,0 +1,93 @@
+# Follows the conversation's streaming HTTP response through Chrome DevTools
+# Protocol Network events, so ChatGPTBot can tell exactly when the answer
+# stream opened, delivered its first bytes and closed.
+#
+# Events come from chromedriver's performance log (goog:loggingPrefs), which
+# relays CDP Network.* events without needing a separate DevTools websocket.
+import json
+import re
+
+
+class ConversationStreamMonitor:
+    """Tracks the newest conversation request from CDP Network events"""
+
+    # ChatGPT posts the question to /backend-api/conversation (or /backend-api/f/conversation)
+    # and streams the answer back as server-sent events on the same response
+    DEFAULT_URL_PATTERN = r"/backend-api/(?:f/)?conversation(?:\?|$)"
+
+    def __init__(self, url_pattern=None):
+        self.url_pattern = re.compile(url_pattern or self.DEFAULT_URL_PATTERN)
+        self.reset()
+
+    def reset(self):
+        """Forget the tracked request, e.g. before a new question"""
+        self.request_id = None
+        self.url = None
+        self.status = None
+        self.started_at = None      # CDP monotonic timestamps, in seconds
+        self.headers_at = None
+        self.first_byte_at = None
+        self.finished_at = None
+        self.error = None
+        self.bytes_received = 0
+
+    @property
+    def started(self):
+        return self.request_id is not None
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def feed(self, entries):
+        """Process performance log entries as returned by driver.get_log('performance')"""
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.handle_event(message.get("method"), message.get("params", {}))
+
+    def handle_event(self, method, params):
+        """Process a single CDP Network event"""
+        if method == "Network.requestWillBeSent":
+            request = params.get("request", {})
+            if request.get("method") == "POST" and self.url_pattern.search(request.get("url", "")):
+                self.reset()
+                self.request_id = params.get("requestId")
+                self.url = request.get("url")
+                self.started_at = params.get("timestamp")
+            return
+
+        if not self.request_id or params.get("requestId") != self.request_id:
+            return
+
+        timestamp = params.get("timestamp")
+        if method == "Network.responseReceived":
+            self.status = params.get("response", {}).get("status")
+            self.headers_at = timestamp
+        elif method == "Network.dataReceived":
+            if self.first_byte_at is None:
+                self.first_byte_at = timestamp
+            self.bytes_received += params.get("dataLength", 0)
+        elif method == "Network.loadingFinished":
+            self.finished_at = timestamp
+        elif method == "Network.loadingFailed":
+            self.finished_at = timestamp
+            self.error = params.get("errorText") or "loading failed"
+
+    def timing(self):
+        """Return stream timings in seconds relative to the request start"""
+        def since_start(timestamp):
+            if timestamp is None or self.started_at is None:
+                return None
+            return round(timestamp - self.started_at, 3)
+
+        return {
+            "status": self.status,
+            "time_to_headers": since_start(self.headers_at),
+            "time_to_first_byte": since_start(self.first_byte_at if self.first_byte_at is not None else self.headers_at),
+            "stream_duration": since_start(self.finished_at),
+            "bytes_received": self.bytes_received,
+            "error": self.error
+        }
@@ -0,0 +1,399 @@
+# JavaScript snippets injected into the ChatGPT page by ChatGPTBot.
+# Kept in one place so the selectors and in-page state names stay in sync
+# between the scripts that install page helpers and the ones that read them.
+
+# Installs a MutationObserver that buffers the newest assistant turn inside
+# the page. Arguments: response selectors (list), busy selector (string),
+# assistant turn selector (string), text source ("innerText" or
+# "textContent", as in the probe). Assistant turns that already exist when
+# the observer is installed are ignored, so the previous answer is never
+# mistaken for the new one. Turns are only looked up again after a change
+# outside the newest turn; mutations of the streaming answer just re-read it.
+OBSERVER_INSTALL_SCRIPT = r"""
+var selectors = arguments[0];
+var busySelector = arguments[1];
+var turnSelector = arguments[2];
+var textSource = arguments[3];
+var old = window.__chatgptBotStream;
+if (old && old.observer) { old.observer.disconnect(); }
+
+var baselineTurns = document.querySelectorAll(turnSelector).length;
+// For pages without turn markup: matches that already exist are ignored
+var baseline = selectors.map(function (s) {
+    return document.querySelectorAll(s).length;
+});
+var state = {
+    text: '', version: 0, generating: false, sawGenerating: false,
+    lastChange: Date.now(), waiters: [], pending: false, observer: null,
+    turn: null, turnCount: baselineTurns, turnsChanged: true
+};
+
+function newestTurn() {
+    if (state.turnsChanged || (state.turn && !state.turn.isConnected)) {
+        var turns = document.querySelectorAll(turnSelector);
+        state.turn = turns.length > baselineTurns ? turns[turns.length - 1] : null;
+        state.turnCount = turns.length;
+        state.turnsChanged = false;
+    }
+    return state.turn;
+}
+
+function latestText() {
+    var turn = newestTurn();
+    for (var i = 0; i < selectors.length; i++) {
+        var node = null;
+        if (turn) {
+            var inner = turn.querySelectorAll(selectors[i]);
+            node = inner.length ? inner[inner.length - 1] : (turn.matches(selectors[i]) ? turn : null);
+        } else if (!state.turnCount) {
+            var nodes = document.querySelectorAll(selectors[i]);
+            node = nodes.length > baseline[i] ? nodes[nodes.length - 1] : null;
+        }
+        if (node) {
+            var text = ((textSource === 'textContent' ? node.textContent : node.innerText) || '').trim();
+            if (text) { return text; }
+        }
+    }
+    return '';
+}
+
+function refresh() {
+    state.pending = false;
+    var text = latestText();
+    var generating = !!document.querySelector(busySelector);
+    if (generating) { state.sawGenerating = true; }
+    if (text !== state.text || generating !== state.generating) {
+        state.text = text;
+        state.generating = generating;
+        state.version += 1;
+        state.lastChange = Date.now();
+        var waiters = state.waiters;
+        state.waiters = [];
+        waiters.forEach(function (w) { w(); });
+    }
+}
+
+state.refresh = refresh;
+state.observer = new MutationObserver(function (mutations) {
+    for (var i = 0; i < mutations.length && !state.turnsChanged; i++) {
+        if (!state.turn || !state.turn.contains(mutations[i].target)) { state.turnsChanged = true; }
+    }
+    if (!state.pending) {
+        state.pending = true;
+        setTimeout(refresh, 50);
+    }
+});
+state.observer.observe(document.body, {
+    childList: true, subtree: true, characterData: true, attributes: true
+});
+window.__chatgptBotStream = state;
+return true;
+"""
+
+# Async script: resolves as soon as the buffered state is newer than the
+# given version, or after the given number of milliseconds. Arguments:
+# last seen version, wait in ms. Returns null if no observer is installed
+# (e.g. the page navigated away).
+OBSERVER_DRAIN_SCRIPT = r"""
+var since = arguments[0];
+var waitMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var state = window.__chatgptBotStream;
+if (!state) { done(null); return; }
+
+function snapshot() {
+    return {
+        text: state.text, version: state.version,
+        generating: state.generating, sawGenerating: state.sawGenerating,
+        idleMs: Date.now() - state.lastChange
+    };
+}
+
+if (state.version > since) { done(snapshot()); return; }
+var finished = false;
+function finish() {
+    if (!finished) { finished = true; done(snapshot()); }
+}
+state.waiters.push(finish);
+setTimeout(function () { state.refresh(); finish(); }, waitMs);
+"""
+
+OBSERVER_UNINSTALL_SCRIPT = r"""
+var state = window.__chatgptBotStream;
+if (state && state.observer) { state.observer.disconnect(); }
+window.__chatgptBotStream = null;
+"""
+
+# Defines window.__chatgptBotProbe once per page. The probe returns everything
+# the polling loop needs in one round trip: the newest assistant text (only
+# the suffix past `offset` when the caller's copy is still a valid prefix),
+# whether generation is running, which selector matched and the turn count.
+# Only the newest assistant turn is searched and read, so the cost stays flat
+# as the conversation grows; the response selectors are tried document-wide
+# only when the page has no turn markup. textSource is 'innerText' (layout
+# aware, keeps line breaks between blocks) or 'textContent' (raw, cheaper).
+# `notice` is the text of the newest element matching noticeSelector, where
+# the page shows usage-cap and rate-limit messages.
+PROBE_INSTALL_SCRIPT = r"""
+window.__chatgptBotProbe = function (selectors, busySelector, turnSelector, offset, anchor, textSource, noticeSelector) {
+    var turns = document.querySelectorAll(turnSelector);
+    var lastTurn = turns.length ? turns[turns.length - 1] : null;
+    var notices = noticeSelector ? document.querySelectorAll(noticeSelector) : [];
+    var result = {
+        text: '', offset: 0, length: 0, selector: null,
+        generating: !!document.querySelector(busySelector),
+        turns: turns.length,
+        notice: notices.length ? (notices[notices.length - 1].textContent || '').trim().substring(0, 500) : ''
+    };
+
+    function newest(selector) {
+        if (lastTurn) {
+            var inner = lastTurn.querySelectorAll(selector);
+            if (inner.length) { return inner[inner.length - 1]; }
+            return lastTurn.matches(selector) ? lastTurn : null;
+        }
+        var nodes = document.querySelectorAll(selector);
+        return nodes.length ? nodes[nodes.length - 1] : null;
+    }
+
+    var full = '';
+    for (var i = 0; i < selectors.length; i++) {
+        var node = newest(selectors[i]);
+        if (node) {
+            full = ((textSource === 'textContent' ? node.textContent : node.innerText) || '').trim();
+            if (full) { result.selector = selectors[i]; break; }
+        }
+    }
+    result.length = full.length;
+    if (offset > 0 && offset <= full.length &&
+            full.substring(offset - anchor.length, offset) === anchor) {
+        result.offset = offset;
+        result.text = full.substring(offset);
+    } else {
+        result.text = full;
+    }
+    return result;
+};
+return true;
+"""
+
+# Calls the installed probe. Returns null when the page was reloaded and the
+# probe has to be installed again.
+PROBE_CALL_SCRIPT = r"""
+var probe = window.__chatgptBotProbe;
+if (!probe) { return null; }
+return probe(arguments[0], arguments[1], arguments[2], arguments[3], arguments[4], arguments[5], arguments[6]);
+"""
+
+# Writes saved localStorage and sessionStorage entries in one pass. The state
+# object ({origin, localStorage, sessionStorage}) arrives as data, so quotes in
+# keys or values need no escaping. Entries are only written when the page is
+# on the origin they were saved from. Returns the number of entries written.
+STORAGE_RESTORE_FUNCTION = r"""
+function (state) {
+    if (state.origin && location.origin !== state.origin) { return 0; }
+    var restored = 0;
+    [['localStorage', state.localStorage], ['sessionStorage', state.sessionStorage]].forEach(function (pair) {
+        var items = pair[1] || {};
+        Object.keys(items).forEach(function (key) {
+            try {
+                window[pair[0]].setItem(key, items[key]);
+                restored += 1;
+            } catch (e) {}
+        });
+    });
+    return restored;
+}
+"""
+
+# Runs the restore in an already loaded page. Argument: the state object.
+STORAGE_RESTORE_SCRIPT = "return (" + STORAGE_RESTORE_FUNCTION.strip() + ")(arguments[0]);"
+
+# Source for Page.addScriptToEvaluateOnNewDocument, so the storage is in place
+# before the page's own scripts run. Format with the state as JSON.
+STORAGE_RESTORE_ON_LOAD_SCRIPT = "if (window.top === window) { (" + STORAGE_RESTORE_FUNCTION.strip() + ")(%s); }"
+
+# Readiness check used after navigations: true once the document has been
+# parsed and is not the one marked by PAGE_MARK_STALE_SCRIPT before a reload,
+# i.e. no navigation is still pending.
+PAGE_READY_SCRIPT = r"""
+return document.readyState !== 'loading' && !window.__chatgptBotStaleDocument;
+"""
+
+# Marks the current document before a reload so PAGE_READY_SCRIPT does not
+# mistake it for the new one.
+PAGE_MARK_STALE_SCRIPT = r"""
+window.__chatgptBotStaleDocument = true;
+"""
+
+# Empties localStorage and sessionStorage of the open page, before state of
+# another session is written into it.
+STORAGE_CLEAR_SCRIPT = r"""
+localStorage.clear();
+sessionStorage.clear();
+"""
+
+# Captures everything save_browser_state stores besides cookies in one call.
+STORAGE_CAPTURE_SCRIPT = r"""
+return {
+    localStorage: Object.assign({}, localStorage),
+    sessionStorage: Object.assign({}, sessionStorage),
+    current_url: location.href
+};
+"""
+
+# Focuses the composer (textarea or contenteditable) and selects its content,
+# so text inserted next replaces whatever was there. Argument: the element.
+PROMPT_SELECT_SCRIPT = r"""
+var el = arguments[0];
+el.focus();
+if ('value' in el && el.tagName !== 'DIV') {
+    el.select();
+} else {
+    window.getSelection().selectAllChildren(el);
+}
+"""
+
+# Returns the text of the newest element matching the selector list (the
+# usage-limit notice, see PROBE_INSTALL_SCRIPT), or ''. Argument: the selector.
+NOTICE_READ_SCRIPT = r"""
+var notices = document.querySelectorAll(arguments[0]);
+return notices.length ? (notices[notices.length - 1].textContent || '').trim().substring(0, 500) : '';
+"""
+
+# Returns the composer's current text. Argument: the element.
+PROMPT_READ_SCRIPT = r"""
+var el = arguments[0];
+return ('value' in el && el.tagName !== 'DIV') ? el.value : el.innerText;
+"""
+
+# Replaces the composer's content with the given text in one step and fires
+# the input events the page listens to. Arguments: element, text. Returns the
+# composer's text afterwards.
+PROMPT_SET_SCRIPT = r"""
+var el = arguments[0];
+var text = arguments[1];
+el.focus();
+if ('value' in el && el.tagName !== 'DIV') {
+    // Use the prototype setter so frameworks tracking the value see the change
+    var setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+    setter.call(el, text);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    return el.value;
+}
+window.getSelection().selectAllChildren(el);
+if (!document.execCommand('insertText', false, text)) {
+    el.textContent = text;
+    el.dispatchEvent(new InputEvent('input', {bubbles: true, inputType: 'insertText', data: text}));
+}
+return el.innerText;
+"""
+
+# Walks the newest assistant turn once and returns its content as structured
+# blocks instead of flattened text. Arguments: turn selector, response
+# selectors (tried inside the turn). Returns null when there is no turn, else
+#   {message_id, turn, links: [{text, href}], blocks: [...]} with blocks
+#   {type: 'heading', level, text} | {type: 'paragraph', text}
+#   {type: 'code', language, text} | {type: 'quote', text} | {type: 'rule'}
+#   {type: 'list', ordered, start, items: [{text, list}]}   (list: nested list block or null)
+#   {type: 'table', header: [cells] or null, rows: [[cells]]}
+# Paragraph, heading, item and cell text is inline markdown (code spans,
+# emphasis and links are kept).
+STRUCTURE_EXTRACT_SCRIPT = r"""
+var turns = document.querySelectorAll(arguments[0]);
+if (!turns.length) { return null; }
+var turn = turns[turns.length - 1];
+var root = turn;
+for (var i = 0; i < arguments[1].length; i++) {
+    var inner = turn.querySelectorAll(arguments[1][i]);
+    if (inner.length) { root = inner[inner.length - 1]; break; }
+}
+var links = [];
+var blocks = [];
+var SKIP = {BUTTON: 1, SVG: 1, STYLE: 1, SCRIPT: 1};
+var BLOCKS = 'p, pre, ul, ol, table, blockquote, hr, h1, h2, h3, h4, h5, h6, div';
+
+function inline(node, skipLists) {
+    var out = '';
+    node.childNodes.forEach(function (child) {
+        if (child.nodeType === 3) { out += child.nodeValue; return; }
+        if (child.nodeType !== 1 || SKIP[child.tagName.toUpperCase()]) { return; }
+        var tag = child.tagName;
+        if (skipLists && (tag === 'UL' || tag === 'OL')) { return; }
+        if (tag === 'BR') { out += '\n'; }
+        else if (tag === 'CODE') { out += '`' + child.textContent + '`'; }
+        else if (tag === 'STRONG' || tag === 'B') { out += '**' + inline(child) + '**'; }
+        else if (tag === 'EM' || tag === 'I') { out += '*' + inline(child) + '*'; }
+        else if (tag === 'A') {
+            var text = inline(child);
+            links.push({text: text, href: child.href});
+            out += '[' + text + '](' + child.href + ')';
+        }
+        else { out += inline(child, skipLists); }
+    });
+    return out;
+}
+
+function list(node) {
+    var block = {type: 'list', ordered: node.tagName === 'OL', start: node.start || 1, items: []};
+    Array.prototype.forEach.call(node.children, function (item) {
+        if (item.tagName !== 'LI') { return; }
+        var nested = item.querySelector(':scope > ul, :scope > ol');
+        block.items.push({text: inline(item, true).trim(), list: nested ? list(nested) : null});
+    });
+    return block;
+}
+
+function table(node) {
+    var header = null;
+    var rows = [];
+    node.querySelectorAll('tr').forEach(function (row) {
+        var cells = Array.prototype.map.call(row.children, function (cell) { return inline(cell).trim(); });
+        if (!header && !rows.length && (row.parentNode.tagName === 'THEAD' || row.querySelector('th'))) {
+            header = cells;
+        } else {
+            rows.push(cells);
+        }
+    });
+    return {type: 'table', header: header, rows: rows};
+}
+
+function code(node) {
+    var element = node.querySelector('code') || node;
+    var match = /language-([\w+#.-]+)/.exec(element.className || '');
+    return {type: 'code', language: match ? match[1] : '', text: element.textContent.replace(/\n$/, '')};
+}
+
+function walk(node) {
+    Array.prototype.forEach.call(node.children, function (child) {
+        var tag = child.tagName.toUpperCase();
+        if (SKIP[tag]) { return; }
+        if (/^H[1-6]$/.test(tag)) {
+            blocks.push({type: 'heading', level: parseInt(tag[1], 10), text: inline(child).trim()});
+        } else if (tag === 'P') {
+            var text = inline(child).trim();
+            if (text) { blocks.push({type: 'paragraph', text: text}); }
+        } else if (tag === 'PRE') {
+            blocks.push(code(child));
+        } else if (tag === 'UL' || tag === 'OL') {
+            blocks.push(list(child));
+        } else if (tag === 'TABLE') {
+            blocks.push(table(child));
+        } else if (tag === 'BLOCKQUOTE') {
+            blocks.push({type: 'quote', text: inline(child).trim()});
+        } else if (tag === 'HR') {
+            blocks.push({type: 'rule'});
+        } else if (child.querySelector(BLOCKS)) {
+            walk(child);
+        } else if (child.textContent.trim()) {
+            blocks.push({type: 'paragraph', text: inline(child).trim()});
+        }
+    });
+}
+
+walk(root);
+if (!blocks.length && root.textContent.trim()) {
+    blocks.push({type: 'paragraph', text: root.textContent.trim()});
+}
+return {message_id: turn.getAttribute('data-message-id'), turn: turns.length, links: links, blocks: blocks};
+"""
@@ -0,0 +1,46 @@
+# Memory statistics for the Chrome process tree behind a WebDriver session.
+# Reads /proc, so the numbers are only available on Linux; elsewhere the
+# functions return None.
+import os
+
+
+def _children_by_parent():
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", 'r') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The process name is in parentheses and may contain spaces
+        fields = stat[stat.rfind(")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(name))
+    return children
+
+
+def process_rss(pid):
+    """Return the resident set size of one process in bytes, or None"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return 0
+
+
+def process_tree_rss(pid):
+    """Return the summed resident set size of a process and all its descendants in bytes, or None"""
+    if not os.path.isdir("/proc") or process_rss(pid) is None:
+        return None
+    children = _children_by_parent()
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += process_rss(current) or 0
+        pending.extend(children.get(current, []))
+    return total
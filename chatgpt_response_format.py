@@ -0,0 +1,59 @@
+# Renders the structured answer document returned by STRUCTURE_EXTRACT_SCRIPT
+# (see chatgpt_page_scripts.py) as markdown.
+import re
+
+
+def fence_for(text):
+    """Return a backtick fence longer than any backtick run inside text"""
+    longest = max((len(run) for run in re.findall(r"`+", text)), default=0)
+    return "`" * max(3, longest + 1)
+
+
+def table_cell(text):
+    return text.replace("|", "\\|").replace("\n", " ")
+
+
+def list_lines(block, depth=0):
+    lines = []
+    number = block.get("start") or 1
+    for item in block["items"]:
+        marker = f"{number}." if block["ordered"] else "-"
+        number += 1
+        text_lines = item["text"].split("\n") or [""]
+        lines.append(f"{'   ' * depth}{marker} {text_lines[0]}")
+        lines.extend(f"{'   ' * depth}   {line}" for line in text_lines[1:])
+        if item.get("list"):
+            lines.extend(list_lines(item["list"], depth + 1))
+    return lines
+
+
+def block_markdown(block):
+    """Render one block of a structured answer as markdown"""
+    kind = block["type"]
+    if kind == "heading":
+        return f"{'#' * block['level']} {block['text']}"
+    if kind == "code":
+        fence = fence_for(block["text"])
+        return f"{fence}{block['language']}\n{block['text']}\n{fence}"
+    if kind == "list":
+        return "\n".join(list_lines(block))
+    if kind == "table":
+        rows = [[table_cell(cell) for cell in row] for row in block["rows"]]
+        header = [table_cell(cell) for cell in block["header"]] if block["header"] else None
+        width = max([len(row) for row in rows] + [len(header or [])])
+        if header is None:
+            header = [""] * width
+        lines = ["| " + " | ".join(header + [""] * (width - len(header))) + " |",
+                 "|" + "---|" * width]
+        lines.extend("| " + " | ".join(row + [""] * (width - len(row))) + " |" for row in rows)
+        return "\n".join(lines)
+    if kind == "quote":
+        return "\n".join(f"> {line}" for line in block["text"].split("\n"))
+    if kind == "rule":
+        return "---"
+    return block["text"]
+
+
+def structured_to_markdown(document):
+    """Render a structured answer document as markdown"""
+    return "\n\n".join(block_markdown(block) for block in document["blocks"])
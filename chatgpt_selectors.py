@@ -0,0 +1,160 @@
+"""
+Registry of the CSS selectors the bot uses to find things on the ChatGPT page.
+
+Selectors are read on every use, so after the site changes its DOM a fixed
+selector takes effect on the next poll of every running browser: edit the
+config file and call reload() (the API server exposes this as
+POST /admin/selectors/reload). The config file is JSON and only needs the
+entries that differ from DEFAULT_SELECTORS, e.g.
+    {"response": ["div[data-message-author-role='assistant'] .prose", "div.markdown"]}
+
+Every entry is a list of selectors. Where the first selector that matches
+wins ("response"), the bot records which one matched each answer, how long
+the lookup took and which selectors tried before it missed. get() moves
+selectors that miss most of the time behind the others, so a selector
+broken by a site change stops costing a lookup on every poll. Every
+PROBE_INTERVAL-th get() still returns the config order, and old counts are
+halved as new ones come in, so a demoted selector that works again after
+the next site change is promoted back. The other entries are used as one
+combined selector list (css()).
+"""
+import json
+import os
+import threading
+import time
+
+# A selector that missed more than MAX_MISS_RATIO of at least MIN_ATTEMPTS lookups is tried last
+MIN_ATTEMPTS = 5
+MAX_MISS_RATIO = 0.5
+# Every PROBE_INTERVAL-th get() of a name keeps config order, so demoted selectors are tried again
+PROBE_INTERVAL = 20
+# Hit and miss counts of a selector are halved once they add up to ATTEMPT_WINDOW
+ATTEMPT_WINDOW = 40
+
+SELECTORS_FILE_ENV = "CHATGPT_SELECTORS_FILE"
+DEFAULT_SELECTORS_FILE = "chatgpt_selectors.json"
+
+DEFAULT_SELECTORS = {
+    "prompt": ["#prompt-textarea"],
+    # Tried in order to find the newest assistant message
+    "response": [
+        "div[data-message-author-role='assistant'] div.markdown",
+        "div[data-message-author-role='assistant']",
+        ".text-message",
+        "[data-testid*='conversation-turn']"
+    ],
+    "assistant_turn": ["div[data-message-author-role='assistant']"],
+    "stop_button": ["[data-testid='stop-button']", "button[aria-label='Stop generating']"],
+    "typing_indicator": [".result-streaming", "[data-testid='typing-indicator']"],
+    "login_button": ["[data-testid='login-button']"],
+    # Where usage-cap and rate-limit messages appear (see chatgpt_usage_limits.py)
+    "limit_notice": ["[role='alert']", "div.text-token-text-error", "[data-testid*='limit']"],
+    "send_button": ["[data-testid='send-button']", "button[aria-label='Send prompt']"]
+}
+
+
+class SelectorRegistry:
+    """Selectors loaded from DEFAULT_SELECTORS and an optional JSON config file, with hit statistics"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.selectors = {}
+        self.hits = {}  # (name, selector) -> {"hits", "misses", "seconds", "last_hit"}
+        self.lookups = {}  # name -> get() calls, for probing demoted selectors
+        self.version = 0
+        self.loaded_at = None
+        try:
+            self.reload()
+        except (OSError, ValueError) as e:
+            print(f"Could not load selectors from {path}, using the defaults: {e}")
+            self.selectors = {name: list(values) for name, values in DEFAULT_SELECTORS.items()}
+
+    def reload(self):
+        """Load the config file on top of the defaults; returns the names whose selectors changed
+
+        Raises ValueError (keeping the current selectors) when the file is invalid.
+        """
+        selectors = {name: list(values) for name, values in DEFAULT_SELECTORS.items()}
+        if self.path and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            if not isinstance(config, dict):
+                raise ValueError(f"{self.path} must contain a JSON object")
+            for name, values in config.items():
+                if isinstance(values, str):
+                    values = [values]
+                if not isinstance(values, list) or not values or \
+                        not all(isinstance(value, str) and value.strip() for value in values):
+                    raise ValueError(f"Selectors for {name} must be a non-empty list of strings")
+                selectors[name] = values
+        with self.lock:
+            changed = sorted(name for name in selectors if selectors[name] != self.selectors.get(name))
+            self.selectors = selectors
+            # Statistics of replaced selectors say nothing about the new ones
+            self.hits = {key: entry for key, entry in self.hits.items() if key[0] not in changed}
+            self.version += 1
+            self.loaded_at = time.time()
+        return changed
+
+    def get(self, name):
+        """Return the selectors for name in config order, those that mostly miss moved to the end"""
+        with self.lock:
+            selectors = self.selectors[name]
+            self.lookups[name] = self.lookups.get(name, 0) + 1
+            if self.lookups[name] % PROBE_INTERVAL == 0:
+                return list(selectors)
+            failing = {selector: self.failing(self.hits.get((name, selector))) for selector in selectors}
+        return sorted(selectors, key=lambda selector: failing[selector])
+
+    def failing(self, entry):
+        if not entry:
+            return False
+        attempts = entry["hits"] + entry["misses"]
+        return attempts >= MIN_ATTEMPTS and entry["misses"] / attempts > MAX_MISS_RATIO
+
+    def css(self, name):
+        """Return the selectors for name as one CSS selector list"""
+        with self.lock:
+            return ", ".join(self.selectors[name])
+
+    def entry(self, name, selector):
+        entry = self.hits.setdefault((name, selector), {"hits": 0, "misses": 0, "seconds": 0.0, "last_hit": 0})
+        if entry["hits"] + entry["misses"] >= ATTEMPT_WINDOW:
+            # Recent lookups count more than those before the last site change
+            entry["seconds"] = entry["seconds"] / entry["hits"] * (entry["hits"] // 2) if entry["hits"] else 0.0
+            entry["hits"] //= 2
+            entry["misses"] //= 2
+        return entry
+
+    def record(self, name, selector, seconds, missed=()):
+        """Count a match of selector for name, the time the lookup took and the selectors tried before it"""
+        with self.lock:
+            entry = self.entry(name, selector)
+            entry["hits"] += 1
+            entry["seconds"] += seconds
+            entry["last_hit"] = time.time()
+            for other in missed:
+                self.entry(name, other)["misses"] += 1
+
+    def stats(self):
+        """Return the selectors with their hit counts and average lookup time"""
+        with self.lock:
+            selectors = {}
+            for name, values in self.selectors.items():
+                selectors[name] = []
+                for selector in values:
+                    entry = self.hits.get((name, selector), {"hits": 0, "misses": 0, "seconds": 0.0, "last_hit": 0})
+                    selectors[name].append({
+                        "selector": selector,
+                        "hits": entry["hits"],
+                        "misses": entry["misses"],
+                        "demoted": self.failing(entry),
+                        "avg_ms": round(entry["seconds"] / entry["hits"] * 1000, 2) if entry["hits"] else None,
+                        "last_hit": entry["last_hit"] or None
+                    })
+            return {"path": self.path, "version": self.version, "loaded_at": self.loaded_at, "selectors": selectors}
+
+
+# Shared by every ChatGPTBot in the process
+selector_registry = SelectorRegistry(os.environ.get(SELECTORS_FILE_ENV, DEFAULT_SELECTORS_FILE))
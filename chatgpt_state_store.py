@@ -0,0 +1,327 @@
+import abc
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Where ChatGPTBot keeps browser state when no store is given
+DEFAULT_STATE_DIR = "browser_state"
+
+NAMESPACE_PATTERN = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+def state_digest(cookies, session_data):
+    """Return a stable hash of captured browser state"""
+    payload = json.dumps([cookies, session_data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SessionStateStore(abc.ABC):
+    """Saved browser state (cookies and storage) of many sessions, one namespace each
+
+    Every namespace holds one JSON document:
+        {"namespace": ..., "saved_at": <epoch seconds>, "cookies": [...], "session": {...}}
+    Subclasses decide where the documents live; all methods are safe to
+    call from several threads.
+    """
+
+    def __init__(self, location):
+        self.location = location
+        self.lock = threading.RLock()
+
+    def check_namespace(self, namespace):
+        """Raise ValueError unless namespace is usable as a file name"""
+        if not NAMESPACE_PATTERN.fullmatch(namespace or "") or namespace in (".", ".."):
+            raise ValueError(f"Invalid state namespace: {namespace!r}")
+        return namespace
+
+    def load(self, namespace):
+        """Return (cookies, session data) saved under namespace, or None"""
+        with self.lock:
+            record = self.read_record(self.check_namespace(namespace))
+        if record is None:
+            return None
+        return record.get("cookies", []), record.get("session", {})
+
+    def save(self, namespace, cookies, session_data):
+        """Replace the state saved under namespace"""
+        record = {"namespace": namespace, "saved_at": time.time(), "cookies": cookies, "session": session_data}
+        with self.lock:
+            self.write_record(self.check_namespace(namespace), record)
+
+    def copy(self, source, target):
+        """Copy the state of one namespace to another; returns False if source has no state"""
+        with self.lock:
+            record = self.read_record(self.check_namespace(source))
+            if record is None:
+                return False
+            record = dict(record, namespace=self.check_namespace(target), saved_at=time.time())
+            self.write_record(target, record)
+            return True
+
+    def expire(self, max_age):
+        """Delete state not saved within the last max_age seconds; returns the deleted namespaces"""
+        cutoff = time.time() - max_age
+        with self.lock:
+            expired = [entry["namespace"] for entry in self.list() if entry["saved_at"] < cutoff]
+            for namespace in expired:
+                self.delete(namespace)
+        return expired
+
+    def describe(self, namespace):
+        """Return a human readable location of a namespace, for log messages"""
+        return f"{self.location} [{namespace}]"
+
+    @abc.abstractmethod
+    def list(self):
+        """Return [{"namespace", "saved_at"}] for every saved state"""
+
+    @abc.abstractmethod
+    def delete(self, namespace):
+        """Delete the state of a namespace; returns False if there was none"""
+
+    @abc.abstractmethod
+    def read_record(self, namespace):
+        """Return the document saved under namespace, or None"""
+
+    @abc.abstractmethod
+    def write_record(self, namespace, record):
+        """Replace the document saved under namespace"""
+
+
+class DirectoryStateStore(SessionStateStore):
+    """Keeps each namespace in <directory>/<namespace>.json, replaced atomically on every save"""
+
+    def __init__(self, directory=DEFAULT_STATE_DIR):
+        super().__init__(directory)
+
+    def path(self, namespace):
+        return os.path.join(self.location, f"{namespace}.json")
+
+    def describe(self, namespace):
+        return self.path(namespace)
+
+    def read_record(self, namespace):
+        try:
+            with open(self.path(namespace), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write_record(self, namespace, record):
+        os.makedirs(self.location, exist_ok=True)
+        # A unique temp file in the same directory keeps concurrent writers (even other processes) apart
+        handle, temp_file = tempfile.mkstemp(prefix=f".{namespace}.", suffix=".tmp", dir=self.location)
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as f:
+                json.dump(record, f, separators=(",", ":"))
+            os.replace(temp_file, self.path(namespace))
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+    def list(self):
+        entries = []
+        with self.lock:
+            try:
+                names = sorted(os.listdir(self.location))
+            except FileNotFoundError:
+                return entries
+            for name in names:
+                if name.startswith(".") or not name.endswith(".json"):
+                    continue
+                record = self.read_record(name[:-len(".json")])
+                if record is not None:
+                    entries.append({"namespace": record["namespace"], "saved_at": record["saved_at"]})
+        return entries
+
+    def delete(self, namespace):
+        with self.lock:
+            try:
+                os.remove(self.path(self.check_namespace(namespace)))
+                return True
+            except FileNotFoundError:
+                return False
+
+
+class SqliteStateStore(SessionStateStore):
+    """Keeps every namespace as one row of a SQLite database file"""
+
+    def __init__(self, database):
+        super().__init__(database)
+        directory = os.path.dirname(database)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS browser_state ("
+                "namespace TEXT PRIMARY KEY, saved_at REAL NOT NULL, data TEXT NOT NULL)"
+            )
+
+    @contextmanager
+    def connect(self):
+        # One short-lived connection per call, so the store can be shared between threads
+        connection = sqlite3.connect(self.location, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def read_record(self, namespace):
+        with self.connect() as connection:
+            row = connection.execute("SELECT data FROM browser_state WHERE namespace = ?", (namespace,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def write_record(self, namespace, record):
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO browser_state (namespace, saved_at, data) VALUES (?, ?, ?)",
+                (namespace, record["saved_at"], json.dumps(record, separators=(",", ":")))
+            )
+
+    def list(self):
+        with self.connect() as connection:
+            rows = connection.execute("SELECT namespace, saved_at FROM browser_state ORDER BY namespace").fetchall()
+        return [{"namespace": namespace, "saved_at": saved_at} for namespace, saved_at in rows]
+
+    def delete(self, namespace):
+        with self.lock, self.connect() as connection:
+            cursor = connection.execute("DELETE FROM browser_state WHERE namespace = ?",
+                                        (self.check_namespace(namespace),))
+            return cursor.rowcount > 0
+
+
+def open_state_store(location=DEFAULT_STATE_DIR):
+    """Open a SQLite store for *.db / *.sqlite paths, a directory store otherwise"""
+    if location.endswith((".db", ".sqlite", ".sqlite3")):
+        return SqliteStateStore(location)
+    return DirectoryStateStore(location)
+
+
+class StateWriter:
+    """Saves the browser state of bots in the background, debounced and only when it changed
+
+    schedule(bot) marks the state of a bot dirty. Once no further schedule()
+    call for that bot arrived for `debounce` seconds, a background thread
+    captures the state, compares its hash with the last written one and
+    writes it only when it differs. A bot that is busy answering a question
+    is retried after another debounce period.
+    """
+
+    def __init__(self, debounce=2.0):
+        self.debounce = debounce
+        self.pending = {}   # id(bot) -> [bot, time the write is due]
+        self.digests = {}   # (store location, namespace) -> digest of the last written state
+        self.writes = 0
+        self.skipped = 0
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.running = False
+        self.worker = None
+
+    def start(self):
+        """Start the background writer thread"""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.worker = threading.Thread(target=self._run, name="state-writer", daemon=True)
+        self.worker.start()
+
+    def schedule(self, bot):
+        """Save the state of bot once it stopped changing for the debounce period"""
+        self.start()
+        with self.condition:
+            self.pending[id(bot)] = [bot, time.time() + self.debounce]
+            self.condition.notify_all()
+
+    def save(self, bot):
+        """Save the state of bot now, even if it looks unchanged; returns True on success"""
+        with self.condition:
+            self.pending.pop(id(bot), None)
+        return self._persist(bot, blocking=True, force=True)
+
+    def flush(self, bot=None):
+        """Write the pending state of bot (or of every bot) now, e.g. before its browser closes"""
+        with self.condition:
+            if bot is None:
+                entries = list(self.pending.values())
+                self.pending.clear()
+            else:
+                entry = self.pending.pop(id(bot), None)
+                entries = [entry] if entry else []
+        for pending_bot, _ in entries:
+            self._persist(pending_bot, blocking=True)
+
+    def stop(self):
+        """Flush all pending state and stop the writer thread"""
+        self.flush()
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def stats(self):
+        """Return the number of pending, written and skipped (unchanged) saves"""
+        with self.condition:
+            return {"pending": len(self.pending), "writes": self.writes, "skipped": self.skipped}
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                now = time.time()
+                due = [entry for entry in self.pending.values() if entry[1] <= now]
+                if not due:
+                    next_due = min((entry[1] for entry in self.pending.values()), default=None)
+                    self.condition.wait(None if next_due is None else next_due - now)
+                    continue
+                for bot, _ in due:
+                    del self.pending[id(bot)]
+            for bot, _ in due:
+                if self._persist(bot, blocking=False) is None:
+                    # Busy with a question, try again once it is over
+                    with self.condition:
+                        self.pending.setdefault(id(bot), [bot, time.time() + self.debounce])
+
+    def _persist(self, bot, blocking, force=False):
+        """Capture and write the state of bot; returns None if bot was busy and blocking is False"""
+        if not bot.browser_lock.acquire(blocking=blocking):
+            return None
+        try:
+            captured = bot.capture_browser_state()
+        except Exception as e:
+            bot.log_status(f"Could not capture browser state: {e}")
+            return False
+        finally:
+            bot.browser_lock.release()
+        if captured is None:
+            return True
+
+        cookies, session_data = captured
+        digest = state_digest(cookies, session_data)
+        key = (bot.state_store.location, bot.state_namespace)
+        with self.write_lock:
+            if not force and self.digests.get(key) == digest:
+                with self.condition:
+                    self.skipped += 1
+                return True
+            started = time.time()
+            try:
+                bot.write_browser_state(cookies, session_data)
+            except Exception as e:
+                bot.log_status(f"Error saving browser state: {e}")
+                return False
+            self.digests[key] = digest
+        with self.condition:
+            self.writes += 1
+        bot.log_status(f"Browser state saved in {time.time() - started:.3f}s")
+        return True
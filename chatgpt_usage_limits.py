@@ -0,0 +1,91 @@
+"""
+Recognises the usage-cap and rate-limit notices ChatGPT shows instead of an answer.
+
+The page probe reads the text of the elements matched by the "limit_notice"
+selectors (see chatgpt_selectors.py). classify_notice() turns that text into
+a UsageLimitError with an estimate of when asking again makes sense, taken
+from the notice ("try again in 20 minutes", "resets at 3:45 PM") where it
+says so.
+"""
+import re
+import time
+from datetime import datetime, timedelta
+
+USAGE_CAP = "usage_cap"
+RATE_LIMIT = "rate_limit"
+
+# Seconds to wait when the notice does not say
+DEFAULT_RETRY_AFTER = {USAGE_CAP: 3600, RATE_LIMIT: 60}
+
+NOTICE_PATTERNS = [
+    (USAGE_CAP, re.compile(
+        r"usage (?:cap|limit)|(?:reached|hit) (?:our|the|your) (?:\w+ )?limit|limit of messages|"
+        r"out of (?:free )?messages|plan limit",
+        re.IGNORECASE
+    )),
+    (RATE_LIMIT, re.compile(
+        r"too many (?:requests|messages)|rate limit|too quickly|slow down|unusual activity",
+        re.IGNORECASE
+    ))
+]
+
+# "try again in 20 minutes", not the window in "too many requests in 1 hour"
+RETRY_IN_PATTERN = re.compile(
+    r"\b(?:again|retry|wait|resets?)\s+(?:in|for)\s+(\d+)\s+(second|minute|hour)s?\b", re.IGNORECASE
+)
+RETRY_AT_PATTERN = re.compile(r"\b(?:after|at|until) (\d{1,2}):(\d{2})\s*([AaPp][Mm])?\b")
+UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+class UsageLimitError(Exception):
+    """ChatGPT refused to answer because of a usage cap or rate limit
+
+    kind is USAGE_CAP or RATE_LIMIT, retry_after the estimated seconds until
+    a question can be asked again and until the epoch time of that moment.
+    """
+
+    def __init__(self, kind, notice, retry_after, now=None):
+        super().__init__(f"{kind.replace('_', ' ')}: {notice} (retry after {retry_after:.0f}s)")
+        self.kind = kind
+        self.notice = notice
+        self.retry_after = retry_after
+        self.until = (now or time.time()) + retry_after
+
+    def remaining(self, now=None):
+        """Return the seconds still to wait, 0 once the limit should have lifted"""
+        return max(0.0, self.until - (now or time.time()))
+
+
+def retry_after_seconds(notice, now):
+    """Return the wait the notice asks for in seconds, or None if it names no time"""
+    match = RETRY_IN_PATTERN.search(notice)
+    if match:
+        return int(match.group(1)) * UNIT_SECONDS[match.group(2).lower()]
+    match = RETRY_AT_PATTERN.search(notice)
+    if match:
+        hour, minute, meridiem = int(match.group(1)), int(match.group(2)), match.group(3)
+        if meridiem:
+            hour = hour % 12 + (12 if meridiem.lower() == "pm" else 0)
+        if hour > 23 or minute > 59:
+            return None
+        current = datetime.fromtimestamp(now)
+        at = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if at <= current:
+            at += timedelta(days=1)
+        return (at - current).total_seconds()
+    return None
+
+
+def classify_notice(notice, now=None):
+    """Return a UsageLimitError for a usage-cap or rate-limit notice, or None for any other text"""
+    notice = " ".join((notice or "").split())
+    if not notice:
+        return None
+    now = now or time.time()
+    for kind, pattern in NOTICE_PATTERNS:
+        if pattern.search(notice):
+            retry_after = retry_after_seconds(notice, now)
+            if retry_after is None:
+                retry_after = DEFAULT_RETRY_AFTER[kind]
+            return UsageLimitError(kind, notice, retry_after, now)
+    return None
@@ -0,0 +1,128 @@
+# Wait strategies used by ChatGPTBot to decide how often to check the page
+# and when an answer is complete.
+#
+# A strategy is driven by the bot's wait loop:
+#     strategy.start(now)
+#     while True:
+#         phase = strategy.update(now, text, generating)
+#         if phase in ("complete", "timeout"): break
+#         sleep(strategy.next_delay())
+
+WAITING = "waiting"        # no answer text yet
+GENERATING = "generating"  # text is growing or the stop button is visible
+SETTLING = "settling"      # generation looks finished, waiting for the text to settle
+COMPLETE = "complete"
+TIMEOUT = "timeout"
+
+
+class FixedWaitStrategy:
+    """Original behaviour: check once a second, done after 3 stable checks, give up after 120 checks"""
+
+    def __init__(self, poll_interval=1.0, stable_checks=3, max_checks=120):
+        self.poll_interval = poll_interval
+        self.stable_checks = stable_checks
+        self.max_checks = max_checks
+        self.start(0)
+
+    def start(self, now):
+        """Reset the strategy for a new answer"""
+        self.checks = 0
+        self.stable_count = 0
+        self.previous_text = ""
+        self.phase = WAITING
+
+    def update(self, now, text, generating):
+        """Record one check of the page and return the current phase"""
+        self.checks += 1
+        if not text:
+            self.phase = WAITING
+        elif generating or text != self.previous_text:
+            self.stable_count = 0
+            self.phase = GENERATING
+        else:
+            self.stable_count += 1
+            self.phase = SETTLING
+            if self.stable_count >= self.stable_checks:
+                self.phase = COMPLETE
+        self.previous_text = text
+        if self.phase != COMPLETE and self.checks >= self.max_checks:
+            self.phase = TIMEOUT
+        return self.phase
+
+    def next_delay(self):
+        """Seconds to wait before the next check"""
+        return self.poll_interval
+
+
+class AdaptiveWaitStrategy:
+    """Poll fast while generating, back off while waiting, extend the deadline while text grows
+
+    - before the first token the delay grows from first_token_poll by backoff
+      up to max_poll, and the wait ends after first_token_timeout seconds
+      unless the stop button shows the model is still working
+    - while generating the page is checked every generating_poll seconds
+    - once the stop button is gone the answer is complete after the text has
+      not changed for stability_window seconds (unobserved_stability_window
+      if the stop button was never seen, since its selector may be stale)
+    - while text keeps growing the wait only ends after idle_timeout seconds
+      without progress, or after max_total seconds in all
+    """
+
+    def __init__(self, first_token_poll=0.1, backoff=1.5, max_poll=1.0, generating_poll=0.2,
+                 stability_window=0.5, unobserved_stability_window=2.0,
+                 first_token_timeout=60.0, idle_timeout=30.0, max_total=900.0):
+        self.first_token_poll = first_token_poll
+        self.backoff = backoff
+        self.max_poll = max_poll
+        self.generating_poll = generating_poll
+        self.stability_window = stability_window
+        self.unobserved_stability_window = unobserved_stability_window
+        self.first_token_timeout = first_token_timeout
+        self.idle_timeout = idle_timeout
+        self.max_total = max_total
+        self.start(0)
+
+    def start(self, now):
+        """Reset the strategy for a new answer"""
+        self.started_at = now
+        self.last_change_at = now
+        self.previous_text = ""
+        self.saw_generating = False
+        self.waiting_delay = self.first_token_poll
+        self.phase = WAITING
+
+    def update(self, now, text, generating):
+        """Record one check of the page and return the current phase"""
+        if text != self.previous_text:
+            self.previous_text = text
+            self.last_change_at = now
+        if generating:
+            self.saw_generating = True
+
+        if now - self.started_at >= self.max_total:
+            self.phase = TIMEOUT
+        elif not text:
+            if self.phase != WAITING:
+                self.waiting_delay = self.first_token_poll
+            # A visible stop button before the first token means the model is still thinking
+            waited = now - self.started_at
+            self.phase = TIMEOUT if waited >= self.first_token_timeout and not generating else WAITING
+        elif generating:
+            idle = now - self.last_change_at
+            self.phase = TIMEOUT if idle >= self.idle_timeout else GENERATING
+        else:
+            window = self.stability_window if self.saw_generating else self.unobserved_stability_window
+            idle = now - self.last_change_at
+            self.phase = COMPLETE if idle >= window else SETTLING
+        return self.phase
+
+    def next_delay(self):
+        """Seconds to wait before the next check"""
+        if self.phase == WAITING:
+            delay = self.waiting_delay
+            self.waiting_delay = min(self.waiting_delay * self.backoff, self.max_poll)
+            return delay
+        if self.phase == SETTLING:
+            window = self.stability_window if self.saw_generating else self.unobserved_stability_window
+            return min(self.generating_poll, window)
+        return self.generating_poll
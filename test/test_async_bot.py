@@ -0,0 +1,122 @@
+"""
+Test the asyncio bot interface
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from chatgpt_async_bot import AsyncChatGPTBot, BrowserExecutor
+
+
+def fake_question_steps(bot, chunks):
+    """Replace the browser steps of a ChatGPTBot with a scripted answer"""
+    state = {"sent": 0}
+
+    def start_question(query, conversation_id=None):
+        bot.emitted_response = ""
+        return type("Question", (), {"observed": False})()
+
+    def poll_question(question):
+        if state["sent"] == len(chunks):
+            return None
+        state["sent"] += 1
+        bot.update_response("".join(chunks[:state["sent"]]))
+        return 0.01
+
+    bot.start_question = start_question
+    bot.poll_question = poll_question
+    bot.finish_question = lambda question: "".join(chunks)
+
+
+def test_stream_deltas():
+    """Test that stream() yields deltas that rebuild the answer while other bots keep running"""
+    async def run():
+        bots = [AsyncChatGPTBot(status_callback=lambda message: None) for _ in range(3)]
+        for number, bot in enumerate(bots):
+            fake_question_steps(bot.bot, [f"bot{number} ", "line one\n", "line two"])
+
+        async def collect(bot):
+            text = ""
+            async for offset, appended in bot.stream("question"):
+                text = text[:offset] + appended
+            return text, bot.last_answer
+
+        return await asyncio.gather(*(collect(bot) for bot in bots))
+
+    for number, (text, answer) in enumerate(asyncio.run(run())):
+        assert text == answer == f"bot{number} line one\nline two", (text, answer)
+    print("✓ Async response streaming working")
+
+
+def test_browser_executor_queues_per_session():
+    """Test that calls run one at a time per key and queued calls do not hold worker threads"""
+    executor = BrowserExecutor(ThreadPoolExecutor(max_workers=2))
+    order = []
+    release = threading.Event()
+
+    def blocking(name):
+        release.wait(5)
+        order.append(name)
+        return name
+
+    async def run():
+        slow = [asyncio.ensure_future(executor.run("a", blocking, f"a{number}")) for number in range(3)]
+        for _ in range(100):
+            if executor.stats()["running"]:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.stats() == {"max_workers": 2, "running": 1, "waiting": 2, "busy_keys": 1}, executor.stats()
+        # Session "a" holds one worker, so "b" still gets one right away
+        started = time.time()
+        assert await executor.run("b", lambda: "b") == "b"
+        assert time.time() - started < 1
+        release.set()
+        return await asyncio.gather(*slow)
+
+    assert asyncio.run(run()) == ["a0", "a1", "a2"]
+    assert order == ["a0", "a1", "a2"], order
+    assert executor.stats()["busy_keys"] == 0
+    print("✓ Per-session browser executor working")
+
+
+def test_cancelled_question_releases_browser_lock():
+    """Test that a cancelled question frees the browser lock, but only after the running browser call returned"""
+    bot = AsyncChatGPTBot(status_callback=lambda message: None)
+    release = threading.Event()
+
+    def slow_poll(question):
+        release.wait(5)
+        return None
+
+    fake_question_steps(bot.bot, ["answer"])
+    bot.bot.poll_question = slow_poll
+
+    async def run():
+        # Cancelled while another thread holds the lock: it must not stay taken once acquired
+        bot.bot.browser_lock.acquire()
+        waiting = asyncio.ensure_future(bot.ask("question"))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        bot.bot.browser_lock.release()
+        await asyncio.sleep(0.05)
+        assert bot.bot.browser_lock.acquire(timeout=1)
+        bot.bot.browser_lock.release()
+
+        # Cancelled while a worker polls the page: the lock stays held until the poll returns
+        asking = asyncio.ensure_future(bot.ask("question"))
+        await asyncio.sleep(0.05)
+        asking.cancel()
+        await asyncio.sleep(0.05)
+        assert bot.bot.browser_lock.locked()
+        release.set()
+        await asyncio.sleep(0.05)
+        assert not bot.bot.browser_lock.locked()
+
+    asyncio.run(run())
+    print("✓ Cancelled question lock handling working")
+
+
+if __name__ == "__main__":
+    test_stream_deltas()
+    test_browser_executor_queues_per_session()
+    test_cancelled_question_releases_browser_lock()
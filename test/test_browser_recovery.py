@@ -0,0 +1,93 @@
+"""
+Test browser crash detection and recovery
+"""
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException, TimeoutException
+from chatgpt_bot_core import ChatGPTBot
+from chatgpt_browser_supervisor import BrowserSupervisor, is_browser_crash
+
+
+class CrashingBot(ChatGPTBot):
+    """Bot whose browser dies during the first `crashes` questions; relaunches are recorded"""
+
+    def __init__(self, crashes=1, **options):
+        super().__init__(status_callback=lambda message: None, **options)
+        self.crashes = crashes
+        self.asked = []
+        self.launches = 0
+        self.driver = DeadDriver()
+
+    def wait_for_answer(self, query, conversation_id=None):
+        self.asked.append(conversation_id)
+        if len(self.asked) <= self.crashes:
+            raise InvalidSessionIdException("invalid session id")
+        return f"answer to {query}"
+
+    def launch_browser(self):
+        self.launches += 1
+        self.driver = DeadDriver()
+        self.crashed = False
+        return True
+
+    def load_browser_state(self):
+        return True
+
+
+class DeadDriver:
+    def execute_script(self, script):
+        raise WebDriverException("chrome not reachable")
+
+    def quit(self):
+        raise ConnectionRefusedError()
+
+
+def test_crash_errors():
+    """Test that errors of a dead browser are told apart from ordinary WebDriver errors"""
+    assert is_browser_crash(InvalidSessionIdException("invalid session id"))
+    assert is_browser_crash(WebDriverException("unknown error: session deleted because of page crash"))
+    assert is_browser_crash(WebDriverException("disconnected: not connected to DevTools"))
+    assert is_browser_crash(ConnectionRefusedError(111, "Connection refused"))
+    assert not is_browser_crash(TimeoutException("element not found"))
+    assert not is_browser_crash(WebDriverException("javascript error: x is not defined"))
+    print("✓ Crash error detection working")
+
+
+def test_question_retried_after_crash():
+    """Test that a question interrupted by a crash is asked once more in the same conversation"""
+    events = []
+    bot = CrashingBot(recovery_callback=events.append)
+    bot.conversation_id = "abc-123"
+    assert bot.ask_question_and_get_response("hi") == "answer to hi"
+    assert bot.asked == [None, "abc-123"], bot.asked
+    assert bot.launches == 1 and not bot.crashed
+    assert events == bot.recovery_events and events[0]["success"], events
+    assert events[0]["reason"].startswith("invalid session id"), events
+
+    # A second crash in the retry is not retried again
+    bot = CrashingBot(crashes=2)
+    assert bot.ask_question_and_get_response("hi") is None
+    assert len(bot.asked) == 2 and bot.crashed
+
+    # Without auto_recover the session is only marked as crashed
+    bot = CrashingBot(auto_recover=False)
+    assert bot.ask_question_and_get_response("hi") is None
+    assert bot.launches == 0 and bot.crashed and not bot.recovery_events
+    print("✓ Question retry after crash working")
+
+
+def test_supervisor_recovers_idle_browser():
+    """Test that the supervisor relaunches a dead idle browser and skips busy ones"""
+    supervisor = BrowserSupervisor(interval=0)
+    bot = CrashingBot()
+    with bot.browser_lock:
+        assert supervisor.check(bot) is None
+    assert supervisor.check(bot) is True
+    assert bot.launches == 1 and len(bot.recovery_events) == 1
+    assert bot.recovery_events[0]["reason"] == "liveness probe failed"
+    assert supervisor.stats()["recoveries"] == 1
+    print("✓ Supervisor recovery working")
+
+
+if __name__ == "__main__":
+    test_crash_errors()
+    test_question_retried_after_crash()
+    test_supervisor_recovers_idle_browser()
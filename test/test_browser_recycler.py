@@ -0,0 +1,100 @@
+"""
+Test browser recycling and the standby browser handoff
+"""
+import time
+from chatgpt_bot_core import ChatGPTBot
+from chatgpt_browser_recycler import BrowserRecycler
+
+
+class FakeDriver:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+        self.current_url = ChatGPTBot.CHATGPT_URL
+
+    def quit(self):
+        self.closed = True
+
+
+class StandbyBot(ChatGPTBot):
+    """Bot that hands out fake standby browsers instead of launching Chrome"""
+
+    def __init__(self, rss=None, **options):
+        super().__init__(status_callback=lambda message: None, **options)
+        self.rss = rss
+        self.saves = 0
+        self.standbys = 0
+        self.attach_browser(FakeDriver("first"))
+
+    def browser_rss(self):
+        return self.rss
+
+    def save_browser_state(self):
+        self.saves += 1
+        return True
+
+    def launch_standby(self):
+        self.standbys += 1
+        standby = ChatGPTBot(status_callback=lambda message: None)
+        standby.attach_browser(FakeDriver(f"standby {self.standbys}"))
+        return standby
+
+
+def test_recycle_reasons():
+    """Test that each limit triggers recycling and a limit of 0 is disabled"""
+    bot = StandbyBot(rss=600 * 1024 * 1024)
+    assert BrowserRecycler().recycle_reason(bot) is None
+
+    bot.questions_asked = 3
+    assert BrowserRecycler(max_questions=3).recycle_reason(bot) == "3 questions answered"
+    assert BrowserRecycler(max_questions=4).recycle_reason(bot) is None
+
+    bot.browser_started_at = time.time() - 7200
+    assert BrowserRecycler(max_age=3600).recycle_reason(bot) == "running for 2.0h"
+
+    assert BrowserRecycler(max_rss=500 * 1024 * 1024).recycle_reason(bot) == "using 600 MB"
+    bot.rss = None  # not available outside Linux
+    assert BrowserRecycler(max_rss=500 * 1024 * 1024).recycle_reason(bot) is None
+    print("✓ Recycle limits working")
+
+
+def test_standby_handoff():
+    """Test that the browser is swapped for a standby one after saving state"""
+    bot = StandbyBot()
+    first = bot.driver
+    bot.questions_asked = 5
+    recycler = BrowserRecycler(max_questions=5)
+    assert recycler.recycle(bot, "test")
+    assert bot.saves == 1 and bot.driver.name == "standby 1" and first.closed
+    assert bot.questions_asked == 0 and recycler.stats()["recycles"] == 1
+
+    # A session that closed its browser while the standby loaded keeps it closed
+    bot.close_browser()
+    assert not recycler.hand_over(bot)
+    assert bot.driver is None
+    print("✓ Standby handoff working")
+
+
+def test_schedule_runs_once_per_bot():
+    """Test that a bot already being recycled is not recycled twice at once"""
+    bot = StandbyBot()
+    bot.questions_asked = 1
+    recycler = BrowserRecycler(max_questions=1)
+    with bot.browser_lock:
+        # The swap waits for the running question
+        assert recycler.schedule(bot) == "1 questions answered"
+        assert recycler.schedule(bot) is None
+        time.sleep(0.1)
+        assert bot.driver.name == "first"
+    for _ in range(50):
+        if recycler.stats()["recycles"]:
+            break
+        time.sleep(0.05)
+    assert bot.driver.name == "standby 1" and bot.standbys == 1
+    print("✓ Background recycling working")
+
+
+if __name__ == "__main__":
+    test_recycle_reasons()
+    test_standby_handoff()
+    test_schedule_runs_once_per_bot()
@@ -0,0 +1,35 @@
+"""
+Test the chromedriver resolver cache
+"""
+import os
+import tempfile
+from chatgpt_driver_resolver import ChromeDriverResolver, DRIVER_PATH_ENV
+
+
+def test_pinned_driver_path():
+    """Test that a pinned driver path is used and resolved only once per process"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        driver_path = os.path.join(temp_dir, "chromedriver")
+        open(driver_path, "w").close()
+        
+        old_value = os.environ.get(DRIVER_PATH_ENV)
+        os.environ[DRIVER_PATH_ENV] = driver_path
+        try:
+            messages = []
+            resolver = ChromeDriverResolver(cache_file=os.path.join(temp_dir, "cache.json"))
+            assert resolver.resolve(messages.append) == driver_path
+            assert resolver.source == DRIVER_PATH_ENV
+            
+            # Second call is answered from memory, without logging a new resolution
+            assert resolver.resolve(messages.append) == driver_path
+            assert len(messages) == 1, messages
+        finally:
+            if old_value is None:
+                del os.environ[DRIVER_PATH_ENV]
+            else:
+                os.environ[DRIVER_PATH_ENV] = old_value
+    print("✓ Pinned driver path working")
+
+
+if __name__ == "__main__":
+    test_pinned_driver_path()
@@ -0,0 +1,67 @@
+"""
+Test the session event log behind the SSE endpoints
+"""
+import asyncio
+import threading
+from chatgpt_event_stream import SessionEventLog, format_sse
+
+
+def test_resume_after_last_event_id():
+    """Test that readers get exactly the events after their last ID, or learn that some were dropped"""
+    events = SessionEventLog(size=3)
+    for number in range(5):
+        events.publish("delta", {"offset": number, "text": "x"})
+
+    pending, complete = events.since(3)
+    assert [event[0] for event in pending] == [4, 5] and complete
+    assert events.since(5) == ([], True)
+
+    # Events 1 and 2 are gone, so a reader that stopped at 1 has to resync
+    pending, complete = events.since(1)
+    assert [event[0] for event in pending] == [3, 4, 5] and not complete
+
+    assert format_sse(7, "log", {"message": "hi"}) == 'id: 7\nevent: log\ndata: {"message":"hi"}\n\n'
+    print("✓ Event resume working")
+
+
+def test_wait_wakes_on_publish_from_thread():
+    """Test that a waiting handler wakes when a worker thread publishes"""
+    events = SessionEventLog()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, lambda: threading.Thread(target=events.publish, args=("log", {})).start())
+        started = loop.time()
+        await events.wait(0, timeout=5)
+        return loop.time() - started
+
+    assert asyncio.run(run()) < 1
+    print("✓ Event wake-up working")
+
+
+def test_job_history_size():
+    """Test that a session keeps its last JOB_HISTORY finished jobs and never drops running ones"""
+    import chatgpt_api_server as server
+
+    session_id = "job-history-test"
+    try:
+        finished = []
+        for _ in range(60):
+            finished.append(server.add_job(session_id))
+            server.finish_job(session_id, finished[-1], "done", {"status": "completed"})
+        assert list(server.session_jobs[session_id]) == finished
+
+        running = server.add_job(session_id)
+        for _ in range(server.JOB_HISTORY):
+            server.finish_job(session_id, server.add_job(session_id), "done", {"status": "completed"})
+        jobs = server.session_jobs[session_id]
+        assert len(jobs) == server.JOB_HISTORY and running in jobs and finished[-1] not in jobs
+    finally:
+        server.session_jobs.pop(session_id, None)
+    print("✓ Job history size working")
+
+
+if __name__ == "__main__":
+    test_resume_after_last_event_id()
+    test_wait_wakes_on_publish_from_thread()
+    test_job_history_size()
@@ -44,5 +44,30 @@ This makes it easier to build reliable AI applications with proper data validati
     
     print("\nTest completed successfully!")
 
+def test_line_tracker():
+    """Test that streamed answers log each completed line only once"""
+    from chatgpt_bot_core import ResponseLineTracker
+    
+    logged = []
+    tracker = ResponseLineTracker(lambda line, line_number: logged.append((line_number, line)))
+    
+    # Simulate an answer arriving in chunks
+    for chunk_end in range(1, len("First line\n\nSecond line\nThird") + 1):
+        tracker.feed("First line\n\nSecond line\nThird"[:chunk_end])
+    print(f"Logged while streaming: {logged}")
+    assert logged == [(1, "First line"), (3, "Second line")]
+    
+    # The last line has no newline, so it is only logged on flush
+    tracker.flush("First line\n\nSecond line\nThird line")
+    assert logged[-1] == (4, "Third line")
+    assert len(logged) == 3
+    
+    # Flushing again logs nothing new
+    tracker.flush("First line\n\nSecond line\nThird line")
+    assert len(logged) == 3
+    
+    print("\nLine tracker test completed successfully!")
+
 if __name__ == "__main__":
     test_response_callback()
+    test_line_tracker()
@@ -56,6 +56,31 @@ def test_imports():
         print(f"❌ Test failed: {e}")
         return False
 
+def test_delta_callback():
+    """Test that the delta callback only receives the changed part of the response"""
+    from chatgpt_bot_core import ChatGPTBot
+    
+    deltas = []
+    bot = ChatGPTBot(delta_callback=lambda offset, text: deltas.append((offset, text)))
+    bot.update_response("Hello")
+    bot.update_response("Hello world")
+    bot.update_response("Hello world")
+    bot.update_response("Goodbye")
+    bot.update_response("Goodbye **bold")
+    bot.update_response("Goodbye bold")
+    assert deltas == [(0, "Hello"), (5, " world"), (0, "Goodbye"), (7, " **bold"), (8, "bold")], deltas
+    print("✓ Delta callback functionality working")
+
+def test_prompt_text_comparison():
+    """Test that a prompt read back from the composer must keep its line breaks and spaces"""
+    from chatgpt_bot_core import same_prompt_text
+    
+    query = "Line one\n\n    indented  code\nlast"
+    assert same_prompt_text("Line one\n\n\n    indented\u00a0 code \nlast\n", query)
+    assert not same_prompt_text("Line one    indented  code last", query)
+    assert not same_prompt_text("Line one\nindented code\nlast", query)
+    print("✓ Prompt text comparison working")
+
 def test_backward_compatibility():
     """Test that backward compatibility works"""
     print("\nTesting backward compatibility...")
@@ -82,6 +107,8 @@ if __name__ == "__main__":
     print("=" * 40)
     
     success1 = test_imports()
+    test_delta_callback()
+    test_prompt_text_comparison()
     success2 = test_backward_compatibility()
     
     if success1 and success2:
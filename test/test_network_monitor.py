@@ -0,0 +1,85 @@
+"""
+Test the CDP network monitor that detects the end of the answer stream
+"""
+import json
+from chatgpt_bot_core import ChatGPTBot, QuestionState
+from chatgpt_network_monitor import ConversationStreamMonitor
+
+
+def log_entry(method, **params):
+    """Build a performance log entry like chromedriver returns it"""
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+def test_stream_monitor():
+    """Test that the conversation request is followed from start to close"""
+    monitor = ConversationStreamMonitor()
+    monitor.feed([
+        log_entry("Network.requestWillBeSent", requestId="1", timestamp=10.0,
+                  request={"method": "GET", "url": "https://chatgpt.com/backend-api/models"}),
+        log_entry("Network.requestWillBeSent", requestId="2", timestamp=10.0,
+                  request={"method": "POST", "url": "https://chatgpt.com/backend-api/f/conversation"}),
+        log_entry("Network.responseReceived", requestId="2", timestamp=10.4, response={"status": 200}),
+        log_entry("Network.dataReceived", requestId="1", timestamp=10.5, dataLength=999),
+        log_entry("Network.dataReceived", requestId="2", timestamp=10.6, dataLength=100),
+        log_entry("Network.dataReceived", requestId="2", timestamp=11.0, dataLength=50),
+    ])
+    assert monitor.started and not monitor.finished
+    
+    monitor.feed([log_entry("Network.loadingFinished", requestId="2", timestamp=12.5)])
+    assert monitor.finished
+    timing = monitor.timing()
+    print(f"Stream timing: {timing}")
+    assert timing["time_to_first_byte"] == 0.6
+    assert timing["stream_duration"] == 2.5
+    assert timing["bytes_received"] == 150
+    assert timing["status"] == 200
+    print("✓ Stream monitor working")
+
+
+def test_stream_monitor_failure():
+    """Test that a failed stream also ends the wait"""
+    monitor = ConversationStreamMonitor()
+    monitor.feed([
+        log_entry("Network.requestWillBeSent", requestId="7", timestamp=1.0,
+                  request={"method": "POST", "url": "http://127.0.0.1:8765/backend-api/conversation?words=5"}),
+        log_entry("Network.loadingFailed", requestId="7", timestamp=2.0, errorText="net::ERR_ABORTED"),
+        {"message": "not json"}
+    ])
+    assert monitor.finished
+    assert monitor.timing()["error"] == "net::ERR_ABORTED"
+    print("✓ Stream monitor failure handling working")
+
+
+class LogDriver:
+    current_url = ChatGPTBot.CHATGPT_URL
+
+    def get_log(self, kind):
+        return []
+
+
+def test_failed_stream_is_incomplete():
+    """Test that an answer whose stream failed is returned with the incomplete warning"""
+    bot = ChatGPTBot(status_callback=lambda message: None, stream_mode="network")
+    bot.driver = LogDriver()
+    bot.probe_page = lambda known_text="": {
+        "text": "Half an answ", "generating": False, "turns": 1, "notice": "", "selector": None,
+        "seconds": 0, "missed": []
+    }
+    bot.stream_monitor.feed([
+        log_entry("Network.requestWillBeSent", requestId="7", timestamp=1.0,
+                  request={"method": "POST", "url": "https://chatgpt.com/backend-api/conversation"}),
+        log_entry("Network.responseReceived", requestId="7", timestamp=1.2, response={"status": 200}),
+        log_entry("Network.loadingFailed", requestId="7", timestamp=2.0, errorText="net::ERR_CONNECTION_RESET")
+    ])
+    question = QuestionState("question")
+    assert bot.poll_question(question) is None
+    assert question.appeared and not question.completed
+    assert bot.finish_question(question).startswith("[WARNING: Response may be incomplete]")
+    print("✓ Failed stream handling working")
+
+
+if __name__ == "__main__":
+    test_stream_monitor()
+    test_stream_monitor_failure()
+    test_failed_stream_is_incomplete()
@@ -0,0 +1,41 @@
+"""
+Test markdown rendering of structured answers
+"""
+from chatgpt_response_format import structured_to_markdown
+
+
+def test_structured_to_markdown():
+    """Test that every block type renders as markdown"""
+    document = {
+        "blocks": [
+            {"type": "heading", "level": 2, "text": "Result"},
+            {"type": "paragraph", "text": "See [docs](https://example.com) and `run()`."},
+            {"type": "code", "language": "python", "text": "print('```')"},
+            {"type": "list", "ordered": True, "start": 1, "items": [
+                {"text": "first", "list": {"type": "list", "ordered": False, "start": 1, "items": [
+                    {"text": "nested", "list": None}
+                ]}},
+                {"text": "second", "list": None}
+            ]},
+            {"type": "table", "header": ["a", "b"], "rows": [["1", "x|y"]]},
+            {"type": "quote", "text": "quoted"},
+            {"type": "rule"}
+        ],
+        "links": [{"text": "docs", "href": "https://example.com"}]
+    }
+    expected = "\n\n".join([
+        "## Result",
+        "See [docs](https://example.com) and `run()`.",
+        "````python\nprint('```')\n````",
+        "1. first\n   - nested\n2. second",
+        "| a | b |\n|---|---|\n| 1 | x\\|y |",
+        "> quoted",
+        "---"
+    ])
+    markdown = structured_to_markdown(document)
+    assert markdown == expected, markdown
+    print("✓ Structured answer markdown working")
+
+
+if __name__ == "__main__":
+    test_structured_to_markdown()
@@ -0,0 +1,49 @@
+"""
+Test the page selector registry
+"""
+import json
+import os
+import tempfile
+from chatgpt_selectors import SelectorRegistry, DEFAULT_SELECTORS
+
+
+def test_reload_and_ordering():
+    """Test config overrides, hot reload and demotion of selectors that keep missing"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "selectors.json")
+        registry = SelectorRegistry(path)
+        assert registry.get("response") == DEFAULT_SELECTORS["response"]
+        
+        with open(path, "w") as f:
+            json.dump({"response": ["div.new", "div.old"], "prompt": "#composer"}, f)
+        assert registry.reload() == ["prompt", "response"]
+        assert registry.css("prompt") == "#composer"
+        
+        # "div.new" misses on every answer, so "div.old" is tried first from now on
+        for _ in range(5):
+            registry.record("response", "div.old", 0.002, missed=["div.new"])
+        assert registry.get("response") == ["div.old", "div.new"]
+        
+        # Probes still try "div.new" first now and then; once it matches again it is promoted back
+        for _ in range(200):
+            selectors = registry.get("response")
+            if selectors[0] == "div.new":
+                registry.record("response", "div.new", 0.002)
+            else:
+                registry.record("response", "div.old", 0.002, missed=[])
+        assert registry.get("response") == ["div.new", "div.old"]
+        
+        # An invalid file keeps the selectors in use
+        with open(path, "w") as f:
+            json.dump({"response": []}, f)
+        try:
+            registry.reload()
+            assert False, "invalid selectors accepted"
+        except ValueError:
+            pass
+        assert registry.css("prompt") == "#composer"
+    print("✓ Selector registry working")
+
+
+if __name__ == "__main__":
+    test_reload_and_ordering()
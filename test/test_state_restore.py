@@ -0,0 +1,140 @@
+"""
+Test the bulk browser state restore helpers
+"""
+import os
+import pickle
+import tempfile
+from chatgpt_bot_core import ChatGPTBot, to_cdp_cookie
+from chatgpt_browser_pool import BrowserPool
+from chatgpt_state_store import DirectoryStateStore
+
+
+class FakeDriver:
+    """Driver keeping the cookies set through DevTools"""
+
+    def __init__(self):
+        self.current_url = ChatGPTBot.CHATGPT_URL
+        self.cookies = []
+        self.refreshes = 0
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Network.clearBrowserCookies":
+            self.cookies = []
+        elif command == "Network.setCookies":
+            self.cookies.extend(params["cookies"])
+        return {}
+
+    def execute_script(self, script, *args):
+        return True
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+def test_cdp_cookie_conversion():
+    """Test that saved Selenium cookies convert to DevTools cookie parameters"""
+    cookie = to_cdp_cookie({
+        "name": "session", "value": "abc", "domain": ".chatgpt.com", "path": "/",
+        "secure": True, "httpOnly": True, "expiry": 1900000000, "sameSite": "Lax"
+    })
+    assert cookie == {
+        "name": "session", "value": "abc", "domain": ".chatgpt.com", "path": "/",
+        "secure": True, "httpOnly": True, "expires": 1900000000, "sameSite": "Lax"
+    }, cookie
+    
+    # Host-only cookies without a domain are bound to the ChatGPT URL
+    cookie = to_cdp_cookie({"name": "a", "value": "b"})
+    assert cookie["url"] == ChatGPTBot.CHATGPT_URL and "domain" not in cookie
+    print("✓ Cookie conversion working")
+
+
+def test_storage_state():
+    """Test that storage is restored only for the origin it was saved from"""
+    bot = ChatGPTBot(status_callback=lambda message: None)
+    state = bot.storage_state({
+        "localStorage": {"it's": "a \"quoted\" value"},
+        "current_url": "https://chatgpt.com/c/123"
+    })
+    assert state == {
+        "origin": "https://chatgpt.com",
+        "localStorage": {"it's": "a \"quoted\" value"},
+        "sessionStorage": {}
+    }, state
+    print("✓ Storage state working")
+
+
+def test_conversations_saved_with_state():
+    """Test that the conversation map is saved with the browser state and read back"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DirectoryStateStore(temp_dir)
+        bot = ChatGPTBot(status_callback=lambda message: None, state_store=store, state_namespace="one")
+        bot.conversations["abc-123"] = "https://chatgpt.com/c/abc-123"
+        bot.write_browser_state([], {"localStorage": {}})
+        
+        restarted = ChatGPTBot(status_callback=lambda message: None, state_store=store, state_namespace="one")
+        restarted.read_saved_state()
+        assert restarted.conversations == {"abc-123": "https://chatgpt.com/c/abc-123"}, restarted.conversations
+    print("✓ Conversation map persistence working")
+
+
+def test_leased_browser_gets_own_state():
+    """Test that a pooled browser warmed on the default state ends up with the leasing bot's cookies"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DirectoryStateStore(temp_dir)
+        quiet = lambda message: None
+        ChatGPTBot(status_callback=quiet, state_store=store).write_browser_state(
+            [{"name": "session", "value": "default", "domain": ".chatgpt.com"}], {})
+        ChatGPTBot(status_callback=quiet, state_store=store, state_namespace="alice").write_browser_state(
+            [{"name": "session", "value": "alice", "domain": ".chatgpt.com"}], {})
+
+        pool = BrowserPool(min_size=0, bot_options={"state_store": store}, status_callback=quiet)
+        pool.running = True
+        warm = ChatGPTBot(status_callback=quiet, state_store=store)
+        warm.attach_browser(FakeDriver())
+        warm.driver.cookies = [{"name": "session", "value": "default"}]
+        pool.idle.append((warm, pool.state_key))
+
+        bot = ChatGPTBot(status_callback=quiet, state_store=store, state_namespace="alice")
+        bot.wait_for_page_ready = lambda: True
+        assert pool.lease(bot)
+        assert [cookie["value"] for cookie in bot.driver.cookies] == ["alice"], bot.driver.cookies
+        assert bot.driver.refreshes == 1
+
+        # A bot on the state the browser already holds is not reloaded
+        pool.release(bot)
+        warm = ChatGPTBot(status_callback=quiet, state_store=store)
+        warm.attach_browser(FakeDriver())
+        pool.idle.append((warm, pool.state_key))
+        default = ChatGPTBot(status_callback=quiet, state_store=store)
+        assert pool.lease(default) and default.driver.refreshes == 0
+        pool.running = False
+    print("✓ Leased browser state working")
+
+
+def test_empty_namespace_starts_from_legacy_state():
+    """Test that a session namespace of an upgraded installation starts from the pre-namespace state"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DirectoryStateStore(os.path.join(temp_dir, "state"))
+        bot = ChatGPTBot(status_callback=lambda message: None, state_store=store, state_namespace="session-1")
+        bot.cookies_file = os.path.join(temp_dir, "chatgpt_cookies.pkl")
+        bot.session_file = os.path.join(temp_dir, "chatgpt_session.json")
+        with open(bot.cookies_file, "wb") as f:
+            pickle.dump([{"name": "session", "value": "legacy"}], f)
+
+        cookies, _ = bot.read_saved_state()
+        assert cookies == [{"name": "session", "value": "legacy"}], cookies
+        assert store.load("default")[0] == cookies and store.load("session-1")[0] == cookies
+
+        # Namespaces with their own state keep it
+        store.save("session-2", [{"name": "session", "value": "own"}], {})
+        bot.state_namespace = "session-2"
+        assert bot.read_saved_state()[0] == [{"name": "session", "value": "own"}]
+    print("✓ Legacy state seeding working")
+
+
+if __name__ == "__main__":
+    test_cdp_cookie_conversion()
+    test_storage_state()
+    test_conversations_saved_with_state()
+    test_leased_browser_gets_own_state()
+    test_empty_namespace_starts_from_legacy_state()
@@ -0,0 +1,124 @@
+"""
+Test the background browser state writer
+"""
+import os
+import threading
+import time
+import tempfile
+from chatgpt_bot_core import ChatGPTBot
+from chatgpt_state_store import StateWriter, DirectoryStateStore, SqliteStateStore
+
+
+class RecordingBot:
+    """Stands in for ChatGPTBot: serves a fixed state and records writes"""
+    def __init__(self):
+        self.state_store = DirectoryStateStore("unused")
+        self.state_namespace = "test"
+        self.browser_lock = threading.Lock()
+        self.state = ([{"name": "a", "value": "1"}], {"localStorage": {}, "sessionStorage": {}})
+        self.written = []
+        self.messages = []
+
+    def capture_browser_state(self):
+        return self.state
+
+    def write_browser_state(self, cookies, session_data):
+        self.written.append((cookies, session_data))
+
+    def log_status(self, message):
+        self.messages.append(message)
+
+
+def test_debounce_and_skip_unchanged():
+    """Test that bursts are written once and unchanged state is not rewritten"""
+    bot = RecordingBot()
+    writer = StateWriter(debounce=0.05)
+    for _ in range(5):
+        writer.schedule(bot)
+    time.sleep(0.3)
+    assert len(bot.written) == 1, bot.written
+    
+    # Same state again is skipped, changed state is written
+    writer.schedule(bot)
+    time.sleep(0.3)
+    assert len(bot.written) == 1
+    bot.state = ([{"name": "a", "value": "2"}], bot.state[1])
+    writer.schedule(bot)
+    time.sleep(0.3)
+    assert len(bot.written) == 2
+    assert writer.stats() == {"pending": 0, "writes": 2, "skipped": 1}, writer.stats()
+    writer.stop()
+    print("✓ Debounced state writes working")
+
+
+def test_flush_on_stop():
+    """Test that pending state is written on stop without waiting for the debounce period"""
+    bot = RecordingBot()
+    writer = StateWriter(debounce=60)
+    writer.schedule(bot)
+    writer.stop()
+    assert len(bot.written) == 1
+    print("✓ State flush on stop working")
+
+
+class StorageDriver:
+    """Driver serving fixed cookies and storage"""
+    current_url = ChatGPTBot.CHATGPT_URL
+
+    def get_cookies(self):
+        return [{"name": "a", "value": "1"}]
+
+    def execute_script(self, script, *args):
+        return {"localStorage": {}, "sessionStorage": {}, "current_url": self.current_url}
+
+
+def test_new_conversation_is_saved():
+    """Test that a state differing only in its conversation map is written, also for profile bots"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DirectoryStateStore(temp_dir)
+        writer = StateWriter()
+        for namespace, profile_dir in (("plain", None), ("profile", os.path.join(temp_dir, "profile"))):
+            bot = ChatGPTBot(status_callback=lambda message: None, state_store=store,
+                             state_namespace=namespace, profile_dir=profile_dir)
+            bot.attach_browser(StorageDriver())
+            assert writer._persist(bot, blocking=True)
+            bot.conversations["abc-123"] = "https://chatgpt.com/c/abc-123"
+            assert writer._persist(bot, blocking=True)
+            assert store.load(namespace)[1]["conversations"] == {"abc-123": "https://chatgpt.com/c/abc-123"}
+        assert writer.stats()["writes"] == 4 and store.load("profile")[0] == []
+    print("✓ Conversation map changes saved")
+
+
+def check_store(store):
+    store.save("alpha", [{"name": "a", "value": "1"}], {"localStorage": {"it's": "\"x\""}})
+    assert store.load("alpha") == ([{"name": "a", "value": "1"}], {"localStorage": {"it's": "\"x\""}})
+    assert store.load("beta") is None
+    
+    assert store.copy("alpha", "beta")
+    assert [entry["namespace"] for entry in store.list()] == ["alpha", "beta"]
+    
+    assert store.expire(3600) == []
+    assert sorted(store.expire(0)) == ["alpha", "beta"]
+    assert store.list() == []
+    
+    for namespace in ("../escape", "trailing\n", ".."):
+        try:
+            store.save(namespace, [], {})
+            assert False, f"invalid namespace {namespace!r} accepted"
+        except ValueError:
+            pass
+
+
+def test_state_stores():
+    """Test save, load, copy, list and expire on both store backends"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        check_store(DirectoryStateStore(os.path.join(temp_dir, "states")))
+        check_store(SqliteStateStore(os.path.join(temp_dir, "states.db")))
+    print("✓ Session state stores working")
+
+
+if __name__ == "__main__":
+    test_state_stores()
+    test_debounce_and_skip_unchanged()
+    test_flush_on_stop()
+    test_new_conversation_is_saved()
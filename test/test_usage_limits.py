@@ -0,0 +1,61 @@
+"""
+Test usage-cap and rate-limit detection
+"""
+import time
+from datetime import datetime
+from chatgpt_bot_core import ChatGPTBot
+from chatgpt_usage_limits import UsageLimitError, classify_notice, USAGE_CAP, RATE_LIMIT
+
+
+def test_classify_notices():
+    """Test that limit notices are recognised with their retry time and other notices are not"""
+    now = time.time()
+    limit = classify_notice("You've reached our limit of messages per hour. Please try again in 20 minutes.", now)
+    assert limit.kind == USAGE_CAP and limit.retry_after == 1200, limit
+    assert limit.until == now + 1200
+
+    limit = classify_notice("Too many requests in 1 hour. Try again later.", now)
+    assert limit.kind == RATE_LIMIT and limit.retry_after == 60, limit
+
+    limit = classify_notice("You've hit your limit.\n Upgrade to Plus.", now)
+    assert limit.kind == USAGE_CAP and limit.retry_after == 3600, limit
+
+    assert classify_notice("Something went wrong while generating the response.", now) is None
+    assert classify_notice("", now) is None
+    print("✓ Notice classification working")
+
+
+def test_retry_at_clock_time():
+    """Test that a reset time of day becomes the seconds until its next occurrence"""
+    now = datetime(2026, 3, 1, 14, 0).timestamp()
+    limit = classify_notice("You've reached the usage cap for GPT-4. You can try again after 3:45 PM.", now)
+    assert limit.retry_after == 105 * 60, limit.retry_after
+
+    # A time already past today means tomorrow
+    limit = classify_notice("You've reached the usage cap. Resets at 13:30.", now)
+    assert limit.retry_after == 23.5 * 3600, limit.retry_after
+    print("✓ Retry time parsing working")
+
+
+def test_limited_bot_fails_fast():
+    """Test that a bot refuses questions without touching the page while its limit has not lifted"""
+    bot = ChatGPTBot(status_callback=lambda message: None)
+    bot.driver = bot.wait = object()  # any page access would fail
+    bot.usage_limit = UsageLimitError(RATE_LIMIT, "Too many requests", 30)
+    try:
+        bot.ask_question_and_get_response("hi")
+        assert False, "expected UsageLimitError"
+    except UsageLimitError as e:
+        assert e.kind == RATE_LIMIT and 0 < e.retry_after <= 30, e
+
+    # An expired limit is forgotten and the question goes to the page (which fails here)
+    bot.usage_limit = UsageLimitError(RATE_LIMIT, "Too many requests", 30, now=time.time() - 60)
+    assert bot.ask_question_and_get_response("hi") is None
+    assert bot.usage_limit is None
+    print("✓ Fail-fast while limited working")
+
+
+if __name__ == "__main__":
+    test_classify_notices()
+    test_retry_at_clock_time()
+    test_limited_bot_fails_fast()
@@ -0,0 +1,52 @@
+"""
+Test the wait strategies that decide when an answer is complete
+"""
+from chatgpt_wait_strategy import (
+    FixedWaitStrategy, AdaptiveWaitStrategy, WAITING, GENERATING, SETTLING, COMPLETE, TIMEOUT
+)
+
+
+def test_fixed_strategy():
+    """Test that the fixed strategy keeps the original 3-stable-checks rule"""
+    strategy = FixedWaitStrategy()
+    strategy.start(0)
+    assert strategy.update(0, "", False) == WAITING
+    assert strategy.update(1, "Hello", True) == GENERATING
+    assert strategy.update(2, "Hello world", False) == GENERATING
+    assert strategy.update(3, "Hello world", False) == SETTLING
+    assert strategy.update(4, "Hello world", False) == SETTLING
+    assert strategy.update(5, "Hello world", False) == COMPLETE
+    assert strategy.next_delay() == 1.0
+    print("✓ Fixed strategy working")
+
+
+def test_adaptive_strategy():
+    """Test backoff, fast completion and the progress-aware deadline"""
+    strategy = AdaptiveWaitStrategy(first_token_poll=0.1, backoff=2, max_poll=0.5)
+    strategy.start(0)
+    delays = []
+    for _ in range(4):
+        assert strategy.update(0, "", False) == WAITING
+        delays.append(strategy.next_delay())
+    assert delays == [0.1, 0.2, 0.4, 0.5], delays
+    
+    # Stop button gone: complete after the short stability window
+    assert strategy.update(1.0, "Hello", True) == GENERATING
+    assert strategy.update(1.2, "Hello world", False) == SETTLING
+    assert strategy.update(1.7, "Hello world", False) == COMPLETE
+    print("✓ Adaptive strategy completes quickly")
+    
+    # Growing text keeps the wait alive past the idle timeout
+    strategy = AdaptiveWaitStrategy(idle_timeout=10)
+    strategy.start(0)
+    text = ""
+    for second in range(1, 60):
+        text += "word "
+        assert strategy.update(second, text, True) == GENERATING
+    assert strategy.update(75, text, True) == TIMEOUT
+    print("✓ Adaptive strategy deadline extends while text grows")
+
+
+if __name__ == "__main__":
+    test_fixed_strategy()
+    test_adaptive_strategy()